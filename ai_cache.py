@@ -0,0 +1,214 @@
+"""
+ai_cache.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Content-addressed response cache for GeminiWellnessAI.
+
+• Keys are a SHA-256 of the call kind + whitespace-normalised prompt
+• MemoryTier  – in-process LRU with per-entry expiry
+• SQLiteTier  – optional persistent tier shared by every worker
+• ResponseCache chains the tiers and keeps hit / miss counters
+"""
+
+import copy
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def prompt_key(kind, prompt):
+    """Stable cache key for a rendered prompt"""
+    normalized = _WHITESPACE.sub(" ", prompt).strip()
+    return hashlib.sha256(f"{kind}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+# ── tiers ────────────────────────────────────────────────────────
+class MemoryTier:
+    """In-process LRU tier; values are kept as Python objects"""
+
+    name = "memory"
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.evictions   = 0
+        self._data       = OrderedDict()
+        self._lock       = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, value, expires):
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteTier:
+    """Persistent tier; one connection per thread, JSON-encoded values"""
+
+    name        = "sqlite"
+    PRUNE_EVERY = 64                # sets between size-cap sweeps
+
+    def __init__(self, path, max_entries=10000):
+        self.path        = path
+        self.max_entries = max_entries
+        self.evictions   = 0
+        self._local      = threading.local()
+        self._sets       = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS ai_response_cache ("
+            " key      TEXT PRIMARY KEY,"
+            " value    TEXT NOT NULL,"
+            " expires  REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, now):
+        conn = self._conn()
+        row  = conn.execute(
+            "SELECT value, expires FROM ai_response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            conn.execute("DELETE FROM ai_response_cache WHERE key = ?", (key,))
+            return None
+        conn.execute(
+            "UPDATE ai_response_cache SET accessed = ? WHERE key = ?", (now, key)
+        )
+        return row[1], json.loads(row[0])
+
+    def set(self, key, value, expires):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO ai_response_cache (key, value, expires, accessed)"
+            " VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), expires, time.time())
+        )
+        self._sets += 1
+        if self._sets % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        """Drop expired rows, then the least recently used beyond the cap"""
+        conn = self._conn()
+        conn.execute("DELETE FROM ai_response_cache WHERE expires <= ?", (time.time(),))
+        cur = conn.execute(
+            "DELETE FROM ai_response_cache WHERE key IN ("
+            " SELECT key FROM ai_response_cache ORDER BY accessed DESC"
+            " LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        self.evictions += max(cur.rowcount, 0)
+
+    def clear(self):
+        self._conn().execute("DELETE FROM ai_response_cache")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM ai_response_cache").fetchone()[0]
+
+
+# ── front door ───────────────────────────────────────────────────
+class ResponseCache:
+    """Read-through over an ordered list of tiers (fastest first)"""
+
+    def __init__(self, ttl=900, tiers=None):
+        self.ttl    = ttl
+        self.tiers  = tiers if tiers is not None else [MemoryTier()]
+        self.hits   = 0
+        self.misses = 0
+        self.tier_hits = {tier.name: 0 for tier in self.tiers}
+        self._lock  = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the cache from a Flask config (or any mapping)"""
+        tiers = [MemoryTier(config.get("AI_CACHE_MAX_ENTRIES", 512))]
+        if config.get("AI_CACHE_DB_PATH"):
+            tiers.append(SQLiteTier(
+                config["AI_CACHE_DB_PATH"],
+                config.get("AI_CACHE_DB_MAX_ENTRIES", 10000)
+            ))
+        return cls(ttl=config.get("AI_CACHE_TTL", 900), tiers=tiers)
+
+    def get(self, key, record=True):
+        """Cached value or None; record=False leaves the hit/miss counters alone"""
+        if self.ttl <= 0:
+            return None
+
+        now = time.time()
+        for depth, tier in enumerate(self.tiers):
+            entry = tier.get(key, now)
+            if entry is None:
+                continue
+            expires, value = entry
+            # promote into the faster tiers we already missed
+            for faster in self.tiers[:depth]:
+                faster.set(key, value, expires)
+            if record:
+                with self._lock:
+                    self.hits += 1
+                    self.tier_hits[tier.name] += 1
+            return copy.deepcopy(value)
+
+        if record:
+            with self._lock:
+                self.misses += 1
+        return None
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        expires = time.time() + ttl
+        value   = copy.deepcopy(value)
+        for tier in self.tiers:
+            tier.set(key, value, expires)
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits"      : self.hits,
+            "misses"    : self.misses,
+            "hit_ratio" : (self.hits / lookups) if lookups else 0.0,
+            "tier_hits" : dict(self.tier_hits),
+            "evictions" : {tier.name: tier.evictions for tier in self.tiers},
+            "entries"   : {tier.name: len(tier) for tier in self.tiers},
+        }
@@ -0,0 +1,261 @@
+"""
+ai_guard.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Client-side protection around Gemini calls.
+
+• TokenBucket     – caps request rate (requests / second + burst)
+• AdaptiveLimit   – AIMD concurrency limit; halves on overload errors,
+                    grows by ~1 per window of successful calls
+• CircuitBreaker  – after N consecutive failures every call is
+                    short-circuited for a cool-down, then one probe
+• ModelGuard      – ties them together with deadline-aware retries and
+                    counts model vs. fallback traffic
+• SlotPool        – non-blocking cap on requests that hold a thread for
+                    a whole model call (plan streams)
+
+Anything that cannot be served in time raises BackendUnavailable, which
+GeminiWellnessAI answers with its fallback plan / analysis.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# google.api_core exception names (matched by name so this module does not import it)
+OVERLOAD_ERRORS  = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded"}
+RETRYABLE_ERRORS = OVERLOAD_ERRORS | {"InternalServerError", "ConnectionError", "TimeoutError"}
+
+
+class BackendUnavailable(Exception):
+    """The model cannot be called right now (breaker open, limits, deadline)"""
+
+
+def _is_overload(error):
+    return type(error).__name__ in OVERLOAD_ERRORS or getattr(error, "code", None) in (429, 503)
+
+
+def _is_retryable(error):
+    return type(error).__name__ in RETRYABLE_ERRORS or _is_overload(error)
+
+
+# ── building blocks ──────────────────────────────────────────────
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate    = rate
+        self.burst   = burst
+        self._tokens = float(burst)
+        self._stamp  = time.monotonic()
+        self._lock   = threading.Lock()
+
+    def acquire(self, deadline):
+        """Take one token, waiting until `deadline` (monotonic) at most"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp  = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class AdaptiveLimit:
+    def __init__(self, initial=4, minimum=1, maximum=16, backoff=0.5):
+        self.limit     = float(initial)
+        self.minimum   = minimum
+        self.maximum   = maximum
+        self.backoff   = backoff
+        self.in_flight = 0
+        self._cond     = threading.Condition()
+
+    def acquire(self, deadline):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    def release(self, overloaded=False):
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+class SlotPool:
+    def __init__(self, size):
+        self.size     = size
+        self.in_use   = 0
+        self.rejected = 0
+        self._lock    = threading.Lock()
+
+    def try_acquire(self):
+        """Take a slot if one is free – never waits"""
+        with self._lock:
+            if self.in_use >= self.size:
+                self.rejected += 1
+                return False
+            self.in_use += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def stats(self):
+        return {"size": self.size, "in_use": self.in_use, "rejected": self.rejected}
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=5, reset_after=30):
+        self.threshold   = threshold
+        self.reset_after = reset_after
+        self.failures    = 0
+        self.opened_at   = None
+        self._probing    = False
+        self._lock       = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True        # let exactly one probe through
+                return True
+            return False
+
+    def abandon(self):
+        """An admitted probe never reached the backend"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures  = 0
+            self.opened_at = None
+            self._probing  = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+# ── front door ───────────────────────────────────────────────────
+class ModelGuard:
+    def __init__(self, bucket, limit, breaker, max_retries=2, backoff_base=0.5):
+        self.bucket       = bucket
+        self.limit        = limit
+        self.breaker      = breaker
+        self.max_retries  = max_retries
+        self.backoff_base = backoff_base
+        self.counters     = dict.fromkeys((
+            "model_calls", "model_errors", "retries", "throttled",
+            "short_circuited", "served_by_model", "served_by_fallback"
+        ), 0)
+        self._lock        = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            TokenBucket(config.get("AI_RATE_LIMIT", 5), config.get("AI_RATE_BURST", 10)),
+            AdaptiveLimit(
+                initial=config.get("AI_MAX_CONCURRENCY", 8) // 2 or 1,
+                maximum=config.get("AI_MAX_CONCURRENCY", 8)
+            ),
+            CircuitBreaker(config.get("AI_BREAKER_THRESHOLD", 5), config.get("AI_BREAKER_RESET", 30)),
+            max_retries  = config.get("AI_MAX_RETRIES", 2),
+            backoff_base = config.get("AI_BACKOFF_BASE", 0.5)
+        )
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    @contextmanager
+    def slot(self, deadline):
+        """Admit one model call (breaker, rate, concurrency) and record its outcome"""
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise BackendUnavailable("circuit open – Gemini backend unhealthy")
+        if not self.bucket.acquire(deadline):
+            self._count("throttled")
+            self.breaker.abandon()
+            raise BackendUnavailable("rate limit would exceed the deadline")
+        if not self.limit.acquire(deadline):
+            self._count("throttled")
+            self.breaker.abandon()
+            raise BackendUnavailable("concurrency limit would exceed the deadline")
+
+        self._count("model_calls")
+        outcome, overloaded = None, False
+        try:
+            yield
+            outcome = "ok"
+        except Exception as e:
+            outcome, overloaded = "error", _is_overload(e)
+            self._count("model_errors")
+            raise
+        finally:
+            # also runs when a streaming consumer goes away mid-response
+            # (GeneratorExit is not an Exception): no verdict, but a half-open
+            # probe must be handed back or the breaker never admits another
+            self.limit.release(overloaded=overloaded)
+            if outcome == "ok":
+                self.breaker.record_success()
+            elif outcome == "error":
+                self.breaker.record_failure()
+            else:
+                self.breaker.abandon()
+
+    def call(self, fn, deadline):
+        """fn() through slot(), retrying transient errors with jittered backoff"""
+        attempt = 0
+        while True:
+            try:
+                with self.slot(deadline):
+                    return fn()
+            except BackendUnavailable:
+                raise
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_base * (2 ** attempt) * random.uniform(0.5, 1.5)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                self._count("retries")
+
+    def record_served(self, by_model):
+        self._count("served_by_model" if by_model else "served_by_fallback")
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+        out["concurrency_limit"] = round(self.limit.limit, 2)
+        out["in_flight"]         = self.limit.in_flight
+        out["breaker_state"]     = self.breaker.state
+        return out
@@ -1,19 +1,382 @@
-import google.generativeai as genai
 import os
 from dotenv import load_dotenv
+import hashlib
 import json
 import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import nullcontext
+
+from ai_cache import prompt_key
+from ai_guard import BackendUnavailable
+from fallback_rules import FallbackPlanner, PLAN_RULES
+from metrics import AI_SECONDS, AI_EXTRACT, AI_SERVED
+from json_extract import (
+    JSONObjectScanner, ExtractionError, extract_json, validate,
+    PLAN_SCHEMA, FEELINGS_SCHEMA
+)
 
 load_dotenv()
 
+# ── model backends ───────────────────────────────────────────────
+# A backend is anything with generate_content(prompt, stream=False) that
+# returns an object with .text – or, with stream=True, an iterable of them.
+
+class GeminiBackend:
+    """Google Gemini (the production backend).
+
+    google.generativeai takes about a second to import, so it is loaded and
+    configured on the first model call, not when the app starts.
+    """
+    def __init__(self, model_name='gemini-1.5-flash', api_key=None):
+        self.model_name = model_name
+        self.api_key = api_key
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key or os.getenv('GEMINI_API_KEY'))
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate_content(self, prompt, stream=False):
+        return self.model.generate_content(prompt, stream=stream)
+
+
+class LocalResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class ResourceExhausted(Exception):
+    """Simulated 429 – same name as google.api_core's, so ModelGuard treats it as overload"""
+    code = 429
+
+
+class LocalBackend:
+    """Deterministic stand-in for load tests and offline development.
+
+    The answer depends only on the prompt (same prompt, same JSON); latency,
+    injected errors and malformed answers are drawn from a seeded RNG.
+    latency: 'fixed' | 'uniform' (0..2×median) | 'lognormal' (median, sigma).
+    """
+    VOCABULARY = {section: [text for _, texts in PLAN_RULES[section] for text in texts]
+                  for section in ('mental_health', 'fitness', 'nutrition')}
+
+    def __init__(self, latency_ms=800, distribution='lognormal', sigma=0.5,
+                 error_rate=0.0, malformed_rate=0.0, chunk_chars=48, seed=2070):
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.chunk_chars = chunk_chars
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        with self._lock:
+            self.calls += 1
+            if self.distribution == 'fixed':
+                delay = self.latency_ms
+            elif self.distribution == 'uniform':
+                delay = self._rng.uniform(0, 2 * self.latency_ms)
+            else:
+                delay = self.latency_ms * self._rng.lognormvariate(0, self.sigma)
+            roll = self._rng.random()
+        outcome = ('error' if roll < self.error_rate else
+                   'malformed' if roll < self.error_rate + self.malformed_rate else 'ok')
+        return delay / 1000, outcome
+
+    def generate_content(self, prompt, stream=False):
+        delay, outcome = self._draw()
+        text = self._answer(prompt)
+        if outcome == 'malformed':
+            text = "I'm sorry, here is your plan: " + text[:len(text) // 2]
+
+        if not stream:
+            time.sleep(delay)
+            if outcome == 'error':
+                raise ResourceExhausted("simulated quota exhaustion")
+            return LocalResponse(text)
+        return self._stream(text, delay, outcome)
+
+    def _stream(self, text, delay, outcome):
+        chunks = [text[n:n + self.chunk_chars] for n in range(0, len(text), self.chunk_chars)]
+        time.sleep(delay / 2)                         # time to first token
+        if outcome == 'error':
+            raise ResourceExhausted("simulated quota exhaustion")
+        for chunk in chunks:
+            time.sleep(delay / 2 / len(chunks))
+            yield LocalResponse(chunk)
+
+    def _answer(self, prompt):
+        rng = random.Random(hashlib.sha256(prompt.encode()).digest())
+        if 'emotional wellness analyzer' in prompt:
+            return json.dumps({
+                "emotional_state": rng.choice(["calm", "anxious", "tired", "hopeful", "overwhelmed"]),
+                "stress_indicators": rng.sample(["workload", "sleep", "isolation", "deadlines"], 2),
+                "recommended_focus_areas": rng.sample(["rest", "movement", "connection", "nutrition"], 3),
+                "empathy_message": "Thank you for sharing – let's take this one step at a time."
+            })
+        refs = re.findall(r'^- (user_\d+):', prompt, re.M)
+        if refs:                                      # batched plan prompt
+            return json.dumps({ref: self._plan(rng) for ref in refs})
+        return json.dumps(self._plan(rng), indent=2)
+
+    def _plan(self, rng):
+        plan = {section: rng.sample(texts, 3) for section, texts in self.VOCABULARY.items()}
+        plan["personalized_insights"] = f"Local model insight #{rng.randrange(10 ** 6):06d}."
+        plan["motivation_message"] = "Keep going – every small step counts!"
+        return plan
+
+
+def make_backend(config):
+    """Backend named by AI_BACKEND ('gemini' or 'local')"""
+    if config.get('AI_BACKEND', 'gemini') == 'local':
+        return LocalBackend(
+            latency_ms=config.get('AI_LOCAL_LATENCY_MS', 800),
+            distribution=config.get('AI_LOCAL_LATENCY_DIST', 'lognormal'),
+            sigma=config.get('AI_LOCAL_LATENCY_SIGMA', 0.5),
+            error_rate=config.get('AI_LOCAL_ERROR_RATE', 0.0),
+            malformed_rate=config.get('AI_LOCAL_MALFORMED_RATE', 0.0),
+            seed=config.get('AI_LOCAL_SEED', 2070)
+        )
+    return GeminiBackend(config.get('GEMINI_MODEL', 'gemini-1.5-flash'), config.get('GEMINI_API_KEY'))
+
+
+class _CallState:
+    """One run_concurrently() call, shared with the worker thread running it"""
+    def __init__(self, deadline):
+        self.deadline = deadline      # the caller's deadline (monotonic)
+        self.abandoned = False        # caller gave up and answered with the fallback
+        self.recorded = False         # worker already counted the call as served
+        self.lock = threading.Lock()
+
+    def abandon(self):
+        """Mark the call abandoned; False if the worker already recorded its outcome"""
+        with self.lock:
+            self.abandoned = True
+            return not self.recorded
+
+
 class GeminiWellnessAI:
-    def __init__(self):
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+    def __init__(self, cache=None, singleflight=None, guard=None, max_workers=8, call_timeout=25,
+                 fallback=None, backend=None, similar=None):
+        self.model = backend if backend is not None else GeminiBackend()
+        self.cache = cache  # optional ai_cache.ResponseCache
+        self.singleflight = singleflight  # optional singleflight.SingleFlight
+        self.guard = guard  # optional ai_guard.ModelGuard
+        self.similar = similar  # optional similarity_index.FeelingsIndex
+        self.call_timeout = call_timeout
+        self.fallback = fallback or FallbackPlanner()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='gemini')
+        self._local = threading.local()  # .call: _CallState of the run_concurrently() task
+
+    def run_concurrently(self, calls, timeout=None):
+        """Fan out independent model calls and join them against one deadline.
+
+        `calls` maps a name to (fn, fallback) or (fn, fallback, call_timeout).
+        A call that misses its own timeout or the shared deadline, or raises,
+        is answered by its fallback without affecting the others. A call
+        still running when it is abandoned may finish later (and fill the
+        cache) but is not counted as served a second time.
+        """
+        started = time.monotonic()
+        shared = self.call_timeout if timeout is None else timeout
+
+        states, futures = {}, {}
+        for name, spec in calls.items():
+            limit = min(shared, spec[2]) if len(spec) > 2 else shared
+            states[name] = _CallState(started + limit)
+            futures[name] = self.executor.submit(self._run_call, spec[0], states[name])
+
+        results = {}
+        for name, spec in calls.items():
+            fallback = spec[1]
+            remaining = max(0.0, states[name].deadline - time.monotonic())
+            try:
+                results[name] = futures[name].result(timeout=remaining)
+            except FutureTimeout:
+                futures[name].cancel()
+                if not states[name].abandon():
+                    # finished between the timeout and now – it is only returning
+                    results[name] = futures[name].result()
+                    continue
+                print(f"AI call '{name}' exceeded {states[name].deadline - started:.1f}s, using fallback")
+                self._record_served(False, name)
+                results[name] = fallback()
+            except Exception as e:
+                print(f"AI call '{name}' failed: {e}")
+                self._record_served(False, name)
+                results[name] = fallback()
+        return results
+
+    def _run_call(self, fn, state):
+        self._local.call = state
+        try:
+            return fn()
+        finally:
+            self._local.call = None
+
+    def generate_plan_with_analysis(self, user_data, feelings_description="", timeout=None, user_id=None):
+        """Plan + feelings analysis in parallel; latency is the slower of the two"""
+        calls = {
+            'plan': (
+                lambda: self.generate_wellness_plan(user_data, feelings_description),
+                lambda: self._get_fallback_plan(user_data, feelings_description)
+            )
+        }
+        if feelings_description:
+            calls['analysis'] = (
+                lambda: self.analyze_feelings(feelings_description, user_id),
+                self._get_fallback_feelings_analysis
+            )
+
+        results = self.run_concurrently(calls, timeout)
+        return results['plan'], results.get('analysis')
     
     def generate_wellness_plan(self, user_data, feelings_description=""):
         """Generate personalized wellness plan using Gemini AI"""
         
+        plan, _ = self._wellness_plan(user_data, feelings_description)
+        return plan
+
+    def _wellness_plan(self, user_data, feelings_description=""):
+        prompt = self._plan_prompt(user_data, feelings_description)
+        return self._model_call(
+            'plan', prompt, PLAN_SCHEMA,
+            lambda: self._get_fallback_plan(user_data, feelings_description)
+        )
+    
+    def generate_wellness_plans_batch(self, profiles):
+        """Plans for several users from one model request.
+
+        `profiles` is a list of user_data dicts; returns (plan, from_model)
+        pairs in the same order. Answers already cached are not sent;
+        entries the batched response lacks or gets wrong fall back to one
+        call each, and if the backend is unavailable the rule table answers
+        the pack (from_model False).
+        """
+        keys = [prompt_key('plan', self._plan_prompt(user_data, "")) for user_data in profiles]
+        plans = [self._cache_get(key) for key in keys]
+        pending = [n for n, plan in enumerate(plans) if plan is None]
+        results = [(plan, True) if plan is not None else None for plan in plans]
+
+        if len(pending) > 1:
+            refs = {f"user_{n + 1}": n for n in pending}
+            prompt = self._batch_plan_prompt({ref: profiles[n] for ref, n in refs.items()})
+            try:
+                response = self._guarded(lambda: self.model.generate_content(prompt), 'plan_batch')
+                with AI_EXTRACT.time('plan_batch'):
+                    batch = extract_json(response.text)
+            except BackendUnavailable as e:
+                # model is out of reach – answer the whole pack from the rule table at once
+                print(f"Gemini AI Error (plan batch): {e}")
+                for n, plan in zip(pending, self.fallback.plans([profiles[n] for n in pending])):
+                    results[n] = (plan, False)
+                    self._record_served(False, 'plan')
+                return results
+            except Exception as e:
+                print(f"Gemini AI Error (plan batch): {e}")
+                batch = {}
+
+            for ref, n in refs.items():
+                try:
+                    plan = validate(batch.get(ref), PLAN_SCHEMA)
+                except ExtractionError:
+                    continue
+                self._cache_set(keys[n], plan)
+                self._record_served(True, 'plan')
+                results[n] = (plan, True)
+
+        # anything still missing: one call each (cache, model, fallback)
+        return [result if result is not None else self._wellness_plan(user_data)
+                for result, user_data in zip(results, profiles)]
+    
+    def stream_wellness_plan(self, user_data, feelings_description=""):
+        """Stream plan events as the model writes them.
+
+        Yields the JSONObjectScanner events ("item", key, index, text) and
+        ("field", key, value) while the response arrives, then exactly one
+        ("done", plan) – the fallback plan if the stream fails or is invalid.
+        """
+        prompt = self._plan_prompt(user_data, feelings_description)
+
+        cache_key = prompt_key('plan', prompt)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            yield ('done', cached)
+            return
+
+        scanner = JSONObjectScanner()
+        slot = (self.guard.slot(time.monotonic() + self.call_timeout)
+                if self.guard is not None else nullcontext())
+        try:
+            with slot, AI_SECONDS.time('plan_stream'):
+                for chunk in self.model.generate_content(prompt, stream=True):
+                    for event in scanner.feed(chunk.text):
+                        if event[0] != 'done':
+                            yield event
+                    if scanner.done:
+                        break
+        except Exception as e:
+            print(f"Gemini AI stream error: {e}")
+
+        try:
+            plan = validate(scanner.result, PLAN_SCHEMA)
+        except ExtractionError as e:
+            print(f"Gemini AI stream error: {e}")
+            self._record_served(False, 'plan')
+            yield ('done', self._get_fallback_plan(user_data, feelings_description))
+            return
+
+        self._cache_set(cache_key, plan)
+        self._record_served(True, 'plan')
+        yield ('done', plan)
+    
+    def analyze_feelings(self, feelings_text, user_id=None):
+        """Analyze user's feelings description and provide insights.
+
+        A description close enough to one the same user had analysed
+        before reuses that analysis (similarity index) instead of calling
+        the model.
+        """
+        if self.similar is not None:
+            match = self.similar.lookup(feelings_text, user_id)
+            if match is not None:
+                return match
+
+        prompt = f'''As an advanced AI emotional wellness analyzer from 2070, analyze these feelings and provide insights:
+
+USER FEELINGS: "{feelings_text}"
+
+Please respond with ONLY a JSON object in this format:
+{{
+    "emotional_state": "primary emotion detected",
+    "stress_indicators": ["indicator1", "indicator2"],
+    "recommended_focus_areas": ["area1", "area2", "area3"],
+    "empathy_message": "An empathetic response to their feelings"
+}}'''
+        
+        analysis, from_model = self._model_call('feelings', prompt, FEELINGS_SCHEMA,
+                                                self._get_fallback_feelings_analysis)
+        if self.similar is not None and from_model:
+            self.similar.add(feelings_text, analysis, user_id)   # only real answers are worth reusing
+        return analysis
+    
+    def _plan_prompt(self, user_data, feelings_description):
+        """Render the wellness-plan prompt for a user"""
+        
         age = user_data.get('age', 'Not specified')
         fitness_level = user_data.get('fitness_level', 'Not specified')
         health_goals = user_data.get('health_goals', 'Not specified')
@@ -61,90 +424,127 @@ Please respond with ONLY a JSON object in this exact format:
 }}
 
 Include futuristic elements like neural-feedback systems, holographic trainers, AI-powered biometric monitoring, quantum wellness optimization, smart molecular nutrition, VR/AR therapy environments, and brain-computer interfaces for wellness.'''
+        return prompt
+
+    def _batch_plan_prompt(self, profiles):
+        """One prompt asking for a plan per profile, keyed by reference"""
+        lines = []
+        for ref, user_data in profiles.items():
+            lines.append(
+                f"- {ref}: age {user_data.get('age', 'Not specified')}, "
+                f"fitness level {user_data.get('fitness_level', 'Not specified')}, "
+                f"health goals {user_data.get('health_goals', 'Not specified')}, "
+                f"mood {user_data.get('mood_score', 5)}/10, "
+                f"stress {user_data.get('stress_level', 5)}/10, "
+                f"energy {user_data.get('energy_level', 5)}/10"
+            )
+        users = "\n".join(lines)
+        first = next(iter(profiles))
+
+        return f'''You are an advanced AI wellness coach from the year 2070 with access to cutting-edge health technology.
+Create a separate personalized wellness plan for each of these users:
+
+{users}
+
+Please respond with ONLY a JSON object with one entry per user reference, in this exact format:
+
+{{
+    "{first}": {{
+        "mental_health": ["recommendation 1", "recommendation 2", "recommendation 3"],
+        "fitness": ["recommendation 1", "recommendation 2", "recommendation 3"],
+        "nutrition": ["recommendation 1", "recommendation 2", "recommendation 3"],
+        "personalized_insights": "A paragraph with personalized insights based on their current state",
+        "motivation_message": "An encouraging message tailored to their situation"
+    }},
+    ...
+}}
+
+Include futuristic elements like neural-feedback systems, holographic trainers, AI-powered biometric monitoring, quantum wellness optimization, smart molecular nutrition, VR/AR therapy environments, and brain-computer interfaces for wellness.'''
+
+    def _model_call(self, kind, prompt, schema, fallback):
+        """Cache, then single-flight, then the model; any failure -> fallback().
+
+        Returns (result, from_model) – from_model is False when the result is
+        fallback() output, including a fallback shared by single-flight.
+        """
+        cache_key = prompt_key(kind, prompt)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached, True
+
+        if self.singleflight is None:
+            return self._generate(kind, cache_key, prompt, schema, fallback)
 
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # Clean up the response text
-            if 'json' in response_text.lower():
-                lines = response_text.split('\n')
-                json_lines = []
-                inside_json = False
-                
-                for line in lines:
-                    if '{' in line:
-                        inside_json = True
-                    if inside_json:
-                        json_lines.append(line)
-                    if '}' in line and inside_json:
-                        break
-                
-                response_text = '\n'.join(json_lines)
-            
-            # Find JSON object
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != 0:
-                json_text = response_text[start_idx:end_idx]
-                plan = json.loads(json_text)
-                return plan
-            else:
-                return self._get_fallback_plan(user_data, feelings_description)
-            
+            # identical concurrent requests share one model call
+            return self.singleflight.do(
+                cache_key,
+                lambda: self._generate(kind, cache_key, prompt, schema, fallback),
+                lookup=lambda: self._remote_answer(cache_key)
+            )
         except Exception as e:
-            print(f"Gemini AI Error: {e}")
-            return self._get_fallback_plan(user_data, feelings_description)
-    
-    def analyze_feelings(self, feelings_text):
-        """Analyze user's feelings description and provide insights"""
-        
-        prompt = f'''As an advanced AI emotional wellness analyzer from 2070, analyze these feelings and provide insights:
+            print(f"Gemini AI Error ({kind}): {e}")
+            self._record_served(False, kind)
+            return fallback(), False
 
-USER FEELINGS: "{feelings_text}"
+    def _remote_answer(self, cache_key):
+        # another process's model answer, from the shared cache
+        cached = self._cache_get(cache_key, record=False)
+        return None if cached is None else (cached, True)
 
-Please respond with ONLY a JSON object in this format:
-{{
-    "emotional_state": "primary emotion detected",
-    "stress_indicators": ["indicator1", "indicator2"],
-    "recommended_focus_areas": ["area1", "area2", "area3"],
-    "empathy_message": "An empathetic response to their feelings"
-}}'''
-        
+    def _generate(self, kind, cache_key, prompt, schema, fallback):
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # Clean up the response
-            if 'json' in response_text.lower():
-                lines = response_text.split('\n')
-                json_lines = []
-                inside_json = False
-                
-                for line in lines:
-                    if '{' in line:
-                        inside_json = True
-                    if inside_json:
-                        json_lines.append(line)
-                    if '}' in line and inside_json:
-                        break
-                
-                response_text = '\n'.join(json_lines)
-            
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != 0:
-                json_text = response_text[start_idx:end_idx]
-                return json.loads(json_text)
-            else:
-                return self._get_fallback_feelings_analysis()
+            response = self._guarded(lambda: self.model.generate_content(prompt), kind)
+            with AI_EXTRACT.time(kind):
+                result = extract_json(response.text, schema)
+            self._cache_set(cache_key, result)
+            self._record_served(True, kind)
+            return result, True
             
         except Exception as e:
-            print(f"Feelings analysis error: {e}")
-            return self._get_fallback_feelings_analysis()
-    
+            print(f"Gemini AI Error ({kind}): {e}")
+            self._record_served(False, kind)
+            return fallback(), False
+
+    def _guarded(self, fn, kind):
+        # rate limit / adaptive concurrency / retries / circuit breaker
+        deadline = time.monotonic() + self.call_timeout
+        state = getattr(self._local, 'call', None)
+        if state is not None:
+            if state.abandoned:
+                raise BackendUnavailable("caller stopped waiting for this call")
+            deadline = min(deadline, state.deadline)   # no retries past the caller's deadline
+        with AI_SECONDS.time(kind):
+            if self.guard is None:
+                return fn()
+            return self.guard.call(fn, deadline)
+
+    def _record_served(self, by_model, kind):
+        state = getattr(self._local, 'call', None)
+        if state is not None:
+            # a run_concurrently() task: the caller counts it if it gives up first
+            with state.lock:
+                if state.abandoned:
+                    return
+                state.recorded = True
+        AI_SERVED.inc(kind, 'model' if by_model else 'fallback')
+        if self.guard is not None:
+            self.guard.record_served(by_model)
+
+    def _cache_get(self, key, record=True):
+        if self.cache is None:
+            return None
+        return self.cache.get(key, record=record)
+
+    def _cache_set(self, key, value):
+        # only real model answers are cached; fallbacks should be retried
+        if self.cache is not None:
+            self.cache.set(key, value)
+
+    def fallback_feelings_analysis(self):
+        """The canned analysis answered when the model cannot be used"""
+        return self._get_fallback_feelings_analysis()
+
     def _get_fallback_feelings_analysis(self):
         """Fallback feelings analysis if AI fails"""
         return {
@@ -155,96 +555,5 @@ Please respond with ONLY a JSON object in this format:
         }
     
     def _get_fallback_plan(self, user_data, feelings_description):
-        """Enhanced fallback wellness plan if AI fails"""
-        
-        mood_score = user_data.get('mood_score', 5)
-        stress_level = user_data.get('stress_level', 5)
-        energy_level = user_data.get('energy_level', 5)
-        
-        # Mental health based on stress and mood
-        if stress_level >= 7:
-            mental_health = [
-                "Daily neural-feedback meditation with VR forest environment",
-                "AI-guided deep breathing exercises with biometric monitoring", 
-                "Virtual therapy sessions with holographic wellness counselor"
-            ]
-        elif mood_score <= 4:
-            mental_health = [
-                "Mood-enhancing light therapy with circadian rhythm optimization",
-                "AI-powered journaling with sentiment analysis feedback",
-                "Brain-wave entrainment sessions for emotional balance"
-            ]
-        else:
-            mental_health = [
-                "Daily mindfulness practice with augmented reality guides",
-                "Neural interface meditation for optimal brain-wave patterns",
-                "Personalized affirmation therapy via AI voice synthesis"
-            ]
-        
-        # Fitness based on energy level
-        if energy_level <= 3:
-            fitness = [
-                "Gentle movement therapy with robotic assistance",
-                "Energy-building exercises with real-time biometric feedback",
-                "Restorative yoga with holographic instructor adaptation"
-            ]
-        elif energy_level >= 8:
-            fitness = [
-                "High-intensity quantum-enhanced training protocols",
-                "Advanced biometric optimization with AI form correction",
-                "Competitive VR fitness challenges with neural reward systems"
-            ]
-        else:
-            fitness = [
-                "Personalized workout routines with holographic personal trainer",
-                "Smart recovery protocols using nanotechnology sensors",
-                "Mixed-reality fitness games for sustained motivation"
-            ]
-        
-        # Nutrition based on overall wellness needs
-        if stress_level >= 6:
-            nutrition = [
-                "Stress-reducing adaptogenic meal plans via molecular gastronomy",
-                "Real-time cortisol monitoring with smart nutrition adjustments",
-                "AI-optimized gut microbiome restoration protocols"
-            ]
-        else:
-            nutrition = [
-                "Personalized meal optimization based on genetic markers",
-                "Smart hydration monitoring with electrolyte balance tracking", 
-                "3D-printed custom supplements delivered via drone network"
-            ]
-        
-        # Generate personalized insights
-        insights = f"Based on your mood score of {mood_score}/10, stress level of {stress_level}/10, and energy level of {energy_level}/10, "
-        
-        if feelings_description:
-            insights += "along with your personal feelings description, our advanced AI has detected patterns that suggest focusing on "
-            if stress_level >= 6:
-                insights += "stress management and emotional regulation. "
-            elif energy_level <= 4:
-                insights += "energy restoration and gentle activation. "
-            else:
-                insights += "maintaining balance while optimizing your wellness journey. "
-        else:
-            insights += "our 2070 wellness algorithms recommend a balanced approach to your mental, physical, and nutritional needs. "
-        
-        insights += "Your plan adapts in real-time based on your biometric feedback and neural patterns."
-        
-        # Generate motivation message
-        motivation_messages = [
-            "Your wellness journey is unique, and our quantum-enhanced AI is here to support every step forward!",
-            "Every day is an opportunity to optimize your well-being with cutting-edge 2070 technology at your service.",
-            "Your commitment to wellness activates our most advanced algorithms - together we'll achieve optimal health!",
-            "Neural patterns show great potential for growth - let's unlock your wellness achievements together!"
-        ]
-        
-        motivation = random.choice(motivation_messages)
-        
-        return {
-            "mental_health": mental_health,
-            "fitness": fitness,
-            "nutrition": nutrition,
-            "personalized_insights": insights,
-            "motivation_message": motivation
-        }
+        """Rule-based fallback wellness plan if AI fails (see fallback_rules.py)"""
+        return self.fallback.plan(user_data, feelings_description)
@@ -1,49 +1,155 @@
 """
 app.py  –  Neural-Wellness 2070
 ────────────────────────────────────────────────────────────────────
-• Flask + SQLAlchemy + Flask-Login + Bcrypt
+• Flask + SQLAlchemy + Flask-Login + bcrypt (hashed off the request threads – auth.py)
+• create_app() factory; routes and CLI commands live on the `main` blueprint
+• Cheap to import: no app is built at import (wsgi.py does that), the
+  Gemini client, bcrypt pool and job workers start on first use, and the
+  schema / seed data come from `flask init-db`
 • Duplicate-safe registration
-• AI plan / feeling / mood APIs unchanged
+• AI plan generation queued to background workers (jobs.py)
+• Old logs / inactive plans moved to a column archive by `flask archive-logs` (archive.py)
 """
 
 from flask import (
-    Flask, render_template, url_for, flash,
-    redirect, request, jsonify
+    Blueprint, Flask, current_app, render_template, url_for, flash,
+    redirect, request, jsonify, Response, stream_with_context
 )
-from flask_sqlalchemy import SQLAlchemy
 from flask_login import (
     LoginManager, login_user, logout_user,
     current_user, login_required
 )
-from flask_bcrypt import Bcrypt
 from sqlalchemy.exc import IntegrityError
-from datetime import datetime
-import json, os
+from werkzeug.local import LocalProxy
+from datetime import datetime, timedelta
+import hmac
+import json
+import os
+import time
+import click
 
 # ── local modules ────────────────────────────────────────────────
 from config         import Config
-from models         import db, User, WellnessPlan, MoodLog, VRContent, FeelingsLog
-from ai_wellness    import GeminiWellnessAI
-
-# ── Flask & extensions ───────────────────────────────────────────
-app = Flask(__name__)
-app.config.from_object(Config)
+from models         import (
+    db, User, MoodLog, VRContent, FeelingsLog, apply_sqlite_pragmas
+)
+from ai_wellness    import GeminiWellnessAI, make_backend
+from ai_cache       import ResponseCache
+from singleflight   import SingleFlight
+from ai_guard       import ModelGuard, SlotPool
+from jobs           import JobQueue, QueueFull
+from dashboard_cache import DashboardCache
+from migrations     import upgrade_schema, backfill_normalized
+from plan_store     import replace_active_plan, add_feelings, load_active_plan
+from mood_analytics import load_frame, user_trends, summarize_all
+from rollups        import PERIODS, history, compact
+from batch_plans    import BatchPlanRunner, COHORTS
+from auth           import PasswordHasher, UserCache, HasherBusy
+from similarity_index import FeelingsIndex, recent_feelings
+from archive        import Archive, Archiver, archive_cutoff
+from mood_ingest    import (
+    ingest, iter_ndjson, iter_json, EntryError, TooManyEntries, NDJSON_TYPES
+)
+import metrics
+
+main          = Blueprint("main", __name__, cli_group=None)
+login_manager = LoginManager()
+
+# per-app services (see create_app), reachable from views, jobs and CLI commands
+ai_wellness     = LocalProxy(lambda: current_app.extensions["ai_wellness"])
+dashboard_cache = LocalProxy(lambda: current_app.extensions["dashboard_cache"])
+hasher          = LocalProxy(lambda: current_app.extensions["hasher"])
+user_cache      = LocalProxy(lambda: current_app.extensions["user_cache"])
+plan_jobs       = LocalProxy(lambda: current_app.extensions["plan_jobs"])
+plan_streams    = LocalProxy(lambda: current_app.extensions["plan_streams"])
+log_archive     = LocalProxy(lambda: current_app.extensions["log_archive"])
+
+# ── app factory ──────────────────────────────────────────────────
+def create_app(config=Config):
+    app = Flask(__name__)
+    app.config.from_object(config)
+
+    db.init_app(app)
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config["SQLITE_PRAGMAS"])
+        if app.config["METRICS_ENABLED"]:
+            metrics.instrument_engine(db.engine)
+    if app.config["METRICS_ENABLED"]:
+        metrics.instrument_app(app, timing_header=app.config["METRICS_TIMING_HEADER"])
+
+    login_manager.init_app(app)
+    login_manager.login_view = "main.login"
+
+    # bcrypt runs in its own processes; logged-in users come from a short-TTL cache
+    hasher     = PasswordHasher.from_config(app.config)
+    user_cache = UserCache.from_config(app.config)
+    user_cache.watch(User)
+
+    # AI helper (identical prompts are served from the cache or share one in-flight call;
+    # near-identical feelings descriptions reuse an earlier analysis)
+    ai_wellness = GeminiWellnessAI(
+        cache        = ResponseCache.from_config(app.config),
+        singleflight = SingleFlight.from_config(app.config),
+        guard        = ModelGuard.from_config(app.config),
+        max_workers  = app.config["AI_MAX_WORKERS"],
+        call_timeout = app.config["AI_CALL_TIMEOUT"],
+        backend      = make_backend(app.config),    # AI_BACKEND=local → offline stand-in
+        similar      = FeelingsIndex.from_config(app.config)
+    )
 
-db.init_app(app)
-bcrypt = Bcrypt(app)
+    # dashboard read model (invalidated on every write for the user)
+    dashboard_cache = DashboardCache.from_config(app.config)
 
-login_manager            = LoginManager(app)
-login_manager.login_view = "login"
+    plan_jobs = JobQueue(
+        app, run_plan_job,
+        workers        = app.config["AI_JOB_WORKERS"],
+        max_depth      = app.config["AI_JOB_MAX_DEPTH"],
+        stale_after    = app.config["AI_JOB_STALE_AFTER"],
+        poll_interval  = app.config["AI_JOB_POLL_INTERVAL"],
+        sweep_interval = app.config["AI_JOB_SWEEP_INTERVAL"]
+    )
 
-# AI helper
-ai_wellness = GeminiWellnessAI()
+    # a plan stream pins a request thread for the whole model call – cap them
+    plan_streams = SlotPool(app.config["AI_STREAM_MAX_CONCURRENT"])
+
+    # history older than the archive horizon lives in column files, not in the DB
+    log_archive = Archive(os.path.join(app.instance_path, app.config["ARCHIVE_DIR"]))
+
+    app.extensions.update(ai_wellness=ai_wellness, dashboard_cache=dashboard_cache,
+                          hasher=hasher, user_cache=user_cache, plan_jobs=plan_jobs,
+                          plan_streams=plan_streams, log_archive=log_archive)
+
+    # background plan workers start with the first request (and then pick up
+    # anything left queued by a restart) – not at import, so forking servers stay cheap;
+    # so does the load of recent analyses into the similarity index
+    def load_feelings():
+        with app.app_context():
+            canned = ai_wellness.fallback_feelings_analysis()["emotional_state"]
+            return recent_feelings(app.config["AI_SIMILARITY_WARM"], skip_states=[canned])
+
+    app.before_request(plan_jobs.start)
+    app.before_request(lambda: ai_wellness.similar.warm(load_feelings))
+
+    # 📊  /metrics gauges, read at scrape time
+    metrics.registry.add_collector("ai_cache", ai_wellness.cache.stats, label="tier")
+    metrics.registry.add_collector("ai_guard", ai_wellness.guard.stats)
+    metrics.registry.add_collector("ai_singleflight", ai_wellness.singleflight.stats)
+    metrics.registry.add_collector("ai_similarity", ai_wellness.similar.stats)
+    metrics.registry.add_collector("dashboard_cache", dashboard_cache.stats)
+    metrics.registry.add_collector("password_hasher", hasher.stats)
+    metrics.registry.add_collector("user_cache", user_cache.stats)
+    metrics.registry.add_collector("plan_jobs", plan_jobs.stats)
+    metrics.registry.add_collector("plan_streams", plan_streams.stats)
+
+    app.register_blueprint(main)
+    return app
 
 @login_manager.user_loader
 def load_user(uid):
-    return User.query.get(int(uid))
+    return user_cache.get(int(uid), lambda user_id: db.session.get(User, user_id))
 
 # Jinja filter to safely load JSON
-@app.template_filter("from_json")
+@main.app_template_filter("from_json")
 def from_json_filter(value):
     try:
         return json.loads(value) if value else []
@@ -51,15 +157,15 @@ def from_json_filter(value):
         return []
 
 # ── Pages ────────────────────────────────────────────────────────
-@app.route("/")
+@main.route("/")
 def home():
     return render_template("home.html")
 
 # 1️⃣  REGISTER  – duplicate-safe
-@app.route("/register", methods=["GET", "POST"])
+@main.route("/register", methods=["GET", "POST"])
 def register():
     if current_user.is_authenticated:
-        return redirect(url_for("dashboard"))
+        return redirect(url_for("main.dashboard"))
 
     if request.method == "POST":
         username = request.form["username"].strip()
@@ -71,9 +177,13 @@ def register():
             (User.email==email) | (User.username==username)
         ).first():
             flash("Username or e-mail already registered.", "danger")
-            return redirect(url_for("register"))
+            return redirect(url_for("main.register"))
 
-        pw_hash = bcrypt.generate_password_hash(raw_pw).decode("utf-8")
+        try:
+            pw_hash = hasher.hash(raw_pw)
+        except HasherBusy:
+            flash("We're handling a lot of sign-ups – please try again in a moment.", "warning")
+            return render_template("register.html"), 503, {"Retry-After": "5"}
         user    = User(
             username      = username,
             email         = email,
@@ -89,146 +199,429 @@ def register():
         except IntegrityError:                # last-chance defence
             db.session.rollback()
             flash("Username or e-mail already registered.", "danger")
-            return redirect(url_for("register"))
+            return redirect(url_for("main.register"))
 
         flash("Account created! Please log in.", "success")
-        return redirect(url_for("login"))
+        return redirect(url_for("main.login"))
 
     return render_template("register.html")
 
 # 2️⃣  LOGIN
-@app.route("/login", methods=["GET", "POST"])
+@main.route("/login", methods=["GET", "POST"])
 def login():
     if current_user.is_authenticated:
-        return redirect(url_for("dashboard"))
+        return redirect(url_for("main.dashboard"))
 
     if request.method == "POST":
         user = User.query.filter_by(
             email=request.form["email"].strip().lower()
         ).first()
 
-        if user and bcrypt.check_password_hash(
-            user.password, request.form["password"]
-        ):
+        try:
+            ok, new_hash = hasher.verify(user.password, request.form["password"]) \
+                           if user else (False, None)
+        except HasherBusy:
+            flash("We're handling a lot of log-ins – please try again in a moment.", "warning")
+            return render_template("login.html"), 503, {"Retry-After": "5"}
+
+        if ok:
+            if new_hash:                  # BCRYPT_LOG_ROUNDS changed since this hash was made
+                user.password = new_hash
+                db.session.commit()
             login_user(user)
-            return redirect(url_for("dashboard"))
+            return redirect(url_for("main.dashboard"))
 
         flash("Invalid e-mail or password.", "danger")
 
     return render_template("login.html")
 
-# 3️⃣  DASHBOARD
-@app.route("/dashboard")
-@login_required
-def dashboard():
-    plan_row = WellnessPlan.query.filter_by(
-        user_id=current_user.id, is_active=True
-    ).first()
+# 3️⃣  DASHBOARD  (served from a per-user snapshot – see dashboard_cache.py)
+def load_dashboard_snapshot(user_id):
+    """Everything the dashboard shows for a user, as plain Python data"""
+    plan = load_active_plan(user_id)     # one joined query, no JSON to parse
 
-    plan = None
-    if plan_row:
-        try:
-            plan = {
-                "mental_health_plan" : json.loads(plan_row.mental_health_plan) or [],
-                "fitness_plan"       : json.loads(plan_row.fitness_plan)       or [],
-                "nutrition_plan"     : json.loads(plan_row.nutrition_plan)     or [],
-                "personalized_insights" : plan_row.personalized_insights or "",
-                "motivation_message"    : plan_row.motivation_message    or ""
-            }
-        except (ValueError, TypeError):
-            plan = None
-
-    moods     = MoodLog.query.filter_by(user_id=current_user.id)\
+    # only indexed columns – answered from ix_mood_log_user_date alone
+    moods     = db.session.query(
+                    MoodLog.mood_score, MoodLog.stress_level,
+                    MoodLog.energy_level, MoodLog.log_date
+                ).filter(MoodLog.user_id == user_id)\
                   .order_by(MoodLog.log_date.desc()).limit(7).all()
-    feelings  = FeelingsLog.query.filter_by(user_id=current_user.id)\
+    feelings  = FeelingsLog.query.filter_by(user_id=user_id)\
                   .order_by(FeelingsLog.created_date.desc()).limit(3).all()
-    vr_items  = VRContent.query.limit(3).all()
+
+    return {
+        "plan"    : plan,
+        "moods"   : [{"mood_score"  : m.mood_score,
+                      "stress_level": m.stress_level,
+                      "energy_level": m.energy_level,
+                      "log_date"    : m.log_date} for m in moods],
+        "feelings": [{"feelings_text": f.feelings_text,
+                      "created_date" : f.created_date} for f in feelings]
+    }
+
+def load_vr_catalog():
+    return [{"id"         : v.id,
+             "title"      : v.title,
+             "description": v.description,
+             "duration"   : v.duration} for v in VRContent.query.limit(3).all()]
+
+@main.route("/dashboard")
+@login_required
+def dashboard():
+    snap = dashboard_cache.snapshot(current_user.id, load_dashboard_snapshot)
 
     return render_template(
         "dashboard.html",
-        plan=plan, moods=moods,
-        feelings=feelings, vr_content=vr_items
+        plan=snap["plan"], moods=snap["moods"],
+        feelings=snap["feelings"],
+        vr_content=dashboard_cache.vr_catalog(load_vr_catalog)
     )
 
-# 4️⃣  AI PLAN GENERATION  (unchanged)
-@app.route("/api/generate-ai-wellness-plan", methods=["POST"])
+# 4️⃣  AI PLAN GENERATION  (SSE stream, or queued job – see jobs.py)
+def save_generated_plan(user_id, desc, ai_out, feelings):
+    """Persist a generated plan (and optional feelings log) for a user"""
+    for attempt in (1, 2):
+        try:
+            # optional feelings log
+            if desc:
+                add_feelings(user_id, desc, feelings)
+
+            # deactivate the old plan and save the new one (items go to
+            # wellness_plan_item) in one transaction
+            replace_active_plan(user_id, ai_out)
+            db.session.commit()
+            break
+        except IntegrityError:
+            # a concurrent save (stream + job) activated its plan first – ours replaces it
+            db.session.rollback()
+            if attempt == 2:
+                raise
+    dashboard_cache.invalidate(user_id)
+
+def plan_user_data(data):
+    """Current user's profile + slider values, as sent to the AI"""
+    return {
+        "age"          : current_user.age,
+        "fitness_level": current_user.fitness_level,
+        "health_goals" : current_user.health_goals,
+        "mood_score"   : data.get("mood_score", 5),
+        "stress_level" : data.get("stress_level", 5),
+        "energy_level" : data.get("energy_level", 5)
+    }
+
+def run_plan_job(user_id, payload):
+    """JobQueue handler – runs on a worker thread inside an app context"""
+    desc = payload["feelings_description"]
+
+    # plan + optional feelings analysis run concurrently
+    ai_out, feelings = ai_wellness.generate_plan_with_analysis(payload["user_data"], desc,
+                                                             user_id=user_id)
+    save_generated_plan(user_id, desc, ai_out, feelings)
+    return ai_out
+
+@main.route("/api/generate-ai-wellness-plan", methods=["POST"])
 @login_required
 def generate_plan():
     try:
         data = request.get_json()
 
-        user_data = {
-            "age"          : current_user.age,
-            "fitness_level": current_user.fitness_level,
-            "health_goals" : current_user.health_goals,
-            "mood_score"   : data.get("mood_score", 5),
-            "stress_level" : data.get("stress_level", 5),
-            "energy_level" : data.get("energy_level", 5)
-        }
-
-        desc   = data.get("feelings_description", "")
-        ai_out = ai_wellness.generate_wellness_plan(user_data, desc)
-
-        # optional feelings log
-        if desc:
-            feelings = ai_wellness.analyze_feelings(desc)
-            db.session.add(
-                FeelingsLog(
-                    user_id=current_user.id,
-                    feelings_text=desc,
-                    ai_analysis=json.dumps(feelings)
-                )
-            )
-
-        # deactivate old plans
-        WellnessPlan.query.filter_by(
-            user_id=current_user.id, is_active=True
-        ).update({"is_active": False})
-
-        # save new plan
-        db.session.add(
-            WellnessPlan(
-                user_id=current_user.id,
-                mental_health_plan = json.dumps(ai_out["mental_health"]),
-                fitness_plan       = json.dumps(ai_out["fitness"]),
-                nutrition_plan     = json.dumps(ai_out["nutrition"]),
-                personalized_insights = ai_out["personalized_insights"],
-                motivation_message    = ai_out["motivation_message"]
-            )
-        )
-        db.session.commit()
-
-        return jsonify({"success": True, "plan": ai_out})
+        job_id = plan_jobs.submit(current_user.id, {
+            "user_data"           : plan_user_data(data),
+            "feelings_description": data.get("feelings_description", "")
+        })
+    except QueueFull:
+        resp = jsonify({"success": False,
+                        "error": "AI engine is busy – please retry in a few seconds."})
+        resp.headers["Retry-After"] = "5"
+        return resp, 429
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-# feelings-analysis and mood-log endpoints unchanged …
+    return jsonify({
+        "success" : True,
+        "job_id"  : job_id,
+        "status"  : "queued",
+        "poll_url": url_for("main.plan_job_status", job_id=job_id)
+    }), 202
+
+@main.route("/api/generate-ai-wellness-plan/stream", methods=["POST"])
+@login_required
+def stream_plan():
+    """Server-Sent Events: plan items are pushed as soon as the model closes them.
+
+    At most AI_STREAM_MAX_CONCURRENT streams run at once; beyond that the
+    answer is 429 and the browser queues the plan as a job instead.
+    """
+    data = request.get_json() or {}
+    user_id = current_user.id
+    desc    = data.get("feelings_description", "")
+    user_data = plan_user_data(data)
+
+    if not plan_streams.try_acquire():
+        resp = jsonify({"success": False,
+                        "error": "Too many plans are streaming – queue this one instead."})
+        resp.headers["Retry-After"] = "5"
+        return resp, 429
+
+    def sse(event, payload):
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    def events():
+        # one deadline for the request: the analysis gets whatever the stream left of it
+        deadline = time.monotonic() + ai_wellness.call_timeout
+        # feelings analysis runs alongside the streamed plan
+        analysis = ai_wellness.executor.submit(ai_wellness.analyze_feelings, desc, user_id) if desc else None
+
+        for event in ai_wellness.stream_wellness_plan(user_data, desc):
+            if event[0] == "item":
+                yield sse("item", {"section": event[1], "index": event[2], "text": event[3]})
+            elif event[0] == "field":
+                yield sse("field", {"name": event[1], "value": event[2]})
+            else:
+                ai_out = event[1]
+
+        feelings = None
+        if analysis is not None:
+            try:
+                feelings = analysis.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                print(f"Feelings analysis error: {e!r}")
+                feelings = ai_wellness.fallback_feelings_analysis()
+
+        try:
+            save_generated_plan(user_id, desc, ai_out, feelings)
+        except Exception as e:
+            db.session.rollback()
+            yield sse("error", {"error": str(e)})
+            return
+        yield sse("done", {"plan": ai_out})
+
+    # the slot is held until the server closes the response, streamed or not
+    resp = Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    resp.call_on_close(plan_streams.release)
+    return resp
+
+@main.route("/api/jobs/<job_id>")
+@login_required
+def plan_job_status(job_id):
+    job = plan_jobs.get(job_id, current_user.id)
+    if job is None:
+        return jsonify({"success": False, "error": "Unknown job"}), 404
+
+    out = {"success": job.status != "failed", "job_id": job.id, "status": job.status}
+    if job.status == "done":
+        out["plan"] = json.loads(job.result)
+    elif job.status == "failed":
+        out["error"] = job.error
+    return jsonify(out)
+
+# 📈  MOOD TRENDS  (vectorised over the whole history – see mood_analytics.py)
+MAX_DAYS = 36500              # longest "last N days" window; far beyond it utcnow() - N overflows
+
+@main.route("/api/mood-trends")
+@login_required
+def mood_trends():
+    days   = request.args.get("days", 90, type=int)
+    window = request.args.get("window", current_app.config["MOOD_TRENDS_WINDOW"], type=int)
+    alpha  = request.args.get("alpha", current_app.config["MOOD_TRENDS_ALPHA"], type=float)
+    if window < 1 or not 0 < alpha <= 1:
+        return jsonify({"success": False, "error": "window must be ≥ 1 and alpha in (0, 1]"}), 400
+    if days > MAX_DAYS:
+        return jsonify({"success": False, "error": f"days must be at most {MAX_DAYS}"}), 400
+
+    since = datetime.utcnow() - timedelta(days=days) if days > 0 else None
+    frame = load_frame([current_user.id], since=since)
+    return jsonify({"success": True,
+                    **user_trends(frame, window, alpha, current_app.config["MOOD_ANOMALY_Z"])})
+
+@main.route("/api/mood-history")
+@login_required
+def mood_history():
+    """Long-range chart data from the daily / weekly rollups – see rollups.py"""
+    period = request.args.get("period", "day")
+    days   = request.args.get("days", 365 if period == "week" else 90, type=int)
+    if period not in PERIODS:
+        return jsonify({"success": False, "error": f"period must be one of {', '.join(PERIODS)}"}), 400
+    if days > MAX_DAYS:
+        return jsonify({"success": False, "error": f"days must be at most {MAX_DAYS}"}), 400
+
+    since = datetime.utcnow().date() - timedelta(days=days) if days > 0 else None
+    return jsonify({"success": True, "period": period,
+                    "rows": history(current_user.id, period, since)})
+
+# 📥  MOOD LOGS  (slider form, or bulk sync from devices – see mood_ingest.py)
+@main.route("/api/log-mood", methods=["POST"])
+@login_required
+def log_mood():
+    data = request.get_json(silent=True) or {}
+    result = ingest(current_user.id, [(1, data)], max_entries=1, require_date=False,
+                    not_before=log_archive.horizon())
+    if not result["accepted"]:
+        error = result["errors"][0]["error"] if result["errors"] else "Entry already logged"
+        return jsonify({"success": False, "error": error}), 400
+
+    dashboard_cache.invalidate(current_user.id)
+    return jsonify({"success": True, "message": "Mood, stress and energy levels recorded."})
+
+@main.route("/api/log-mood/bulk", methods=["POST"])
+@login_required
+def log_mood_bulk():
+    """NDJSON or JSON array of entries; each needs a log_date (ISO-8601 or epoch seconds)"""
+    user_id = current_user.id
+    try:
+        if request.mimetype in NDJSON_TYPES:
+            entries = iter_ndjson(request.stream)          # validated as it arrives
+        else:
+            payload = request.get_json(silent=True)
+            if payload is None:
+                return jsonify({"success": False, "error": "Body must be NDJSON or JSON"}), 400
+            entries = iter_json(payload)
+        result = ingest(user_id, entries,
+                        max_entries = current_app.config["MOOD_BULK_MAX_ENTRIES"],
+                        chunk_size  = current_app.config["MOOD_BULK_CHUNK_SIZE"],
+                        not_before  = log_archive.horizon())
+    except TooManyEntries as e:
+        return jsonify({"success": False, "error": str(e)}), 413
+    except EntryError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    if result["accepted"]:
+        dashboard_cache.invalidate(user_id)
+    result.pop("rows")
+    return jsonify({"success": True, **result})
+
+# feelings-analysis endpoint unchanged …
 # voice-command endpoint unchanged …
 
+# 📊  METRICS  (Prometheus text format – see metrics.py)
+@main.route("/metrics")
+def metrics_endpoint():
+    # latency / error / AI stats are not public: without a token there is no endpoint
+    token = current_app.config["METRICS_TOKEN"]
+    if not current_app.config["METRICS_ENABLED"] or not token:
+        return "not found\n", 404
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return "unauthorized\n", 401
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
+
 # 5️⃣  LOGOUT
-@app.route("/logout")
+@main.route("/logout")
 def logout():
     logout_user()
-    return redirect(url_for("home"))
-
-# ── create tables & sample VR on first run ───────────────────────
-with app.app_context():
-    db.create_all()
-
+    return redirect(url_for("main.home"))
+
+# ── CLI ──────────────────────────────────────────────────────────
+@main.cli.command("backfill-normalized")
+def backfill_normalized_command():
+    """Convert legacy JSON plan / feelings columns to the normalised tables"""
+    plans, feelings = backfill_normalized()
+    print(f"converted {plans} plans and {feelings} feelings logs")
+
+@main.cli.command("mood-trends")
+@click.option("--days", default=0, type=click.IntRange(max=MAX_DAYS),
+              help="Only logs from the last N days (0 = all history).")
+@click.option("--output", type=click.File("w"), default="-", help="JSON-lines file (default stdout).")
+def mood_trends_command(days, output):
+    """Per-user trend summary for every user, one JSON line each"""
+    since = datetime.utcnow() - timedelta(days=days) if days > 0 else None
+    frame = load_frame(since=since)
+    config = current_app.config
+    for row in summarize_all(frame, config["MOOD_TRENDS_WINDOW"], config["MOOD_ANOMALY_Z"]):
+        output.write(json.dumps(row) + "\n")
+
+@main.cli.command("compact-rollups")
+@click.option("--days", default=0, type=click.IntRange(max=MAX_DAYS),
+              help="Rebuild only the last N days (0 = all history).")
+def compact_rollups_command(days):
+    """Rebuild the mood / feelings rollup tables from the raw logs"""
+    since = datetime.utcnow().date() - timedelta(days=days) if days > 0 else None
+    horizon = log_archive.horizon()
+    if horizon is not None and (since is None or since < horizon.date()):
+        since = horizon.date()        # raw logs before it are archived; keep their rollups
+        print(f"rollups before {since} are kept (archived history)")
+    moods, feelings = compact(since)
+    print(f"wrote {moods} mood and {feelings} feelings rollup rows")
+
+@main.cli.command("batch-plans")
+@click.option("--cohort", type=click.Choice(list(COHORTS)), default="high-stress", show_default=True)
+@click.option("--threshold", type=int, help="Override the cohort's cut-off (e.g. stress ≥ N).")
+@click.option("--resume", "run_id", help="Continue an interrupted run from its checkpoint.")
+@click.option("--limit", type=int, help="Stop after this many users (resume later).")
+def batch_plans_command(cohort, threshold, run_id, limit):
+    """Regenerate wellness plans for a whole user cohort.
+
+    Runs in its own process: the web workers' dashboard caches can't be
+    reached from here, so they show the new plans once DASHBOARD_CACHE_TTL
+    has passed.
+    """
+    # the runner's pool threads have no app context – hand them the real object
+    runner = BatchPlanRunner.from_config(current_app.extensions["ai_wellness"], current_app.config)
+    run = runner.resume(run_id) if run_id else runner.start(cohort, threshold)
+    print(f"batch run {run.id}: cohort {run.cohort} (threshold {run.threshold}), "
+          f"{run.total} users, resuming after user {run.last_user_id}")
+    run = runner.run(run, limit=limit)
+    print(f"batch run {run.id} {run.status}: {run.processed}/{run.total} users, "
+          f"{run.skipped or 0} skipped (fallback answers keep the current plan)")
+
+@main.cli.command("archive-logs")
+@click.option("--days", type=int, help="Archive history older than N days (default ARCHIVE_AFTER_DAYS).")
+@click.option("--vacuum", is_flag=True, help="VACUUM afterwards to return the space to the OS.")
+def archive_logs_command(days, vacuum):
+    """Move old mood / feelings logs and inactive plans into the column archive"""
+    days = current_app.config["ARCHIVE_AFTER_DAYS"] if days is None else days
+    cutoff = archive_cutoff(days)
+    archiver = Archiver(log_archive.path, current_app.config["ARCHIVE_CHUNK_SIZE"])
+    print(f"archiving history before {cutoff:%Y-%m-%d} into {log_archive.path}")
+    counts = archiver.run(cutoff, progress=lambda table, rows: print(f"  {table}: {rows} rows"))
+    print(", ".join(f"{rows} {table}" for table, rows in counts.items()))
+    for table, stats in log_archive.stats().items():
+        print(f"  {table}: {stats['rows']} rows in {stats['parts']} parts, "
+              f"{stats['bytes'] / 1e6:.1f} MB ({stats['raw_bytes'] / 1e6:.1f} MB uncompressed)")
+    if vacuum:
+        db.session.close()
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+        print("vacuumed")
+
+# ── schema & seed data (explicit, once per database) ─────────────
+VR_SEED = [
+    dict(title="Neural Calm Forest", content_type="meditation",
+         description="Forest meditation with biometric feedback",
+         duration=15, difficulty_level="beginner"),
+    dict(title="Quantum Mindfulness Space", content_type="therapy",
+         description="Quantum-rendered therapy environment",
+         duration=30, difficulty_level="advanced"),
+    dict(title="Holographic Yoga Studio", content_type="exercise",
+         description="AI-guided yoga with neural form correction",
+         duration=45, difficulty_level="intermediate"),
+]
+
+def init_db():
+    """Create / upgrade the schema and seed the VR catalog; safe to re-run"""
+    created = upgrade_schema()    # create_all + missing columns/indexes + JSON backfill
+    seeded = 0
     if not VRContent.query.first():
-        db.session.add_all([
-            VRContent(title="Neural Calm Forest", content_type="meditation",
-                      description="Forest meditation with biometric feedback",
-                      duration=15, difficulty_level="beginner"),
-            VRContent(title="Quantum Mindfulness Space", content_type="therapy",
-                      description="Quantum-rendered therapy environment",
-                      duration=30, difficulty_level="advanced"),
-            VRContent(title="Holographic Yoga Studio", content_type="exercise",
-                      description="AI-guided yoga with neural form correction",
-                      duration=45, difficulty_level="intermediate")
-        ])
+        db.session.add_all([VRContent(**row) for row in VR_SEED])
         db.session.commit()
+        seeded = len(VR_SEED)
+    return created, seeded
+
+@main.cli.command("init-db")
+def init_db_command():
+    """Create or upgrade tables, indexes and rollups; seed the VR catalog"""
+    created, seeded = init_db()
+    print(f"schema up to date ({len(created)} indexes created), {seeded} VR items seeded")
 
 # ── run ──────────────────────────────────────────────────────────
+# No app at import: the bcrypt fork server re-imports the launching script in
+# every worker, and under `python app.py` that is this module. `flask --app app`
+# finds create_app(); servers use wsgi.py (gunicorn wsgi:app).
 if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        init_db()             # dev convenience; deployments run `flask --app app init-db` once
     app.run(debug=True)
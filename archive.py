@@ -0,0 +1,414 @@
+"""
+archive.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Moves old history out of the live database into compressed column
+files, and reads it back for analytics without loading it into SQLite.
+
+• Archiver.run() walks MoodLog, FeelingsLog (+ insights) and inactive
+  WellnessPlan (+ items) rows older than the cutoff in id order, one
+  chunk at a time: read, write one part, delete, commit – the write
+  lock is held only for each chunk's DELETE
+• A part is a directory per table: one .npy per numeric column (narrow
+  dtypes, NULL → -1 / NaT) that np.load can memory-map, and per text
+  column one zlib stream + int64 offsets + a NULL mask
+• Parts are fsynced and renamed into place before their rows are
+  deleted; the manifest names each table's part in flight, so the next
+  run reconciles exactly what a crash left half-done
+• Rollups stay in the database, so history() charts cover archived
+  periods; the archive horizon (a Monday) keeps compact() and bulk
+  mood sync from touching archived time
+• Archive(path) lists parts, memory-maps columns and builds a
+  mood_analytics.MoodFrame from the archived mood logs
+
+Layout:  <dir>/archive.json                        the horizon, parts in flight
+         <dir>/<table>/part-<cutoff>-<first id>-<last id>/
+               meta.json, <column>.npy, <column>.zlib + .offsets.npy + .nulls.npy
+"""
+
+import json
+import os
+import shutil
+import zlib
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import delete, select
+
+from models import (
+    db, MoodLog, FeelingsLog, FeelingsInsight, WellnessPlan, WellnessPlanItem
+)
+from mood_analytics import MoodFrame
+
+MANIFEST = "archive.json"
+NULL_INT = -1                           # stored for NULL in int columns (ids and scores are ≥ 0)
+
+# column kinds → on-disk dtype ("text" columns are compressed streams)
+DTYPES = {"id": "<i8", "small": "<i1", "int": "<i4", "time": "<M8[s]", "bool": "|b1"}
+
+
+class Table:
+    """One archived table: its columns, age column and (optional) child table"""
+
+    def __init__(self, model, columns, age=None, where=None, parent=None, child=None):
+        self.model   = model
+        self.name    = model.__tablename__
+        self.columns = columns          # [(column name, kind)]
+        self.age     = age              # datetime column compared with the cutoff
+        self.where   = where            # extra filter (e.g. inactive plans only)
+        self.parent  = parent           # foreign-key column to the parent table's id
+        self.child   = child            # Table archived and deleted with each chunk
+
+
+INSIGHTS = Table(FeelingsInsight, [("id", "id"), ("feelings_log_id", "id"), ("kind", "text"),
+                                   ("ordinal", "int"), ("text", "text")],
+                 parent="feelings_log_id")
+PLAN_ITEMS = Table(WellnessPlanItem, [("id", "id"), ("plan_id", "id"), ("category", "text"),
+                                      ("ordinal", "int"), ("text", "text")],
+                   parent="plan_id")
+
+TABLES = {
+    "mood_log": Table(MoodLog, [("id", "id"), ("user_id", "int"), ("log_date", "time"),
+                                ("mood_score", "small"), ("stress_level", "small"),
+                                ("energy_level", "small"), ("notes", "text")],
+                      age="log_date"),
+    "feelings_log": Table(FeelingsLog, [("id", "id"), ("user_id", "int"), ("created_date", "time"),
+                                        ("feelings_text", "text"), ("emotional_state", "text"),
+                                        ("empathy_message", "text"), ("ai_analysis", "text")],
+                          age="created_date", child=INSIGHTS),
+    "wellness_plan": Table(WellnessPlan, [("id", "id"), ("user_id", "int"), ("created_date", "time"),
+                                          ("is_active", "bool"), ("personalized_insights", "text"),
+                                          ("motivation_message", "text"),
+                                          ("mental_health_plan", "text"), ("fitness_plan", "text"),
+                                          ("nutrition_plan", "text")],
+                           age="created_date", where=WellnessPlan.is_active == False, child=PLAN_ITEMS),
+}
+ALL_TABLES = {t.name: t for t in (*TABLES.values(), INSIGHTS, PLAN_ITEMS)}
+
+
+def archive_cutoff(days, now=None):
+    """Midnight of the Monday on or before `days` ago – rollup weeks are never split"""
+    day = (now or datetime.utcnow()).date() - timedelta(days=days)
+    day -= timedelta(days=day.weekday())
+    return datetime.combine(day, datetime.min.time())
+
+
+# ── writing parts ────────────────────────────────────────────────
+def _encode(values, kind):
+    if kind == "time":
+        return np.array(values, dtype="datetime64[s]")          # None → NaT
+    if kind == "bool":
+        return np.array([bool(v) for v in values], dtype=DTYPES[kind])
+    return np.array([NULL_INT if v is None else v for v in values], dtype=DTYPES[kind])
+
+
+def _encode_text(values):
+    """(zlib bytes, offsets, nulls) – row i is bytes offsets[i]:offsets[i+1] of the stream"""
+    pieces = [b"" if v is None else v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(values) + 1, dtype="<i8")
+    np.cumsum([len(p) for p in pieces], out=offsets[1:])
+    nulls = np.array([v is None for v in values], dtype=bool)
+    return zlib.compress(b"".join(pieces), 6), offsets, nulls
+
+
+def _fsync(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_part(directory, table, rows, meta):
+    """Write rows (tuples in table.columns order) as a part under `directory`.tmp; returns that path"""
+    tmp = directory + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    columns = list(zip(*rows)) if rows else [()] * len(table.columns)
+    raw = packed = 0
+    for (name, kind), values in zip(table.columns, columns):
+        if kind == "text":
+            blob, offsets, nulls = _encode_text(values)
+            with open(os.path.join(tmp, f"{name}.zlib"), "wb") as f:
+                f.write(blob)
+            np.save(os.path.join(tmp, f"{name}.offsets.npy"), offsets)
+            np.save(os.path.join(tmp, f"{name}.nulls.npy"), nulls)
+            raw += int(offsets[-1])
+            packed += len(blob) + offsets.nbytes + nulls.nbytes
+        else:
+            array = _encode(values, kind)
+            np.save(os.path.join(tmp, f"{name}.npy"), array)
+            raw += array.nbytes
+            packed += array.nbytes
+    meta = dict(meta, table=table.name, rows=len(rows), raw_bytes=raw, bytes=packed,
+                columns=dict(table.columns))
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=1)
+    for name in os.listdir(tmp):
+        _fsync(os.path.join(tmp, name))
+    return tmp
+
+
+def _publish(tmp):
+    os.replace(tmp, tmp[:-len(".tmp")])
+    _fsync(os.path.dirname(tmp))
+
+
+# ── archiving ────────────────────────────────────────────────────
+class Archiver:
+    def __init__(self, path, chunk_size=5000):
+        self.path       = path
+        self.chunk_size = chunk_size
+        self.archive    = Archive(path)    # manifest: horizon + parts in flight
+
+    def _select(self, table):
+        return select(*(table.model.__table__.c[name] for name, _ in table.columns))
+
+    def _delete(self, table, ids):
+        model = table.model
+        if table.child is not None:
+            child = table.child.model
+            db.session.execute(delete(child).where(child.__table__.c[table.child.parent].in_(ids)))
+        db.session.execute(delete(model).where(model.id.in_(ids)))
+
+    def reconcile(self):
+        """Finish or undo what an interrupted run left behind; returns rows deleted"""
+        if not os.path.isdir(self.path):
+            return 0
+        for table in TABLES.values():
+            for t in (table, table.child):
+                if t is None or not os.path.isdir(os.path.join(self.path, t.name)):
+                    continue
+                for name in os.listdir(os.path.join(self.path, t.name)):
+                    if name.endswith(".tmp"):               # never published: rows are still live
+                        shutil.rmtree(os.path.join(self.path, t.name, name))
+            if table.child is not None:
+                # a child part is published first; without its parent part it is an orphan
+                parents = set(_part_names(self.path, table.name))
+                for name in _part_names(self.path, table.child.name):
+                    if name not in parents:
+                        shutil.rmtree(os.path.join(self.path, table.child.name, name))
+
+        deleted = 0
+        pending = self.archive.pending()
+        for table in TABLES.values():
+            name = pending.get(table.name)
+            if name is None or name not in _part_names(self.path, table.name):
+                continue                        # nothing in flight, or never published
+            # the part recorded before it was written is the only one whose DELETE may
+            # not have committed; the age filter keeps a row that later reused an id out
+            part = Part(os.path.join(self.path, table.name, name))
+            age = table.model.__table__.c[table.age]
+            live = db.session.execute(
+                select(table.model.id).where(table.model.id.in_(part.array("id").tolist()),
+                                             age < datetime.fromisoformat(part.meta["cutoff"]))
+            ).scalars().all()
+            if live:
+                self._delete(table, live)
+                db.session.commit()
+                deleted += len(live)
+        for table_name in pending:
+            self.archive.set_pending(table_name, None)
+        return deleted
+
+    def archive_table(self, table, cutoff, progress=None):
+        """Move every `table` row older than `cutoff`; returns (rows, child rows)"""
+        age = table.model.__table__.c[table.age]
+        stmt = self._select(table).where(age < cutoff)
+        if table.where is not None:
+            stmt = stmt.where(table.where)
+
+        total = child_total = 0
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                stmt.where(table.model.id > last_id).order_by(table.model.id).limit(self.chunk_size)
+            ).all()
+            if not rows:
+                break
+            ids = [row[0] for row in rows]
+            last_id = ids[-1]
+            children = []
+            if table.child is not None:
+                fk = table.child.model.__table__.c[table.child.parent]
+                children = db.session.execute(
+                    self._select(table.child).where(fk.in_(ids)).order_by(table.child.model.id)
+                ).all()
+            db.session.commit()             # end the read transaction before the files are written
+
+            name = f"part-{cutoff:%Y%m%d}-{ids[0]:012d}-{ids[-1]:012d}"
+            meta = {"cutoff": cutoff.isoformat(), "created": datetime.utcnow().isoformat(),
+                    "first_id": ids[0], "last_id": ids[-1]}
+            self.archive.set_pending(table.name, name)
+            tmp = write_part(os.path.join(self.path, table.name, name), table, rows, meta)
+            if table.child is not None:
+                child_tmp = write_part(os.path.join(self.path, table.child.name, name),
+                                       table.child, children, meta)
+                _publish(child_tmp)
+            _publish(tmp)
+
+            try:
+                self._delete(table, ids)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            self.archive.set_pending(table.name, None)
+            total += len(rows)
+            child_total += len(children)
+            if progress:
+                progress(table.name, total)
+        return total, child_total
+
+    def run(self, cutoff, progress=None):
+        """Archive every table up to `cutoff` (a Monday, see archive_cutoff()); returns counts"""
+        for table in TABLES.values():
+            for t in (table, table.child):
+                if t is not None:
+                    os.makedirs(os.path.join(self.path, t.name), exist_ok=True)
+        counts = {"reconciled": self.reconcile()}
+        # moved first: from here on bulk sync refuses entries that would land behind the archive
+        self.archive.set_horizon(cutoff)
+        for table in TABLES.values():
+            rows, children = self.archive_table(table, cutoff, progress)
+            counts[table.name] = rows
+            if table.child is not None:
+                counts[table.child.name] = children
+        return counts
+
+
+# ── reading ──────────────────────────────────────────────────────
+def _part_names(path, table):
+    directory = os.path.join(path, table)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory)
+                  if name.startswith("part-") and not name.endswith(".tmp"))
+
+
+class Part:
+    """One archived chunk of a table; arrays are memory-mapped, text decoded on demand"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def array(self, name, mmap=True):
+        """A numeric column (NULL_INT / NaT for NULL); read-only memmap by default"""
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+
+    def text(self, name):
+        """A text column as a list of str / None"""
+        with open(os.path.join(self.path, f"{name}.zlib"), "rb") as f:
+            data = zlib.decompress(f.read())
+        offsets = np.load(os.path.join(self.path, f"{name}.offsets.npy")).tolist()
+        nulls = np.load(os.path.join(self.path, f"{name}.nulls.npy")).tolist()
+        return [None if null else data[start:end].decode("utf-8")
+                for start, end, null in zip(offsets, offsets[1:], nulls)]
+
+
+class Archive:
+    def __init__(self, path):
+        self.path = path
+        self._horizon = (None, None)        # (manifest mtime, horizon)
+
+    def parts(self, table):
+        return [Part(os.path.join(self.path, table, name)) for name in _part_names(self.path, table)]
+
+    def horizon(self):
+        """Datetime before which history lives in the archive, or None (cheap: one stat)"""
+        manifest = os.path.join(self.path, MANIFEST)
+        try:
+            mtime = os.stat(manifest).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._horizon[0]:
+            with open(manifest) as f:
+                value = json.load(f).get("horizon")
+            self._horizon = (mtime, datetime.fromisoformat(value) if value else None)
+        return self._horizon[1]
+
+    def set_horizon(self, cutoff):
+        current = self.horizon()
+        if current is not None and current >= cutoff:
+            return
+        self._write_manifest(dict(self._manifest(), horizon=cutoff.isoformat()))
+
+    def pending(self):
+        """{table: part name} of parts an Archiver was writing / deleting rows for"""
+        return self._manifest().get("pending", {})
+
+    def set_pending(self, table, name):
+        """Record (or with None, clear) the part in flight for `table`"""
+        manifest = self._manifest()
+        pending = manifest.setdefault("pending", {})
+        if name is None:
+            if pending.pop(table, None) is None:
+                return
+        else:
+            pending[table] = name
+        self._write_manifest(manifest)
+
+    def _manifest(self):
+        try:
+            with open(os.path.join(self.path, MANIFEST)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.path, exist_ok=True)
+        tmp = os.path.join(self.path, MANIFEST + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.path, MANIFEST))
+        _fsync(self.path)
+
+    def scan(self, table, columns):
+        """Yield {column: array} per part – numeric columns memory-mapped, text as lists"""
+        kinds = dict(ALL_TABLES[table].columns)
+        for part in self.parts(table):
+            yield {name: part.text(name) if kinds[name] == "text" else part.array(name)
+                   for name in columns}
+
+    def mood_frame(self, user_ids=None, since=None, until=None):
+        """Archived mood logs as a MoodFrame (same shape as mood_analytics.load_frame)"""
+        wanted = None if user_ids is None else np.array(sorted(user_ids), dtype=np.int64)
+        blocks = []
+        for cols in self.scan("mood_log", ("user_id", "log_date", "mood_score",
+                                           "stress_level", "energy_level")):
+            keep = np.ones(len(cols["user_id"]), dtype=bool)
+            if wanted is not None:
+                keep &= np.isin(cols["user_id"], wanted)
+            if since is not None:
+                keep &= cols["log_date"] >= np.datetime64(since, "s")
+            if until is not None:
+                keep &= cols["log_date"] < np.datetime64(until, "s")
+            if not keep.any():
+                continue
+            block = np.empty((int(keep.sum()), 5))
+            ts = cols["log_date"][keep]
+            block[:, 0] = cols["user_id"][keep]
+            block[:, 1] = np.where(np.isnat(ts), np.nan, ts.astype(np.int64))   # NaT rows are dropped
+            for n, name in enumerate(("mood_score", "stress_level", "energy_level"), 2):
+                values = cols[name][keep].astype(np.float64)
+                values[values == NULL_INT] = np.nan
+                block[:, n] = values
+            blocks.append(block)
+        return MoodFrame.from_rows(np.concatenate(blocks) if blocks else np.empty((0, 5)))
+
+    def stats(self):
+        out = {}
+        for table in ALL_TABLES:
+            parts = self.parts(table)
+            if parts:
+                out[table] = {"parts": len(parts),
+                              "rows": sum(len(p) for p in parts),
+                              "raw_bytes": sum(p.meta["raw_bytes"] for p in parts),
+                              "bytes": sum(p.meta["bytes"] for p in parts)}
+        return out
@@ -0,0 +1,244 @@
+"""
+auth.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Login-path helpers that keep request threads free.
+
+• PasswordHasher runs bcrypt in a small process pool (started on the
+  first hash, so importing the app stays cheap); a semaphore
+  bounds hashes in flight and callers wait at most `timeout` before
+  HasherBusy (→ 503), so a login storm queues instead of eating every
+  request thread's CPU. A hash that outlives its caller keeps its slot
+  until the worker finishes, so the bound is on CPU work, not on waiters
+• Workers come from a "forkserver" (password_worker.py preloaded), never
+  from forking the multithreaded app process
+• BCRYPT_LOG_ROUNDS sets the cost; verify() reports hashes made with a
+  different cost so login can transparently rehash them
+• UserCache holds a small read-only snapshot of each logged-in user for
+  Flask-Login's user_loader (short TTL, dropped when the row changes);
+  its SQLAlchemy listeners hold the cache weakly and go away with it
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from password_worker import hash_password, check_password
+
+
+class HasherBusy(Exception):
+    """Raised when no hashing slot frees up within the timeout"""
+
+
+def hash_rounds(pw_hash):
+    """Cost factor of a '$2b$12$…' hash (None if unreadable)"""
+    try:
+        return int(pw_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+# ── hashing ──────────────────────────────────────────────────────
+class PasswordHasher:
+    def __init__(self, rounds=12, workers=2, max_pending=8, timeout=10):
+        self.rounds      = rounds
+        self.workers     = workers          # 0 = hash on the calling thread
+        self.timeout     = timeout          # seconds to wait for a slot + the hash
+        self.busy        = 0                # callers turned away with HasherBusy
+        self.rehashed    = 0
+        self._slots      = threading.BoundedSemaphore(max_pending)
+        self._lock       = threading.Lock()
+        self._pool       = None             # created on first use, per process
+        self._pool_pid   = None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            rounds      = config.get("BCRYPT_LOG_ROUNDS", 12),
+            workers     = config.get("PASSWORD_HASH_WORKERS", 2),
+            max_pending = config.get("PASSWORD_HASH_MAX_PENDING", 8),
+            timeout     = config.get("PASSWORD_HASH_TIMEOUT", 10)
+        )
+
+    def _get_pool(self, broken=None):
+        # by the first hash the app runs request, job and executor threads, and
+        # forking a multithreaded process can copy a lock some other thread
+        # holds – so workers come from a fork server that preloads only bcrypt
+        with self._lock:
+            if self._pool is None or self._pool is broken or self._pool_pid != os.getpid():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload(["password_worker"])
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=context)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, fn, *args):
+        deadline = time.monotonic() + self.timeout
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.busy += 1
+            raise HasherBusy("password hashing is saturated")
+        release = True
+        try:
+            if not self.workers:
+                return fn(*args)
+            pool = self._get_pool()
+            try:
+                future = pool.submit(fn, *args)
+            except BrokenProcessPool:
+                future = self._get_pool(broken=pool).submit(fn, *args)
+            try:
+                return future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                if not future.cancel():
+                    # bcrypt is still running in a worker – the slot is its until it ends
+                    release = False
+                    future.add_done_callback(lambda _: self._slots.release())
+                with self._lock:
+                    self.busy += 1
+                raise HasherBusy("password hashing timed out")
+        finally:
+            if release:
+                self._slots.release()
+
+    def hash(self, password):
+        return self._run(hash_password, password, self.rounds)
+
+    def verify(self, pw_hash, password):
+        """(matches, new hash or None) – a new hash when the stored cost differs from `rounds`"""
+        if not pw_hash or not self._run(check_password, password, pw_hash):
+            return False, None
+        if hash_rounds(pw_hash) == self.rounds:
+            return True, None
+        with self._lock:
+            self.rehashed += 1
+        return True, self.hash(password)
+
+    def stats(self):
+        return {"rounds": self.rounds, "workers": self.workers,
+                "busy": self.busy, "rehashed": self.rehashed}
+
+    def shutdown(self):
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(cancel_futures=True)
+
+
+# ── session user cache ───────────────────────────────────────────
+class SessionUser(UserMixin):
+    """What current_user needs on every request – no password hash, no session"""
+    FIELDS = ("id", "username", "email", "age", "fitness_level", "health_goals", "created_date")
+
+    def __init__(self, user):
+        for name in self.FIELDS:
+            setattr(self, name, getattr(user, name))
+
+
+def _unlisten(listeners):
+    for target, name, fn in listeners:
+        if event.contains(target, name, fn):
+            event.remove(target, name, fn)
+
+
+class UserCache:
+    def __init__(self, ttl=30, max_users=10000):
+        self.ttl       = ttl
+        self.max_users = max_users
+        self.hits      = 0
+        self.misses    = 0
+        self._users    = OrderedDict()      # user_id -> (expires, SessionUser)
+        self._epoch    = 0                  # bumped by every invalidate()
+        self._watched  = {}                 # model -> finalizer removing its listeners
+        self._lock     = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            ttl       = config.get("USER_CACHE_TTL", 30),
+            max_users = config.get("USER_CACHE_MAX_USERS", 10000)
+        )
+
+    def get(self, user_id, loader):
+        """Cached SessionUser, built from loader(user_id) on a miss (None if gone)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._users.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            epoch = self._epoch
+
+        user = loader(user_id)
+        if user is None:
+            return None
+        snapshot = SessionUser(user)
+
+        with self._lock:
+            # a write that landed while we were loading wins
+            if self.ttl > 0 and epoch == self._epoch:
+                self._users[user_id] = (now + self.ttl, snapshot)
+                self._users.move_to_end(user_id)
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._epoch += 1
+            self._users.pop(user_id, None)
+
+    def watch(self, model):
+        """Invalidate on every committed UPDATE / DELETE of a `model` row (ORM flushes).
+
+        Registers once per model; the listeners are global to SQLAlchemy, so
+        they only reference the cache weakly and are removed by unwatch() or
+        when the cache is garbage-collected (e.g. with its app).
+        """
+        if model in self._watched:
+            return
+        cache = weakref.ref(self)
+        key = ("user_cache_dirty", id(self))      # per cache: several apps may share a process
+
+        def dirty(mapper, connection, target):
+            live = cache()
+            if live is None:
+                return
+            session = Session.object_session(target)
+            if session is not None:
+                session.info.setdefault(key, set()).add(target.id)
+            live.invalidate(target.id)
+
+        def committed(session):
+            user_ids = session.info.pop(key, ())
+            live = cache()
+            if live is not None:
+                for user_id in user_ids:
+                    live.invalidate(user_id)
+
+        def rolled_back(session, previous_transaction):
+            session.info.pop(key, None)
+
+        listeners = [(model, "after_update", dirty), (model, "after_delete", dirty),
+                     (Session, "after_commit", committed), (Session, "after_soft_rollback", rolled_back)]
+        for target, name, fn in listeners:
+            event.listen(target, name, fn)
+        finalizer = self._watched[model] = weakref.finalize(self, _unlisten, listeners)
+        finalizer.atexit = False
+
+    def unwatch(self):
+        """Remove every listener watch() registered"""
+        for finalizer in self._watched.values():
+            finalizer()
+        self._watched.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "users": len(self._users)}
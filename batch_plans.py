@@ -0,0 +1,153 @@
+"""
+batch_plans.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Regenerate wellness plans for a whole cohort (e.g. every user whose
+latest mood log shows stress ≥ 7).
+
+• Users are streamed in id order, one keyset-paginated chunk at a time
+• Each chunk is packed into multi-user model requests
+  (GeminiWellnessAI.generate_wellness_plans_batch) run on a bounded pool
+• Per chunk: one UPDATE deactivates the old plans, new plans and items
+  go in with executemany, and the BatchRun checkpoint moves forward –
+  all in the same commit, so an interrupted run resumes where it stopped
+• Users whose plan came from the rule-table fallback (model unavailable,
+  bad answer) keep their current plan; they are counted as skipped
+• The "all" cohort includes users who never logged a mood; their
+  profile gets neutral scores (DEFAULT_SCORE), like the web form's
+"""
+
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+from models import db, User, MoodLog, BatchRun
+from plan_store import add_plans, deactivate_plans
+
+# cohort -> (latest-log column, comparison, default threshold)
+COHORTS = {
+    "high-stress": ("stress_level", "ge", 7),
+    "low-mood"   : ("mood_score",   "le", 4),
+    "low-energy" : ("energy_level", "le", 3),
+    "all"        : (None,           None, None),
+}
+DEFAULT_SCORE = 5                       # slider value for users without a mood log
+
+
+class BatchPlanRunner:
+    def __init__(self, ai, chunk_size=100, pack_size=5, workers=4, on_saved=None):
+        self.ai         = ai                # GeminiWellnessAI
+        self.chunk_size = chunk_size        # users per DB round-trip / commit
+        self.pack_size  = pack_size         # users per model request
+        self.workers    = workers           # concurrent model requests
+        self.on_saved   = on_saved          # on_saved(user_ids) after each commit
+
+    @classmethod
+    def from_config(cls, ai, config, on_saved=None):
+        return cls(
+            ai,
+            chunk_size = config.get("BATCH_CHUNK_SIZE", 100),
+            pack_size  = config.get("BATCH_PACK_SIZE", 5),
+            workers    = config.get("BATCH_WORKERS", 4),
+            on_saved   = on_saved
+        )
+
+    # ── cohort selection ─────────────────────────────────────────
+    def _cohort_query(self, run):
+        """Users with their latest mood log, filtered by the run's cohort"""
+        column, op, _ = COHORTS[run.cohort]
+        # driven from user ids; one index seek per user for its newest log
+        latest = select(MoodLog.id).where(MoodLog.user_id == User.id)\
+                   .order_by(MoodLog.log_date.desc()).limit(1)\
+                   .correlate(User).scalar_subquery()
+
+        query = db.session.query(
+            User.id, User.age, User.fitness_level, User.health_goals,
+            *[func.coalesce(getattr(MoodLog, name), DEFAULT_SCORE).label(name)
+              for name in ("mood_score", "stress_level", "energy_level")]
+        )
+
+        if column is None:
+            return query.outerjoin(MoodLog, MoodLog.id == latest)   # "all": users without logs too
+        value = getattr(MoodLog, column)
+        return query.join(MoodLog, MoodLog.id == latest)\
+                    .filter(value >= run.threshold if op == "ge" else value <= run.threshold)
+
+    def _chunks(self, run):
+        while True:
+            rows = self._cohort_query(run).filter(User.id > run.last_user_id)\
+                       .order_by(User.id).limit(self.chunk_size).all()
+            if not rows:
+                return
+            yield rows
+
+    # ── runs ─────────────────────────────────────────────────────
+    def start(self, cohort, threshold=None):
+        if cohort not in COHORTS:
+            raise ValueError(f"unknown cohort '{cohort}' (choose from {', '.join(COHORTS)})")
+        run = BatchRun(id=uuid.uuid4().hex, cohort=cohort,
+                       threshold=COHORTS[cohort][2] if threshold is None else threshold)
+        run.total = self._cohort_query(run).with_entities(func.count(User.id)).scalar()
+        db.session.add(run)
+        db.session.commit()
+        return run
+
+    def resume(self, run_id):
+        run = db.session.get(BatchRun, run_id)
+        if run is None:
+            raise ValueError(f"unknown batch run '{run_id}'")
+        return run
+
+    def run(self, run, limit=None, progress=print):
+        """Process chunks until the cohort (or `limit` more users) is done"""
+        started, done = time.monotonic(), 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch-plan") as pool:
+            for chunk in self._chunks(run):
+                if limit is not None:
+                    if done >= limit:
+                        return run
+                    chunk = chunk[:limit - done]
+
+                plans = self._generate(pool, chunk)
+                self._save(run, chunk, plans)
+                done += len(chunk)
+
+                rate = done / max(time.monotonic() - started, 1e-9)
+                progress(f"[{run.id}] {run.processed}/{run.total or '?'} users, "
+                         f"{run.skipped or 0} skipped (last id {run.last_user_id}, {rate:.1f} users/s)")
+
+        run.status = "done"
+        db.session.commit()
+        return run
+
+    def _generate(self, pool, chunk):
+        profiles = [{"age"          : row.age,
+                     "fitness_level": row.fitness_level,
+                     "health_goals" : row.health_goals,
+                     "mood_score"   : row.mood_score,
+                     "stress_level" : row.stress_level,
+                     "energy_level" : row.energy_level} for row in chunk]
+        packs = [profiles[n:n + self.pack_size] for n in range(0, len(profiles), self.pack_size)]
+        futures = [pool.submit(self.ai.generate_wellness_plans_batch, pack) for pack in packs]
+        return [plan for future in futures for plan in future.result()]
+
+    def _save(self, run, chunk, plans):
+        # a fallback plan is no better than the plan the user already has
+        saved = [(row.id, plan) for row, (plan, from_model) in zip(chunk, plans) if from_model]
+        user_ids = [user_id for user_id, _ in saved]
+        try:
+            if saved:
+                deactivate_plans(user_ids)
+                add_plans(saved)
+
+            run.last_user_id = chunk[-1].id
+            run.processed   += len(chunk)
+            run.skipped      = (run.skipped or 0) + len(chunk) - len(saved)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if self.on_saved is not None and user_ids:
+            self.on_saved(user_ids)
@@ -0,0 +1,142 @@
+"""
+bench_archive.py  –  live database vs. column archive for old history
+────────────────────────────────────────────────────────────────────
+On a throw-away SQLite database (tuned PRAGMAs) holding `--years` of
+mood / feelings logs for `--users` users:
+
+• load     – load_frame() of the whole history from SQLite
+• archive  – Archiver.run() at a one-year cutoff, then VACUUM
+• reload   – Archive.mood_frame() (memory-mapped parts) + load_frame()
+             of what is still live
+• database size, archive size and the raw size of the archived columns
+• a recent-window query (last 30 days, all users) before and after
+
+    python -m benchmarks.bench_archive [--users 200] [--years 3] [--per-day 2]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import func, insert
+
+from archive import Archive, Archiver, archive_cutoff
+from config import Config
+from models import db, apply_sqlite_pragmas, User, MoodLog, FeelingsLog
+from mood_analytics import load_frame
+
+
+def build_app(path):
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}",
+                      SQLALCHEMY_TRACK_MODIFICATIONS=False,
+                      SQLALCHEMY_ENGINE_OPTIONS=Config.SQLALCHEMY_ENGINE_OPTIONS)
+    db.init_app(app)
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, Config.SQLITE_PRAGMAS)
+        db.create_all()
+    return app
+
+
+def populate(users, days, per_day, seed=3):
+    rng = random.Random(seed)
+    db.session.add_all([User(username=f"arc{n}", email=f"arc{n}@bench.test", password="x")
+                        for n in range(users)])
+    db.session.commit()
+    ids = [u.id for u in User.query.all()]
+    start = datetime.utcnow() - timedelta(days=days)
+    moods, feelings = [], []
+    for day in range(days):
+        for user_id in ids:
+            for n in range(per_day):
+                ts = start + timedelta(days=day, hours=8 + n * 6, minutes=rng.randrange(60))
+                moods.append({"user_id": user_id, "log_date": ts, "mood_score": rng.randint(1, 10),
+                              "stress_level": rng.randint(1, 10), "energy_level": rng.randint(1, 10),
+                              "notes": "slept badly, long day at work" if rng.random() < 0.2 else None})
+            if day % 7 == 0:
+                feelings.append({"user_id": user_id, "created_date": start + timedelta(days=day),
+                                 "feelings_text": "stressed about work deadlines and not sleeping well",
+                                 "emotional_state": rng.choice(["anxious", "tired", "calm"]),
+                                 "empathy_message": "Thank you for sharing – one step at a time."})
+        if len(moods) >= 50000:
+            db.session.execute(insert(MoodLog), moods)
+            moods = []
+    db.session.execute(insert(MoodLog), moods)
+    db.session.execute(insert(FeelingsLog), feelings)
+    db.session.commit()
+
+
+def recent_window():
+    since = datetime.utcnow() - timedelta(days=30)
+    return db.session.query(MoodLog.user_id, func.avg(MoodLog.mood_score))\
+        .filter(MoodLog.log_date >= since).group_by(MoodLog.user_id).all()
+
+
+def timed(label, fn, note=""):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {label:22} {(time.perf_counter() - start) * 1000:10.1f} ms  {note}")
+    return result
+
+
+def size(path):
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def tree_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old logs to column files; compare sizes and reads")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--per-day", type=int, default=2, help="mood logs per user per day")
+    parser.add_argument("--keep-days", type=int, default=365)
+    parser.add_argument("--chunk", type=int, default=5000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "archive.db")
+    app = build_app(path)
+    with app.app_context():
+        populate(args.users, int(args.years * 365), args.per_day)
+        total = MoodLog.query.count()
+        db.session.close()
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        before = size(path)
+        print(f"{total:,} mood logs, {args.users} users, {args.years:g} years\n")
+
+        frame = timed("load_frame (all)", load_frame)
+        timed("recent 30 days", recent_window)
+
+        archive_dir = os.path.join(workdir, "archive")
+        archiver = Archiver(archive_dir, args.chunk)
+        counts = timed("archive", lambda: archiver.run(archive_cutoff(args.keep_days)))
+        db.session.close()
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            timed("vacuum", lambda: conn.exec_driver_sql("VACUUM"))
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        archive = Archive(archive_dir)
+        archived = timed("archive.mood_frame", archive.mood_frame)
+        live = timed("load_frame (live)", load_frame)
+        timed("recent 30 days", recent_window)
+        assert len(archived) + len(live) == len(frame), (len(archived), len(live), len(frame))
+
+        stats = archive.stats()
+        raw = sum(s["raw_bytes"] for s in stats.values())
+        print(f"\n  moved {counts['mood_log']:,} mood logs, {counts['feelings_log']:,} feelings logs")
+        print(f"  database {before / 1e6:8.1f} MB → {size(path) / 1e6:.1f} MB")
+        print(f"  archive  {tree_size(archive_dir) / 1e6:8.1f} MB on disk "
+              f"({raw / 1e6:.1f} MB of column data before compression)")
+
+
+if __name__ == "__main__":
+    main()
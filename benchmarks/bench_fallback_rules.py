@@ -0,0 +1,114 @@
+"""
+bench_fallback_rules.py  –  fallback planner throughput
+────────────────────────────────────────────────────────────────────
+Degraded-mode cost per user for:
+
+• legacy   – the old if/elif cascade from GeminiWellnessAI (copied below)
+• plan()   – FallbackPlanner, one user per call (table lookup)
+• plans()  – FallbackPlanner, whole list in one call
+• arrays   – rule_index_arrays() only: rule choice for N users, no dicts
+
+plan() costs about the same as the cascade (≈ 5 µs/user here): building
+one plan's dict and lists dominates, not choosing the rules. plans() picks
+the rules for the whole list in one vectorised lookup and renders each
+distinct cell once (≈ 2 µs/user, a dict copy each); arrays is the rule
+choice alone, for cohort-wide analysis.
+
+    python -m benchmarks.bench_fallback_rules [--users 200000]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from fallback_rules import FallbackPlanner, MOTIVATION_MESSAGES
+
+
+def legacy_fallback_plan(user_data, feelings_description):
+    mood_score = user_data.get('mood_score', 5)
+    stress_level = user_data.get('stress_level', 5)
+    energy_level = user_data.get('energy_level', 5)
+
+    if stress_level >= 7:
+        mental_health = ["Daily neural-feedback meditation with VR forest environment",
+                         "AI-guided deep breathing exercises with biometric monitoring",
+                         "Virtual therapy sessions with holographic wellness counselor"]
+    elif mood_score <= 4:
+        mental_health = ["Mood-enhancing light therapy with circadian rhythm optimization",
+                         "AI-powered journaling with sentiment analysis feedback",
+                         "Brain-wave entrainment sessions for emotional balance"]
+    else:
+        mental_health = ["Daily mindfulness practice with augmented reality guides",
+                         "Neural interface meditation for optimal brain-wave patterns",
+                         "Personalized affirmation therapy via AI voice synthesis"]
+
+    if energy_level <= 3:
+        fitness = ["Gentle movement therapy with robotic assistance",
+                   "Energy-building exercises with real-time biometric feedback",
+                   "Restorative yoga with holographic instructor adaptation"]
+    elif energy_level >= 8:
+        fitness = ["High-intensity quantum-enhanced training protocols",
+                   "Advanced biometric optimization with AI form correction",
+                   "Competitive VR fitness challenges with neural reward systems"]
+    else:
+        fitness = ["Personalized workout routines with holographic personal trainer",
+                   "Smart recovery protocols using nanotechnology sensors",
+                   "Mixed-reality fitness games for sustained motivation"]
+
+    if stress_level >= 6:
+        nutrition = ["Stress-reducing adaptogenic meal plans via molecular gastronomy",
+                     "Real-time cortisol monitoring with smart nutrition adjustments",
+                     "AI-optimized gut microbiome restoration protocols"]
+    else:
+        nutrition = ["Personalized meal optimization based on genetic markers",
+                     "Smart hydration monitoring with electrolyte balance tracking",
+                     "3D-printed custom supplements delivered via drone network"]
+
+    insights = f"Based on your mood score of {mood_score}/10, stress level of {stress_level}/10, and energy level of {energy_level}/10, "
+    if feelings_description:
+        insights += "along with your personal feelings description, our advanced AI has detected patterns that suggest focusing on "
+        if stress_level >= 6:
+            insights += "stress management and emotional regulation. "
+        elif energy_level <= 4:
+            insights += "energy restoration and gentle activation. "
+        else:
+            insights += "maintaining balance while optimizing your wellness journey. "
+    else:
+        insights += "our 2070 wellness algorithms recommend a balanced approach to your mental, physical, and nutritional needs. "
+    insights += "Your plan adapts in real-time based on your biometric feedback and neural patterns."
+
+    return {"mental_health": mental_health, "fitness": fitness, "nutrition": nutrition,
+            "personalized_insights": insights, "motivation_message": random.choice(MOTIVATION_MESSAGES)}
+
+
+def timed(label, users, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:10} {elapsed * 1000:10.1f} ms {elapsed * 1e9 / users:10.0f} ns/user "
+          f"{users / elapsed:14,.0f} users/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fallback planner: cascade vs. rule table")
+    parser.add_argument("--users", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(2070)
+    scores = rng.integers(1, 11, size=(3, args.users))
+    profiles = [{"mood_score": m, "stress_level": s, "energy_level": e}
+                for m, s, e in zip(*scores.tolist())]
+    feelings = ["tired" if n % 2 else "" for n in range(args.users)]
+    planner = FallbackPlanner()
+
+    print(f"{args.users:,} users\n")
+    timed("legacy", args.users, lambda: [legacy_fallback_plan(p, f) for p, f in zip(profiles, feelings)])
+    timed("plan()", args.users, lambda: [planner.plan(p, f) for p, f in zip(profiles, feelings)])
+    timed("plans()", args.users, lambda: planner.plans(profiles, feelings))
+    timed("arrays", args.users, lambda: planner.rule_index_arrays(*scores))
+
+
+if __name__ == "__main__":
+    main()
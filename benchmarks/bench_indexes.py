@@ -0,0 +1,131 @@
+"""
+bench_indexes.py  –  dashboard query latency with / without the indexes
+────────────────────────────────────────────────────────────────────
+Seeds a throw-away SQLite file with synthetic users, mood logs,
+feelings logs and plans, times the dashboard queries with the model
+indexes dropped, then again after migrations.ensure_indexes().
+
+    python -m benchmarks.bench_indexes [--users 2000] [--moods 1000000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from migrations import ensure_indexes
+from models import db, MoodLog, FeelingsLog, WellnessPlan
+
+INDEXES = ("ix_mood_log_user_date", "ix_feelings_log_user_created", "ix_wellness_plan_user_active")
+
+
+def seed(path, users, moods, feelings, plans):
+    conn = sqlite3.connect(path)
+    rng  = random.Random(2070)
+    base = datetime(2024, 1, 1)
+
+    conn.executemany(
+        "INSERT INTO user (id, username, email, password) VALUES (?, ?, ?, ?)",
+        ((u, f"user{u}", f"user{u}@example.com", "x") for u in range(1, users + 1))
+    )
+    conn.executemany(
+        "INSERT INTO mood_log (user_id, mood_score, stress_level, energy_level, notes, log_date)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        ((rng.randint(1, users), rng.randint(1, 10), rng.randint(1, 10), rng.randint(1, 10),
+          "synthetic", base + timedelta(minutes=rng.randint(0, 2_000_000))) for _ in range(moods))
+    )
+    conn.executemany(
+        "INSERT INTO feelings_log (user_id, feelings_text, ai_analysis, created_date) VALUES (?, ?, ?, ?)",
+        ((rng.randint(1, users), "stressed about work deadlines " * 4, "{}",
+          base + timedelta(minutes=rng.randint(0, 2_000_000))) for _ in range(feelings))
+    )
+    # every user gets plan history; only the newest one is active
+    conn.executemany(
+        "INSERT INTO wellness_plan (user_id, mental_health_plan, fitness_plan, nutrition_plan,"
+        " personalized_insights, motivation_message, created_date, is_active)"
+        " VALUES (?, '[]', '[]', '[]', '', '', ?, ?)",
+        ((n % users + 1, base + timedelta(hours=n), n >= plans - users) for n in range(plans))
+    )
+    conn.commit()
+    conn.close()
+
+
+def queries(user_id):
+    return {
+        "active plan": lambda: WellnessPlan.query.filter_by(user_id=user_id, is_active=True).first(),
+        "latest 7 moods": lambda: db.session.query(
+            MoodLog.mood_score, MoodLog.stress_level, MoodLog.energy_level, MoodLog.log_date
+        ).filter(MoodLog.user_id == user_id).order_by(MoodLog.log_date.desc()).limit(7).all(),
+        "latest 3 feelings": lambda: FeelingsLog.query.filter_by(user_id=user_id)
+            .order_by(FeelingsLog.created_date.desc()).limit(3).all(),
+        "deactivate plans": lambda: WellnessPlan.query.filter_by(user_id=user_id, is_active=True)
+            .update({"is_active": False}),
+    }
+
+
+def measure(users, rounds):
+    rng = random.Random(7)
+    samples = {}
+    for _ in range(rounds):
+        for name, fn in queries(rng.randint(1, users)).items():
+            start = time.perf_counter()
+            fn()
+            samples.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+        db.session.rollback()
+    return samples
+
+
+def report(label, samples):
+    print(f"\n{label}")
+    print(f"  {'query':20} {'mean ms':>10} {'p95 ms':>10}")
+    for name, values in samples.items():
+        p95 = statistics.quantiles(values, n=20)[-1] if len(values) > 1 else values[0]
+        print(f"  {name:20} {statistics.mean(values):10.3f} {p95:10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard query latency before/after indexes")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--moods", type=int, default=1_000_000)
+    parser.add_argument("--feelings", type=int, default=200_000)
+    parser.add_argument("--plans", type=int, default=50_000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_indexes.db")
+    app  = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}",
+                      SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as conn:
+            for name in INDEXES:
+                conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+        started = time.perf_counter()
+        seed(path, args.users, args.moods, args.feelings, args.plans)
+        print(f"seeded {args.moods:,} moods / {args.feelings:,} feelings / {args.plans:,} plans "
+              f"for {args.users:,} users in {time.perf_counter() - started:.1f}s → {path}")
+
+        report("without indexes", measure(args.users, args.rounds))
+
+        started = time.perf_counter()
+        created = ensure_indexes()
+        print(f"\nensure_indexes() built {', '.join(created)} in {time.perf_counter() - started:.1f}s")
+        db.session.remove()
+
+        report("with indexes", measure(args.users, args.rounds))
+
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
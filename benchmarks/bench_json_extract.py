@@ -0,0 +1,101 @@
+"""
+bench_json_extract.py  –  json_extract vs. the old line-scan parser
+────────────────────────────────────────────────────────────────────
+Run from the project root:
+
+    python -m benchmarks.bench_json_extract [--repeat 200]
+
+For each sample response it reports µs/call and whether each parser
+recovered a valid object: the legacy parser, extract_json() on the full
+string, and extract_json() fed 64-character chunks (streaming path).
+"""
+
+import argparse
+import json
+import timeit
+
+from json_extract import extract_json, PLAN_SCHEMA
+
+
+def legacy_extract(response_text):
+    """The parser previously duplicated in ai_wellness.py"""
+    response_text = response_text.strip()
+    if 'json' in response_text.lower():
+        lines = response_text.split('\n')
+        json_lines = []
+        inside_json = False
+
+        for line in lines:
+            if '{' in line:
+                inside_json = True
+            if inside_json:
+                json_lines.append(line)
+            if '}' in line and inside_json:
+                break
+
+        response_text = '\n'.join(json_lines)
+
+    start_idx = response_text.find('{')
+    end_idx = response_text.rfind('}') + 1
+    if start_idx != -1 and end_idx != 0:
+        return json.loads(response_text[start_idx:end_idx])
+    raise ValueError("no JSON object")
+
+
+def _plan(items, text_len):
+    filler = "neural-feedback breathing with holographic coach " * (text_len // 50 + 1)
+    return {
+        "mental_health"        : [f"{n}. {filler[:text_len]}" for n in range(items)],
+        "fitness"              : [f"{n}. {filler[:text_len]}" for n in range(items)],
+        "nutrition"            : [f"{n}. {filler[:text_len]}" for n in range(items)],
+        "personalized_insights": filler[:text_len * 4],
+        "motivation_message"   : "You've got this!",
+    }
+
+
+def samples():
+    typical = json.dumps(_plan(3, 80), indent=4)
+    large   = json.dumps(_plan(400, 2000), indent=4)
+    return {
+        "typical (fenced)"     : f"```json\n{typical}\n```",
+        "typical (prose)"      : f"Here is your plan {{personalised}}:\n{typical}\nEnjoy!",
+        "large ~7MB (fenced)"  : f"```json\n{large}\n```",
+        "nested braces in str" : "```json\n" + json.dumps(
+            {**_plan(3, 40), "mental_health": ["track {mood} }{ daily", "a } b", "c"]}
+        ) + "\n```",
+        "truncated"            : f"```json\n{typical[:len(typical) // 2]}",
+        "trailing prose { }"   : f"{typical}\nNote: adjust {{intensity}} as needed.",
+    }
+
+
+def _attempt(fn, text):
+    try:
+        fn(text)
+        return "ok"
+    except Exception as e:
+        return type(e).__name__
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    parsers = (
+        legacy_extract,
+        lambda text: extract_json(text, PLAN_SCHEMA),
+        lambda text: extract_json((text[i:i + 64] for i in range(0, len(text), 64)), PLAN_SCHEMA),
+    )
+    print(f"{'sample':24} {'legacy µs':>12} {'result':>16} {'extract µs':>12} {'result':>16}"
+          f" {'chunked µs':>12} {'result':>16}")
+    for name, text in samples().items():
+        repeat = max(1, args.repeat // 100) if len(text) > 1_000_000 else args.repeat
+        row = [name]
+        for fn in parsers:
+            seconds = timeit.timeit(lambda: _attempt(fn, text), number=repeat)
+            row += [f"{seconds / repeat * 1e6:12.1f}", f"{_attempt(fn, text):>16}"]
+        print(" ".join([f"{row[0]:24}"] + row[1:]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+bench_login.py  –  login storm: bcrypt on request threads vs. the hash pool
+────────────────────────────────────────────────────────────────────
+Builds the app against a throw-away database, then for each hasher
+setup runs a login storm (N threads POSTing /login) while a probe
+thread keeps requesting a cheap page, and reports:
+
+• logins/s and login p50 / p95
+• probe p50 / p95 – how much the storm starves everything else
+• 503s (HasherBusy)
+
+Finally compares an authenticated page with and without the
+load_user cache.
+
+    python -m benchmarks.bench_login [--threads 8] [--seconds 10] [--rounds 10]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+
+def load_app(rounds):
+    os.environ.update(
+        AI_BACKEND="local",
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'login.db')}",
+        BCRYPT_LOG_ROUNDS=str(rounds),
+        METRICS_ENABLED="0",
+    )
+    from app import init_db
+    from wsgi import app
+    if not os.path.isdir(os.path.join(app.root_path, app.template_folder)):
+        app.template_folder = "."
+    with app.app_context():
+        init_db()
+    return app
+
+
+def percentiles(samples):
+    if not samples:
+        return "       –        –"
+    p50, p95 = np.percentile(np.array(samples) * 1000, [50, 95])
+    return f"{p50:8.1f} {p95:8.1f}"
+
+
+def storm(app, users, threads, seconds):
+    stop = threading.Event()
+    logins, probes, busy = [], [], [0]
+    lock = threading.Lock()
+
+    def login_loop(n):
+        client = app.test_client()
+        email = users[n % len(users)]
+        while not stop.is_set():
+            start = time.perf_counter()
+            resp = client.post("/login", data={"email": email, "password": "bench-password"})
+            elapsed = time.perf_counter() - start
+            client.get("/logout")
+            with lock:
+                if resp.status_code == 503:
+                    busy[0] += 1
+                else:
+                    logins.append(elapsed)
+
+    def probe_loop():
+        client = app.test_client()
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get("/")
+            probes.append(time.perf_counter() - start)
+            stop.wait(0.01)
+
+    workers = [threading.Thread(target=login_loop, args=(n,)) for n in range(threads)]
+    workers.append(threading.Thread(target=probe_loop))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return logins, probes, busy[0]
+
+
+def authenticated_rate(app, email, seconds):
+    client = app.test_client()
+    client.post("/login", data={"email": email, "password": "bench-password"})
+    count, deadline = 0, time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        client.get("/api/jobs/missing")             # login_required, one cheap query
+        count += 1
+    return count / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput: inline bcrypt vs. hash process pool")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    app = load_app(args.rounds)
+    from auth import PasswordHasher
+
+    users = [f"bench{n}@login.test" for n in range(args.threads)]
+    client = app.test_client()
+    for email in users:
+        client.post("/register", data={"username": email.split("@")[0], "email": email,
+                                       "password": "bench-password", "age": 30})
+
+    setups = {
+        "inline": PasswordHasher(args.rounds, workers=0, max_pending=args.threads, timeout=60),
+        "pool"  : PasswordHasher(args.rounds, workers=args.workers, max_pending=args.workers * 2,
+                                 timeout=60),
+    }
+    print(f"{args.threads} login threads × {args.seconds:.0f}s, bcrypt cost {args.rounds}\n")
+    print(f"  {'hasher':8} {'logins/s':>9} {'login p50':>9} {'p95':>8} {'probe p50':>9} {'p95':>8} {'503':>5}")
+    default = app.extensions["hasher"]
+    for name, hasher in setups.items():
+        app.extensions["hasher"] = hasher
+        logins, probes, busy = storm(app, users, args.threads, args.seconds)
+        print(f"  {name:8} {len(logins) / args.seconds:9.1f} {percentiles(logins)} "
+              f"{percentiles(probes)} {busy:5}")
+        hasher.shutdown()
+    app.extensions["hasher"] = default
+
+    print("\nauthenticated requests/s (load_user)")
+    user_cache = app.extensions["user_cache"]
+    ttl = user_cache.ttl
+    for label, cache_ttl in (("no cache", 0), ("cached", ttl or 30)):
+        user_cache.ttl = cache_ttl
+        user_cache._users.clear()
+        print(f"  {label:8} {authenticated_rate(app, users[0], args.seconds / 2):9.1f}")
+    default.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+bench_mood_analytics.py  –  vectorised mood trends at scale
+────────────────────────────────────────────────────────────────────
+Times the mood_analytics kernels on a synthetic frame of N logs spread
+over U users, against a straightforward per-row Python loop on the
+first --loop-rows rows (extrapolated), and optionally the bulk load
+from a seeded SQLite file.
+
+    python -m benchmarks.bench_mood_analytics [--rows 2000000] [--users 20000] [--db-rows 500000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from flask import Flask
+
+from models import db
+from mood_analytics import (
+    MoodFrame, load_frame, rolling_mean, ewma, anomalies, user_stats, weekday_profile, fill_missing
+)
+
+
+def synthetic(rows, users, seed=2070):
+    rng = np.random.default_rng(seed)
+    data = np.column_stack([
+        rng.integers(1, users + 1, rows),
+        rng.integers(1_600_000_000, 1_700_000_000, rows),
+        rng.integers(1, 11, (rows, 3)),
+    ]).astype(np.float64)
+    data[:, 2:][rng.random((rows, 3)) < 0.02] = np.nan
+    return data
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def python_loop(frame, limit, window, alpha):
+    """Reference implementation – one Python step per row"""
+    mood, start = frame.values["mood"][:limit].tolist(), frame.seg_start[:limit].tolist()
+    filled = fill_missing(frame.values["mood"][:limit], frame.seg_start[:limit]).tolist()
+    rolling, smooth, z = [], [], []
+    for i, s in enumerate(start):
+        recent = [v for v in mood[max(i - window + 1, s):i + 1] if v == v]
+        rolling.append(sum(recent) / len(recent) if recent else float("nan"))
+        smooth.append(filled[i] if s == i else alpha * filled[i] + (1 - alpha) * smooth[-1])
+        prev = [v for v in mood[max(i - window, s):i] if v == v]
+        if prev:
+            m = sum(prev) / len(prev)
+            sd = (sum((v - m) ** 2 for v in prev) / len(prev)) ** 0.5
+            z.append((mood[i] - m) / max(sd, 1.0))
+    return rolling, smooth, z
+
+
+def bench_kernels(args):
+    data = synthetic(args.rows, args.users)
+    frame, ms = timed(lambda: MoodFrame.from_rows(data))
+    print(f"{args.rows:,} logs / {len(frame.users):,} users  (frame build {ms:.0f} ms)\n")
+
+    mood = frame.values["mood"]
+    steps = {
+        "rolling mean"     : lambda: rolling_mean(mood, frame.seg_start, args.window),
+        "EWMA"             : lambda: ewma(mood, frame.seg_start, args.alpha),
+        "anomalies"        : lambda: anomalies(mood, frame.seg_start, args.window),
+        "per-user stats"   : lambda: user_stats(frame),
+        "weekday profile"  : lambda: weekday_profile(frame),
+    }
+    total = 0.0
+    print(f"  {'step':18} {'ms':>10} {'ns / log':>10}")
+    for name, fn in steps.items():
+        _, ms = timed(fn)
+        total += ms
+        print(f"  {name:18} {ms:10.1f} {ms * 1e6 / args.rows:10.1f}")
+    print(f"  {'total':18} {total:10.1f}")
+
+    limit = min(args.loop_rows, args.rows)
+    _, ms = timed(lambda: python_loop(frame, limit, args.window, args.alpha))
+    loop_ms = ms * args.rows / limit
+    print(f"\nper-row Python loop (rolling + EWMA + z only): {ms:.0f} ms for {limit:,} rows "
+          f"→ ~{loop_ms / 1000:.1f} s extrapolated, ×{loop_ms / max(total, 1e-9):.0f} slower")
+
+
+def bench_load(args):
+    path = os.path.join(tempfile.mkdtemp(), "bench_mood.db")
+    app  = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}",
+                      SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        rng, base = random.Random(7), datetime(2024, 1, 1)
+        conn = sqlite3.connect(path)
+        conn.executemany(
+            "INSERT INTO mood_log (user_id, mood_score, stress_level, energy_level, log_date)"
+            " VALUES (?, ?, ?, ?, ?)",
+            ((rng.randint(1, args.users), rng.randint(1, 10), rng.randint(1, 10), rng.randint(1, 10),
+              base + timedelta(minutes=rng.randint(0, 2_000_000))) for _ in range(args.db_rows))
+        )
+        conn.commit()
+        conn.close()
+
+        frame, ms = timed(load_frame)
+        print(f"\nload_frame(): {len(frame):,} logs from SQLite in {ms:.0f} ms "
+              f"({ms * 1e6 / max(len(frame), 1):.0f} ns / log)")
+        frame, ms = timed(lambda: load_frame([1]))
+        print(f"load_frame([1]): {len(frame):,} logs in {ms:.1f} ms")
+    os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="mood_analytics throughput")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--window", type=int, default=7)
+    parser.add_argument("--alpha", type=float, default=0.3)
+    parser.add_argument("--loop-rows", type=int, default=100_000)
+    parser.add_argument("--db-rows", type=int, default=0, help="also time the bulk load (0 = skip)")
+    args = parser.parse_args()
+
+    bench_kernels(args)
+    if args.db_rows:
+        bench_load(args)
+
+
+if __name__ == "__main__":
+    main()
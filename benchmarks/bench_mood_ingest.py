@@ -0,0 +1,91 @@
+"""
+bench_mood_ingest.py  –  offline-device sync: one request per entry vs. bulk
+────────────────────────────────────────────────────────────────────
+On a throw-away SQLite database (tuned PRAGMAs), for N entries:
+
+• parse     – NDJSON parse + validation only (no DB)
+• single    – one transaction per entry (what replaying /api/log-mood costs)
+• bulk      – mood_ingest.ingest() on the NDJSON body: one transaction,
+              executemany inserts + rollups
+• replay    – the same body again: every entry is a duplicate
+
+Targets: parse ≥ 50k entries/s, a 10k-entry bulk sync well under 1 s.
+
+    python -m benchmarks.bench_mood_ingest [--entries 10000]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from flask import Flask
+
+from config import Config
+from models import db, apply_sqlite_pragmas, User
+from mood_ingest import ingest, iter_ndjson, validate_entry
+
+
+def build_app(path):
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}",
+                      SQLALCHEMY_TRACK_MODIFICATIONS=False,
+                      SQLALCHEMY_ENGINE_OPTIONS=Config.SQLALCHEMY_ENGINE_OPTIONS)
+    db.init_app(app)
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, Config.SQLITE_PRAGMAS)
+        db.create_all()
+    return app
+
+
+def ndjson_body(entries, start):
+    return [json.dumps({"log_date": start + n * 60, "mood_score": n % 10 + 1,
+                        "stress_level": (n * 3) % 10 + 1, "energy_level": (n * 7) % 10 + 1})
+            for n in range(entries)]
+
+
+def timed(label, entries, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:8} {elapsed * 1000:10.1f} ms {entries / elapsed:12,.0f} entries/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mood-log sync: per-entry requests vs. bulk ingestion")
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--single", type=int, default=1000, help="entries for the per-entry run")
+    args = parser.parse_args()
+
+    app = build_app(os.path.join(tempfile.mkdtemp(), "ingest.db"))
+    with app.app_context():
+        users = [User(username=f"sync{n}", email=f"sync{n}@bench.test", password="x") for n in range(2)]
+        db.session.add_all(users)
+        db.session.commit()
+        single_user, bulk_user = (u.id for u in users)
+
+        body = ndjson_body(args.entries, start=1_700_000_000)
+        now = datetime.utcnow()
+        print(f"{args.entries:,} entries\n")
+
+        timed("parse", args.entries,
+              lambda: [validate_entry(raw, now) for _, raw in iter_ndjson(body)])
+
+        def single():
+            for position, raw in iter_ndjson(body[:args.single]):
+                ingest(single_user, [(position, raw)], max_entries=1)
+        timed("single", args.single, single)
+
+        result = timed("bulk", args.entries,
+                       lambda: ingest(bulk_user, iter_ndjson(body), max_entries=args.entries))
+        assert result["accepted"] == args.entries, result
+        result = timed("replay", args.entries,
+                       lambda: ingest(bulk_user, iter_ndjson(body), max_entries=args.entries))
+        assert result["duplicates"] == args.entries, result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+bench_similarity.py  –  feelings-analysis reuse: exact cache vs. similarity index
+────────────────────────────────────────────────────────────────────
+Builds a synthetic corpus of feelings descriptions (feeling × topic ×
+phrasing), indexes N of them and queries with:
+
+• paraphrases – an indexed description reworded ("I am" / "I'm",
+                fillers, punctuation): should hit
+• negated     – "I don't feel …" for an indexed feeling: must miss
+• novel       – topics that were never indexed: should miss
+
+and reports, per threshold, the hit rate of each query set; then LSH
+vs. brute-force lookup latency and the LSH recall against brute force.
+Finally replays a request mix through GeminiWellnessAI (local model,
+exact response cache in both runs) with and without the index: model
+calls and mean latency.
+
+    python -m benchmarks.bench_similarity [--entries 10000] [--queries 2000]
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+import numpy as np
+
+from ai_cache import ResponseCache
+from ai_wellness import GeminiWellnessAI, LocalBackend
+from similarity_index import FeelingsIndex, vectorize
+
+FEELINGS = ["stressed", "anxious", "overwhelmed", "sad", "lonely", "exhausted", "angry",
+            "worried", "unmotivated", "restless", "frustrated", "nervous", "burned out", "hopeless"]
+TOPICS   = ["work deadlines", "my exams", "my relationship", "money", "my health", "moving to a new city",
+            "my family", "a job interview", "my sleep", "social events", "my manager", "my weight",
+            "the news", "my kids", "my thesis", "paying rent", "my friendships", "a breakup",
+            "my commute", "my parents", "a presentation", "starting a new job", "my future",
+            "my performance review", "a medical test", "my side project", "my team", "the holidays",
+            "a conflict with a coworker", "my fitness goals", "travel plans", "my grades"]
+NOVEL    = ["my landlord", "a court case", "my car breaking down", "my neighbour's noise",
+            "a wedding speech", "my visa application"]
+FRAMES   = ["I feel {f} about {t}", "I'm so {f} about {t}", "really {f} about {t} lately",
+            "I have been {f} because of {t}", "{t} is making me {f}", "feeling {f} about {t} this week"]
+EXTRAS   = ["", " and I can't sleep", " and I keep overthinking", " and my chest feels tight",
+            " and I can't focus", " and I have no energy", " and I snap at people",
+            " and I skip meals", " and I cry a lot", " and I feel stuck"]
+FILLERS  = [("I feel", "I am feeling"), ("I'm", "I am"), ("I have been", "I've been"),
+            ("can't", "cannot"), (" so ", " really "), ("lately", "recently")]
+
+
+def corpus(topics):
+    return [frame.format(f=f, t=t) + extra
+            for f, t, frame, extra in itertools.product(FEELINGS, topics, FRAMES, EXTRAS)]
+
+
+def paraphrase(text, rng):
+    for old, new in rng.sample(FILLERS, len(FILLERS)):
+        if old in text:
+            text = text.replace(old, new, 1)
+            break
+    return text + rng.choice(["", ".", "!", " :(", " today"])
+
+
+def negate(text):
+    for old, new in (("I feel ", "I don't feel "), ("I'm so ", "I'm not "), ("really ", "not really "),
+                     ("I have been ", "I have not been "), ("making me ", "not making me "),
+                     ("feeling ", "not feeling ")):
+        if old in text:
+            return text.replace(old, new, 1)
+    return "not " + text
+
+
+def hit_rate(index, queries):
+    return sum(index.lookup(q) is not None for q in queries) / len(queries)
+
+
+def percentiles(samples):
+    p50, p95 = np.percentile(np.array(samples) * 1e6, [50, 95])
+    return f"{p50:8.0f} {p95:8.0f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feelings-analysis similarity index: hit rate, recall, latency")
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=300, help="requests in the end-to-end replay")
+    parser.add_argument("--model-latency", type=float, default=20, help="local model latency, ms")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = corpus(TOPICS)
+    rng.shuffle(texts)
+    texts = texts[:args.entries]
+    analysis = {"emotional_state": "stressed", "stress_indicators": [], "recommended_focus_areas": [],
+                "empathy_message": ""}
+
+    queries = {
+        "paraphrase": [paraphrase(rng.choice(texts), rng) for _ in range(args.queries)],
+        "negated"   : [negate(rng.choice(texts)) for _ in range(args.queries)],
+        "novel"     : rng.sample(corpus(NOVEL), args.queries),
+    }
+
+    print(f"{len(texts):,} indexed descriptions, {args.queries:,} queries per set\n")
+    print(f"  {'threshold':>9} {'paraphrase':>11} {'negated':>8} {'novel':>8}")
+    index = None
+    for threshold in (0.8, 0.85, 0.9, 0.95):
+        index = FeelingsIndex(threshold=threshold, max_entries=len(texts), recall_sample=0)
+        for text in texts:
+            index.add(text, analysis)
+        print(f"  {threshold:9.2f} " + " ".join(f"{hit_rate(index, queries[name]):{width}.1%}"
+                                                for name, width in (("paraphrase", 11), ("negated", 8),
+                                                                    ("novel", 8))))
+
+    index = FeelingsIndex(max_entries=len(texts), recall_sample=0)
+    start = time.perf_counter()
+    for text in texts:
+        index.add(text, analysis)
+    elapsed = time.perf_counter() - start
+    print(f"\nthreshold {index.threshold}, {index.tables} tables × {index.bits} bits: "
+          f"{len(texts) / elapsed:,.0f} adds/s")
+
+    vectors = np.stack([vectorize(text, index.dim) for text in texts])
+    lsh, brute, found, exact = [], [], 0, 0
+    for query in queries["paraphrase"]:
+        start = time.perf_counter()
+        hit = index.lookup(query) is not None
+        lsh.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        best = float((vectors @ vectorize(query, index.dim)).max())
+        brute.append(time.perf_counter() - start)
+        if best >= index.threshold:
+            exact += 1
+            found += hit
+    print(f"  {'lookup':12} {'p50 µs':>8} {'p95 µs':>8}")
+    print(f"  {'lsh':12} {percentiles(lsh)}   {index.stats()['candidates_mean']:,.0f} candidates scored")
+    print(f"  {'brute force':12} {percentiles(brute)}   {len(texts):,} scored")
+    print(f"  recall vs. brute force: {found / exact if exact else 1:.1%} ({exact} exact hits)")
+
+    # end to end: repeat visitors paraphrasing what was already analysed
+    seen = rng.sample(texts, 50)
+    mix = [paraphrase(rng.choice(seen), rng) if rng.random() < 0.6 else rng.choice(corpus(NOVEL))
+           for _ in range(args.requests)]
+    print(f"\n{args.requests} analyze_feelings calls, local model {args.model_latency:.0f} ms, "
+          f"60% paraphrases of 50 texts")
+    print(f"  {'':12} {'model calls':>11} {'mean ms':>8}")
+    for label, similar in (("exact cache", None), ("+ index", FeelingsIndex())):
+        backend = LocalBackend(latency_ms=args.model_latency, distribution="fixed")
+        ai = GeminiWellnessAI(cache=ResponseCache(), backend=backend, similar=similar)
+        for text in seen:
+            ai.analyze_feelings(text)
+        calls = backend.calls
+        start = time.perf_counter()
+        for text in mix:
+            ai.analyze_feelings(text)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:12} {backend.calls - calls:11} {elapsed / len(mix) * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+bench_sqlite_concurrency.py  –  concurrent read/write load on SQLite
+────────────────────────────────────────────────────────────────────
+Runs the same mixed workload twice on fresh throw-away databases:
+
+• stock  – default journaling, no PRAGMAs, SQLAlchemy default pool
+• tuned  – Config.SQLALCHEMY_ENGINE_OPTIONS + Config.SQLITE_PRAGMAS
+
+Writer threads insert MoodLog rows and swap the active WellnessPlan
+(one commit each); reader threads run the dashboard queries.
+
+    python -m benchmarks.bench_sqlite_concurrency [--writers 4] [--readers 8] [--seconds 10]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from flask import Flask
+from sqlalchemy.exc import OperationalError
+
+from config import Config
+from models import db, apply_sqlite_pragmas, User, MoodLog, WellnessPlan, FeelingsLog
+from plan_store import add_plan, load_active_plan
+
+
+def build_app(path, tuned):
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}",
+                      SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    if tuned:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = Config.SQLALCHEMY_ENGINE_OPTIONS
+    db.init_app(app)
+    with app.app_context():
+        if tuned:
+            apply_sqlite_pragmas(db.engine, Config.SQLITE_PRAGMAS)
+        db.create_all()
+        db.session.add_all(User(username=f"u{n}", email=f"u{n}@example.com", password="x")
+                           for n in range(1, 101))
+        db.session.commit()
+    return app
+
+
+def writer(app, stop, stats, seed):
+    rng = random.Random(seed)
+    with app.app_context():
+        while not stop.is_set():
+            uid = rng.randint(1, 100)
+            try:
+                db.session.add(MoodLog(user_id=uid, mood_score=rng.randint(1, 10),
+                                       stress_level=rng.randint(1, 10), energy_level=rng.randint(1, 10)))
+                WellnessPlan.query.filter_by(user_id=uid, is_active=True).update({"is_active": False})
+                add_plan(uid, {"mental_health": ["breathe"], "fitness": ["walk"], "nutrition": ["water"]})
+                db.session.commit()
+                stats["writes"] += 1
+            except OperationalError:
+                db.session.rollback()
+                stats["locked"] += 1
+
+
+def reader(app, stop, stats, seed):
+    rng = random.Random(seed)
+    with app.app_context():
+        while not stop.is_set():
+            uid = rng.randint(1, 100)
+            try:
+                load_active_plan(uid)
+                MoodLog.query.filter_by(user_id=uid).order_by(MoodLog.log_date.desc()).limit(7).all()
+                FeelingsLog.query.filter_by(user_id=uid).order_by(FeelingsLog.created_date.desc()).limit(3).all()
+                db.session.rollback()           # end the read transaction
+                stats["reads"] += 1
+            except OperationalError:
+                db.session.rollback()
+                stats["locked"] += 1
+
+
+def run(label, tuned, args):
+    path = os.path.join(tempfile.mkdtemp(), f"{label}.db")
+    app  = build_app(path, tuned)
+    stop = threading.Event()
+    stats = {"reads": 0, "writes": 0, "locked": 0}
+
+    threads  = [threading.Thread(target=writer, args=(app, stop, stats, n)) for n in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(app, stop, stats, 100 + n)) for n in range(args.readers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    print(f"{label:6} writes/s {stats['writes'] / args.seconds:9.1f}   "
+          f"reads/s {stats['reads'] / args.seconds:9.1f}   'database is locked' errors {stats['locked']}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite stock vs. tuned engine profile")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writer / {args.readers} reader threads, {args.seconds:g}s each\n")
+    stock = run("stock", False, args)
+    tuned = run("tuned", True, args)
+    if stock["writes"]:
+        print(f"\nwrite throughput ×{tuned['writes'] / stock['writes']:.1f}, "
+              f"read throughput ×{tuned['reads'] / max(stock['reads'], 1):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+bench_startup.py  –  what a worker pays before its first response
+────────────────────────────────────────────────────────────────────
+Against a throw-away database, reports (median of --repeat runs, each
+in a fresh interpreter):
+
+• interpreter  – `python -c pass`, the floor
+• import wsgi  – module import + create_app(); no AI client, no bcrypt
+                 pool, no job workers, no schema work
+• + genai      – what the Gemini SDK adds once the first model call
+                 imports it (the cost every import used to pay)
+• the slowest imports under `import wsgi` (-X importtime, cumulative)
+
+then, in this process: another create_app(), `init_db()` on an empty
+database and on an up-to-date one, and the first vs. second request.
+
+    python -m benchmarks.bench_startup [--repeat 5] [--top 12]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bench_env(path):
+    return dict(os.environ, AI_BACKEND="local", METRICS_ENABLED="0",
+                SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}")
+
+
+def wall(code, env, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def slowest_imports(env, top):
+    """(cumulative µs, module) for the `top` slowest imports below `app` (under wsgi)"""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import wsgi"], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stderr
+    rows, children = [], []
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 2:                      # children are listed before their parent
+            children.append((int(cumulative), name.strip()))
+        elif depth == 1:
+            if name.strip() == "app":
+                rows = children
+            children = []
+    return sorted(rows, reverse=True)[:top]
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {label:26} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import / boot / first-request cost of the app")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="slowest imports to list")
+    args = parser.parse_args()
+
+    env = bench_env(os.path.join(tempfile.mkdtemp(), "startup.db"))
+    print(f"fresh interpreter, median of {args.repeat}\n")
+    floor = wall("pass", env, args.repeat)
+    boot = wall("import wsgi", env, args.repeat)
+    eager = wall("import google.generativeai, wsgi", env, args.repeat)
+    print(f"  {'interpreter':26} {floor * 1000:8.1f} ms")
+    print(f"  {'import wsgi':26} {boot * 1000:8.1f} ms   (+{(boot - floor) * 1000:.1f})")
+    print(f"  {'import wsgi + genai':26} {eager * 1000:8.1f} ms   (+{(eager - boot) * 1000:.1f} deferred)")
+
+    print("\nslowest imports under `import app` (cumulative)")
+    for micros, name in slowest_imports(env, args.top):
+        print(f"  {name:26} {micros / 1000:8.1f} ms")
+
+    print("\nin process")
+    os.environ.update(env)
+    sys.path.insert(0, ROOT)
+    import app as app_module
+    app = timed("create_app()", app_module.create_app)
+    if not os.path.isdir(os.path.join(app.root_path, app.template_folder)):
+        app.template_folder = "."           # templates live next to app.py in this repo
+    with app.app_context():
+        timed("init_db() – empty", app_module.init_db)
+        timed("init_db() – up to date", app_module.init_db)
+    client = app.test_client()
+    timed("first request  GET /", lambda: client.get("/"))
+    timed("second request GET /", lambda: client.get("/"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+load_test.py  –  end-to-end load test against the local model stand-in
+────────────────────────────────────────────────────────────────────
+Starts the app on a throw-away database with AI_BACKEND=local (or
+targets an already running server with --base-url) and lets N virtual
+users loop over the real HTTP surface:
+
+• register + log in once
+• GET  /dashboard
+• POST /api/generate-ai-wellness-plan, then poll /api/jobs/<id>
+
+Reports p50 / p95 / p99 latency, errors, 429s and requests/s per
+endpoint. Model latency, error rate and malformed-output rate come from
+the AI_LOCAL_* settings (see config.py), e.g.
+
+    python -m benchmarks.load_test --users 20 --seconds 30 --model-latency 800 --error-rate 0.05
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+
+import numpy as np
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}                   # endpoint -> [(seconds, status)]
+        self.lock = threading.Lock()
+
+    def add(self, endpoint, seconds, status):
+        with self.lock:
+            self.samples.setdefault(endpoint, []).append((seconds, status))
+
+    def report(self, elapsed):
+        print(f"\n  {'endpoint':36} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'429':>5} {'errors':>6}")
+        every = []
+        for endpoint, rows in sorted(self.samples.items()):
+            every += rows
+            self._line(endpoint, rows, elapsed)
+        if every:
+            self._line("total", every, elapsed)
+
+    @staticmethod
+    def _line(endpoint, rows, elapsed):
+        seconds = np.array([s for s, _ in rows]) * 1000
+        status  = np.array([c for _, c in rows])
+        p50, p95, p99 = np.percentile(seconds, [50, 95, 99])
+        errors = int(((status >= 400) & (status != 429) | (status == 0)).sum())
+        print(f"  {endpoint:36} {len(rows):7} {len(rows) / elapsed:8.1f} {p50:8.1f} {p95:8.1f} "
+              f"{p99:8.1f} {int((status == 429).sum()):5} {errors:6}")
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, n, base_url, recorder, stop, poll, think):
+        super().__init__(name=f"vu-{n}", daemon=True)
+        self.n, self.base_url, self.recorder = n, base_url, recorder
+        self.stop, self.poll, self.think = stop, poll, think
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+        self.rng = random.Random(n)
+
+    def request(self, endpoint, path, form=None, body=None):
+        data, headers = None, {}
+        if form is not None:
+            data = urllib.parse.urlencode(form).encode()
+        elif body is not None:
+            data, headers = json.dumps(body).encode(), {"Content-Type": "application/json"}
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers)
+
+        start = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=60) as resp:
+                status, payload = resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, e.read()
+        except OSError:
+            status, payload = 0, b""
+        self.recorder.add(endpoint, time.perf_counter() - start, status)
+        return status, payload
+
+    def run(self):
+        email = f"load{self.n}-{os.getpid()}@load.test"
+        self.request("POST /register", "/register",
+                     form={"username": email.split("@")[0], "email": email, "password": "load-test",
+                           "age": 20 + self.n % 50, "fitness_level": "intermediate"})
+        self.request("POST /login", "/login", form={"email": email, "password": "load-test"})
+
+        while not self.stop.is_set():
+            self.request("GET /dashboard", "/dashboard")
+            status, payload = self.request(
+                "POST /api/generate-ai-wellness-plan", "/api/generate-ai-wellness-plan",
+                body={"mood_score": self.rng.randint(1, 10), "stress_level": self.rng.randint(1, 10),
+                      "energy_level": self.rng.randint(1, 10),
+                      "feelings_description": self.rng.choice(["", "tired but hopeful", "anxious"])})
+            if status == 202 and self.poll:
+                self.wait_for(json.loads(payload)["poll_url"])
+            self.stop.wait(self.think)
+
+    def wait_for(self, poll_url):
+        started = time.perf_counter()
+        while not self.stop.is_set():
+            status, payload = self.request("GET /api/jobs/<id>", poll_url)
+            if status != 200 or json.loads(payload)["status"] in ("done", "failed"):
+                self.recorder.add("job end-to-end", time.perf_counter() - started, status)
+                return
+            self.stop.wait(0.25)
+
+
+def serve_local_app(args):
+    """Import the app against a temp DB + local model, serve it on a random port"""
+    os.environ.update(
+        AI_BACKEND="local",
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load.db')}",
+        AI_LOCAL_LATENCY_MS=str(args.model_latency),
+        AI_LOCAL_ERROR_RATE=str(args.error_rate),
+        AI_LOCAL_MALFORMED_RATE=str(args.malformed_rate),
+    )
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    from app import init_db
+    from wsgi import app
+
+    if not os.path.isdir(os.path.join(app.root_path, app.template_folder)):
+        app.template_folder = "."           # templates live next to app.py in this repo
+    with app.app_context():
+        init_db()
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load test with the local model stand-in")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--think", type=float, default=0.5, help="pause between iterations (s)")
+    parser.add_argument("--no-poll", dest="poll", action="store_false", help="don't wait for plan jobs")
+    parser.add_argument("--base-url", help="target a running server instead of starting one")
+    parser.add_argument("--model-latency", type=float, default=800, help="median model latency (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url.rstrip("/") if args.base_url else None
+    if base_url is None:
+        base_url, server = serve_local_app(args)
+
+    print(f"{args.users} virtual users × {args.seconds:.0f}s against {base_url}")
+    recorder, stop = Recorder(), threading.Event()
+    users = [VirtualUser(n, base_url, recorder, stop, args.poll, args.think) for n in range(args.users)]
+    started = time.perf_counter()
+    for user in users:
+        user.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for user in users:
+        user.join(timeout=65)
+    recorder.report(time.perf_counter() - started)
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
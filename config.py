@@ -1,10 +1,115 @@
 import os
 from dotenv import load_dotenv
+from sqlalchemy.pool import QueuePool
 
 load_dotenv()
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'wellness_2070_secret_key'
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///wellness_2070.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI') or 'sqlite:///wellness_2070.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # SQLite engine profile – pool shared by Flask threads / job workers,
+    # PRAGMAs applied to every new connection (models.apply_sqlite_pragmas).
+    # Memory budget: cache_size is private to each connection, so at most
+    # (pool_size + max_overflow) × cache = 16 × 8 MB = 128 MB of page cache per
+    # process; mmap_size is address space over the file's pages in the OS page
+    # cache, shared by every connection, not extra memory per connection.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': QueuePool,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 8)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 8)),
+        'pool_timeout': 30,
+        'connect_args': {'check_same_thread': False, 'timeout': 15},
+    } if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else {}
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',              # readers never block the writer
+        'synchronous': 'NORMAL',            # fsync at checkpoints, safe with WAL
+        'busy_timeout': 5000,               # ms to wait for the write lock
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_KIB', 8192)),   # KiB of page cache per connection
+        'mmap_size': 134217728,             # 128 MB memory-mapped reads (shared, see above)
+        'temp_store': 'MEMORY',
+    } if os.environ.get('SQLITE_TUNING', '1') != '0' else {}
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+
+    # model backend: 'gemini', or 'local' – deterministic stand-in for load tests / offline work
+    AI_BACKEND = os.environ.get('AI_BACKEND', 'gemini')
+    AI_LOCAL_LATENCY_MS = float(os.environ.get('AI_LOCAL_LATENCY_MS', 800))   # median
+    AI_LOCAL_LATENCY_DIST = os.environ.get('AI_LOCAL_LATENCY_DIST', 'lognormal')  # fixed, uniform, lognormal
+    AI_LOCAL_LATENCY_SIGMA = float(os.environ.get('AI_LOCAL_LATENCY_SIGMA', 0.5))
+    AI_LOCAL_ERROR_RATE = float(os.environ.get('AI_LOCAL_ERROR_RATE', 0))     # fraction answered with a 429
+    AI_LOCAL_MALFORMED_RATE = float(os.environ.get('AI_LOCAL_MALFORMED_RATE', 0))  # fraction with broken JSON
+    AI_LOCAL_SEED = int(os.environ.get('AI_LOCAL_SEED', 2070))
+
+    # AI response cache (ai_cache.ResponseCache)
+    AI_CACHE_TTL = int(os.environ.get('AI_CACHE_TTL', 900))                  # seconds, 0 disables
+    AI_CACHE_MAX_ENTRIES = int(os.environ.get('AI_CACHE_MAX_ENTRIES', 512))  # in-process LRU size
+    AI_CACHE_DB_PATH = os.environ.get('AI_CACHE_DB_PATH')                    # optional persistent tier
+    AI_CACHE_DB_MAX_ENTRIES = int(os.environ.get('AI_CACHE_DB_MAX_ENTRIES', 10000))
+    AI_INFLIGHT_DB_PATH = os.environ.get('AI_INFLIGHT_DB_PATH')              # cross-process single-flight (pair with AI_CACHE_DB_PATH)
+
+    # near-duplicate feelings analyses (similarity_index.FeelingsIndex)
+    AI_SIMILARITY_THRESHOLD = float(os.environ.get('AI_SIMILARITY_THRESHOLD', 0.9))  # cosine to reuse an analysis, 0 disables
+    AI_SIMILARITY_MAX_ENTRIES = int(os.environ.get('AI_SIMILARITY_MAX_ENTRIES', 10000))  # analyses kept per process
+    AI_SIMILARITY_WARM = int(os.environ.get('AI_SIMILARITY_WARM', 5000))     # recent FeelingsLog rows loaded on first request
+    AI_SIMILARITY_TABLES = int(os.environ.get('AI_SIMILARITY_TABLES', 20))   # LSH tables – more raises recall and cost
+    AI_SIMILARITY_BITS = int(os.environ.get('AI_SIMILARITY_BITS', 12))       # bits per signature – more, fewer candidates
+    AI_SIMILARITY_RECALL_SAMPLE = float(os.environ.get('AI_SIMILARITY_RECALL_SAMPLE', 0.05))  # lookups re-checked by brute force
+
+    # concurrent model calls (GeminiWellnessAI.run_concurrently)
+    AI_MAX_WORKERS = int(os.environ.get('AI_MAX_WORKERS', 8))
+    AI_CALL_TIMEOUT = float(os.environ.get('AI_CALL_TIMEOUT', 25))           # shared deadline, seconds
+
+    # background plan-generation jobs (jobs.JobQueue)
+    AI_JOB_WORKERS = int(os.environ.get('AI_JOB_WORKERS', 4))
+    AI_JOB_MAX_DEPTH = int(os.environ.get('AI_JOB_MAX_DEPTH', 64))          # beyond this the API answers 429
+    AI_JOB_STALE_AFTER = int(os.environ.get('AI_JOB_STALE_AFTER', 120))     # seconds before a stuck job is retried
+    AI_JOB_POLL_INTERVAL = float(os.environ.get('AI_JOB_POLL_INTERVAL', 2))  # idle workers look for orphaned queued jobs
+    AI_JOB_SWEEP_INTERVAL = int(os.environ.get('AI_JOB_SWEEP_INTERVAL', 60)) # seconds between expiry / stale-job sweeps
+
+    # streamed plans (SSE) hold a request thread for the whole model call
+    AI_STREAM_MAX_CONCURRENT = int(os.environ.get('AI_STREAM_MAX_CONCURRENT', 8))  # beyond this the stream answers 429
+
+    # Gemini backend protection (ai_guard.ModelGuard)
+    AI_RATE_LIMIT = float(os.environ.get('AI_RATE_LIMIT', 5))                # model requests / second
+    AI_RATE_BURST = int(os.environ.get('AI_RATE_BURST', 10))
+    AI_MAX_CONCURRENCY = int(os.environ.get('AI_MAX_CONCURRENCY', 8))       # AIMD ceiling
+    AI_MAX_RETRIES = int(os.environ.get('AI_MAX_RETRIES', 2))
+    AI_BACKOFF_BASE = float(os.environ.get('AI_BACKOFF_BASE', 0.5))          # seconds, doubled per retry
+    AI_BREAKER_THRESHOLD = int(os.environ.get('AI_BREAKER_THRESHOLD', 5))   # consecutive failures
+    AI_BREAKER_RESET = float(os.environ.get('AI_BREAKER_RESET', 30))         # seconds before a probe
+
+    # dashboard read model (dashboard_cache.DashboardCache)
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 60))    # bounds cross-worker staleness
+    VR_CATALOG_CACHE_TTL = int(os.environ.get('VR_CATALOG_CACHE_TTL', 3600))
+
+    # cohort plan regeneration (batch_plans.BatchPlanRunner)
+    BATCH_CHUNK_SIZE = int(os.environ.get('BATCH_CHUNK_SIZE', 100))         # users per chunk / commit / checkpoint
+    BATCH_PACK_SIZE = int(os.environ.get('BATCH_PACK_SIZE', 5))             # users per model request
+    BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 4))                 # concurrent model requests
+
+    # mood trend analytics (mood_analytics)
+    MOOD_TRENDS_WINDOW = int(os.environ.get('MOOD_TRENDS_WINDOW', 7))       # logs in the rolling mean / anomaly baseline
+    MOOD_TRENDS_ALPHA = float(os.environ.get('MOOD_TRENDS_ALPHA', 0.3))      # EWMA smoothing factor
+    MOOD_ANOMALY_Z = float(os.environ.get('MOOD_ANOMALY_Z', 2.5))            # |z| that flags a log as unusual
+
+    # bulk mood-log sync (mood_ingest.py)
+    MOOD_BULK_MAX_ENTRIES = int(os.environ.get('MOOD_BULK_MAX_ENTRIES', 10000))  # entries per request (413 beyond)
+    MOOD_BULK_CHUNK_SIZE = int(os.environ.get('MOOD_BULK_CHUNK_SIZE', 1000))    # rows per executemany
+
+    # archival of old logs (archive.py, `flask archive-logs`)
+    ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', 'archive')                    # relative paths are under the instance folder
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))     # logs / inactive plans older than this are moved out
+    ARCHIVE_CHUNK_SIZE = int(os.environ.get('ARCHIVE_CHUNK_SIZE', 5000))    # rows per part file / DELETE / commit
+
+    # login path (auth.py)
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))       # cost; other costs are rehashed on login
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))  # bcrypt processes (0 = request thread)
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 8))  # hashes queued + running
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))  # seconds before answering 503
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))              # load_user snapshot lifetime (0 disables)
+
+    # instrumentation (metrics.py)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'          # route/DB timing + /metrics
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')                         # bearer token; /metrics is 404 without one
+    METRICS_TIMING_HEADER = os.environ.get('METRICS_TIMING_HEADER', '0') == '1'  # Server-Timing on every response
@@ -0,0 +1,92 @@
+"""
+dashboard_cache.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Read model for the /dashboard page.
+
+• One snapshot per user: active plan (already deserialised), recent
+  moods and feelings as plain dicts – rendering needs no DB or JSON
+• VR catalog cached once for every user
+• Writers call invalidate(user_id); the TTL bounds staleness between
+  worker processes, which each hold their own copy (and for writes made
+  outside the web workers, e.g. `flask batch-plans`)
+• A snapshot loaded while the same user's data changed is served but not
+  cached; other users' writes don't affect it
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class DashboardCache:
+    def __init__(self, ttl=60, vr_ttl=3600, max_users=10000):
+        self.ttl       = ttl
+        self.vr_ttl    = vr_ttl
+        self.max_users = max_users
+        self.hits      = 0
+        self.misses    = 0
+        self._snapshots = OrderedDict()     # user_id -> (expires, snapshot)
+        self._vr        = None              # (expires, catalog)
+        self._loading   = {}                # user_id -> [loads in flight, invalidations since]
+        self._lock      = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            ttl       = config.get("DASHBOARD_CACHE_TTL", 60),
+            vr_ttl    = config.get("VR_CATALOG_CACHE_TTL", 3600),
+            max_users = config.get("DASHBOARD_CACHE_MAX_USERS", 10000)
+        )
+
+    def snapshot(self, user_id, loader):
+        """Cached snapshot for a user, built with loader(user_id) on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._snapshots.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._snapshots.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            loading = self._loading.setdefault(user_id, [0, 0])
+            loading[0] += 1
+            epoch = loading[1]
+
+        loaded = False
+        try:
+            snapshot = loader(user_id)
+            loaded = True
+        finally:
+            with self._lock:
+                loading[0] -= 1
+                if not loading[0]:
+                    del self._loading[user_id]
+                # not cached if this user's data changed while we were loading
+                if loaded and epoch == loading[1]:
+                    self._snapshots[user_id] = (now + self.ttl, snapshot)
+                    self._snapshots.move_to_end(user_id)
+                    while len(self._snapshots) > self.max_users:
+                        self._snapshots.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            loading = self._loading.get(user_id)
+            if loading is not None:
+                loading[1] += 1
+            self._snapshots.pop(user_id, None)
+
+    def vr_catalog(self, loader):
+        now = time.monotonic()
+        entry = self._vr
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        catalog  = loader()
+        self._vr = (now + self.vr_ttl, catalog)
+        return catalog
+
+    def invalidate_vr(self):
+        self._vr = None
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "users": len(self._snapshots)}
@@ -0,0 +1,298 @@
+"""
+fallback_rules.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Rule table behind the fallback wellness plan (served whenever Gemini is
+down, throttled or answers garbage).
+
+• Each plan section is an ordered list of (conditions, recommendations);
+  the first rule whose score ranges all match wins, the last rule is the
+  catch-all
+• FallbackPlanner compiles every section into a 10 × 10 × 10 table
+  (mood × stress × energy → rule index) for whole-number scores, so a
+  whole cohort is one NumPy fancy-index; fractional scores (4.5) are
+  matched against the rules directly, exactly as the old cascade did
+• The recommendation lists and insight sentences for each of the 1000
+  cells are resolved at start-up; serving a plan only copies them, and
+  plans() renders each distinct cell of a batch once
+"""
+
+import itertools
+import math
+import random
+
+import numpy as np
+
+SCALE  = range(1, 11)                   # every score is a 1-10 slider
+AXES   = ("mood_score", "stress_level", "energy_level")
+SECTIONS = ("mental_health", "fitness", "nutrition", "focus")
+NEUTRAL = 5                             # what a missing / unreadable score counts as
+
+# conditions: {score: (low, high)} – inclusive, None = unbounded
+PLAN_RULES = {
+    "mental_health": [
+        ({"stress_level": (7, None)}, [
+            "Daily neural-feedback meditation with VR forest environment",
+            "AI-guided deep breathing exercises with biometric monitoring",
+            "Virtual therapy sessions with holographic wellness counselor"
+        ]),
+        ({"mood_score": (None, 4)}, [
+            "Mood-enhancing light therapy with circadian rhythm optimization",
+            "AI-powered journaling with sentiment analysis feedback",
+            "Brain-wave entrainment sessions for emotional balance"
+        ]),
+        ({}, [
+            "Daily mindfulness practice with augmented reality guides",
+            "Neural interface meditation for optimal brain-wave patterns",
+            "Personalized affirmation therapy via AI voice synthesis"
+        ]),
+    ],
+    "fitness": [
+        ({"energy_level": (None, 3)}, [
+            "Gentle movement therapy with robotic assistance",
+            "Energy-building exercises with real-time biometric feedback",
+            "Restorative yoga with holographic instructor adaptation"
+        ]),
+        ({"energy_level": (8, None)}, [
+            "High-intensity quantum-enhanced training protocols",
+            "Advanced biometric optimization with AI form correction",
+            "Competitive VR fitness challenges with neural reward systems"
+        ]),
+        ({}, [
+            "Personalized workout routines with holographic personal trainer",
+            "Smart recovery protocols using nanotechnology sensors",
+            "Mixed-reality fitness games for sustained motivation"
+        ]),
+    ],
+    "nutrition": [
+        ({"stress_level": (6, None)}, [
+            "Stress-reducing adaptogenic meal plans via molecular gastronomy",
+            "Real-time cortisol monitoring with smart nutrition adjustments",
+            "AI-optimized gut microbiome restoration protocols"
+        ]),
+        ({}, [
+            "Personalized meal optimization based on genetic markers",
+            "Smart hydration monitoring with electrolyte balance tracking",
+            "3D-printed custom supplements delivered via drone network"
+        ]),
+    ],
+    # focus sentence, only used when the user described their feelings
+    "focus": [
+        ({"stress_level": (6, None)}, "stress management and emotional regulation. "),
+        ({"energy_level": (None, 4)}, "energy restoration and gentle activation. "),
+        ({}, "maintaining balance while optimizing your wellness journey. "),
+    ],
+}
+
+FEELINGS_INSIGHT = ("along with your personal feelings description, our advanced AI has "
+                    "detected patterns that suggest focusing on ")
+GENERAL_INSIGHT  = ("our 2070 wellness algorithms recommend a balanced approach to your "
+                    "mental, physical, and nutritional needs. ")
+CLOSING_INSIGHT  = "Your plan adapts in real-time based on your biometric feedback and neural patterns."
+
+MOTIVATION_MESSAGES = [
+    "Your wellness journey is unique, and our quantum-enhanced AI is here to support every step forward!",
+    "Every day is an opportunity to optimize your well-being with cutting-edge 2070 technology at your service.",
+    "Your commitment to wellness activates our most advanced algorithms - together we'll achieve optimal health!",
+    "Neural patterns show great potential for growth - let's unlock your wellness achievements together!"
+]
+
+
+def _score(value):
+    """Slider value as a number; NEUTRAL when missing or unreadable"""
+    if type(value) is int:
+        return value
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return NEUTRAL
+    return NEUTRAL if math.isnan(value) else value
+
+
+def _grid(value):
+    """A whole-number score clamped to 1-10, or None for a fractional one.
+
+    Clamping is exact because every rule bound lies within 1-10; rounding
+    a fraction is not (4.5 fails "mood ≤ 4", 4 passes), so those skip the table.
+    """
+    if value != value // 1:
+        return None
+    return min(max(int(value), SCALE[0]), SCALE[-1])
+
+
+def _on_scale(mood, stress, energy):
+    """True for three plain ints on the 1-10 scale: the table and the
+    pre-rendered insight sentences apply to them as they are"""
+    return type(mood) is int and type(stress) is int and type(energy) is int \
+        and 1 <= mood <= 10 and 1 <= stress <= 10 and 1 <= energy <= 10
+
+
+def _score_array(values):
+    """float64 array of _score(value) – one NumPy conversion unless a value is unreadable"""
+    try:
+        return np.asarray(values, dtype=np.float64)        # NaN stays NaN → NEUTRAL in cell_array
+    except (TypeError, ValueError):
+        return np.array([_score(v) for v in values], dtype=np.float64)
+
+
+def _matches(conditions, scores):
+    for axis, (low, high) in conditions.items():
+        value = scores[axis]
+        if (low is not None and value < low) or (high is not None and value > high):
+            return False
+    return True
+
+
+class FallbackPlanner:
+    def __init__(self, rules=PLAN_RULES, motivations=MOTIVATION_MESSAGES):
+        for section in SECTIONS:
+            if section not in rules or rules[section][-1][0]:
+                raise ValueError(f"fallback rules for '{section}' need a catch-all last rule")
+        self.rules       = rules
+        self.motivations = motivations
+        self.sections    = SECTIONS
+        n = len(SCALE)
+
+        # section -> flat table of rule indexes, position (m-1)*100 + (s-1)*10 + (e-1)
+        self.tables = {section: [0] * n ** 3 for section in self.sections}
+        for m in SCALE:
+            for s in SCALE:
+                for e in SCALE:
+                    scores = dict(zip(AXES, (m, s, e)))
+                    cell = ((m - 1) * n + (s - 1)) * n + (e - 1)
+                    for section in SECTIONS:
+                        self.tables[section][cell] = next(
+                            k for k, (conditions, _) in enumerate(rules[section])
+                            if _matches(conditions, scores)
+                        )
+        self.arrays = {section: np.array(table, dtype=np.uint8)
+                       for section, table in self.tables.items()}
+
+        # cell -> the rule-dependent parts of a plan, resolved once
+        self.cells = [tuple(rules[section][self.tables[section][cell]][1] for section in self.sections)
+                      for cell in range(n ** 3)]
+        # cell -> (insights without, with feelings) for plain on-grid integer scores
+        self.insights = [
+            tuple(self._insights(self.cells[cell][3], m, s, e, has) for has in (False, True))
+            for cell, (m, s, e) in enumerate((m, s, e) for m in SCALE for s in SCALE for e in SCALE)
+        ]
+
+    # ── one user ─────────────────────────────────────────────────
+    def rule_indexes(self, mood, stress, energy):
+        """{section: index of the winning rule} – a table lookup for whole-number scores"""
+        cell = self._cell(mood, stress, energy)
+        if cell is None:
+            return self._match(mood, stress, energy)
+        return {section: table[cell] for section, table in self.tables.items()}
+
+    @staticmethod
+    def _cell(mood, stress, energy):
+        """Table position, or None when a score is fractional"""
+        if _on_scale(mood, stress, energy):
+            return ((mood - 1) * 10 + (stress - 1)) * 10 + (energy - 1)
+        grid = [_grid(_score(v)) for v in (mood, stress, energy)]
+        if None in grid:
+            return None
+        return ((grid[0] - 1) * 10 + (grid[1] - 1)) * 10 + (grid[2] - 1)
+
+    def _match(self, mood, stress, energy):
+        """{section: index of the winning rule}, evaluated on the raw scores"""
+        scores = dict(zip(AXES, (_score(v) for v in (mood, stress, energy))))
+        return {section: next(k for k, (conditions, _) in enumerate(self.rules[section])
+                              if _matches(conditions, scores))
+                for section in self.sections}
+
+    def plan(self, user_data, feelings_description=""):
+        mood   = user_data.get("mood_score", NEUTRAL)
+        stress = user_data.get("stress_level", NEUTRAL)
+        energy = user_data.get("energy_level", NEUTRAL)
+        return self._render(self._cell(mood, stress, energy), mood, stress, energy,
+                            feelings_description, random.choice(self.motivations))
+
+    def _render(self, cell, mood, stress, energy, has_feelings, motivation):
+        if cell is None:
+            picks = self._match(mood, stress, energy)
+            mental_health, fitness, nutrition, focus = (self.rules[section][picks[section]][1]
+                                                        for section in self.sections)
+        else:
+            mental_health, fitness, nutrition, focus = self.cells[cell]
+        if _on_scale(mood, stress, energy):
+            insights = self.insights[cell][bool(has_feelings)]
+        else:
+            insights = self._insights(focus, mood, stress, energy, has_feelings)
+        return {
+            "mental_health": list(mental_health),
+            "fitness": list(fitness),
+            "nutrition": list(nutrition),
+            "personalized_insights": insights,
+            "motivation_message": motivation
+        }
+
+    @staticmethod
+    def _insights(focus, mood, stress, energy, has_feelings):
+        return (f"Based on your mood score of {mood}/10, stress level of {stress}/10, "
+                f"and energy level of {energy}/10, "
+                + (FEELINGS_INSIGHT + focus if has_feelings else GENERAL_INSIGHT)
+                + CLOSING_INSIGHT)
+
+    # ── many users ───────────────────────────────────────────────
+    def cell_array(self, mood, stress, energy):
+        """Table positions for equally long score arrays (NaN → neutral, clipped to 1-10);
+        -1 where a score is fractional and the rules must be matched directly"""
+        columns = [np.nan_to_num(np.asarray(a, dtype=np.float64), nan=NEUTRAL)
+                   for a in (mood, stress, energy)]
+        grid = [np.clip(c, 1, 10).astype(np.intp) - 1 for c in columns]
+        cells = (grid[0] * 10 + grid[1]) * 10 + grid[2]
+        cells[np.any([c != np.floor(c) for c in columns], axis=0)] = -1
+        return cells
+
+    def rule_index_arrays(self, mood, stress, energy):
+        """{section: uint8 array of rule indexes} – rule choice for a whole cohort"""
+        cells = self.cell_array(mood, stress, energy)
+        out = {section: table[cells] for section, table in self.arrays.items()}
+        for n in np.flatnonzero(cells < 0).tolist():        # fractional scores
+            for section, rule in self._match(mood[n], stress[n], energy[n]).items():
+                out[section][n] = rule
+        return out
+
+    def plans(self, profiles, feelings_descriptions=None, seed=None):
+        """Fallback plans for a list of user_data dicts.
+
+        The whole batch goes through cell_array() at once and each distinct
+        (cell, feelings?, motivation) is rendered once; users that share it
+        get a copy of the same dict, so their recommendation lists are shared
+        – treat them as read-only. Users with fractional, out-of-range or
+        non-int scores are rendered one by one.
+        """
+        if not profiles:
+            return []
+        columns = [[p.get(axis, NEUTRAL) for p in profiles] for axis in AXES]
+        scores = [_score_array(column) for column in columns]
+        cells = self.cell_array(*scores)
+        feelings = feelings_descriptions or [""] * len(profiles)
+        picks = np.random.default_rng(seed).integers(len(self.motivations), size=len(profiles))
+
+        # the pre-rendered insights quote the scores, so they only fit plain 1-10 ints
+        if set(map(type, itertools.chain(*columns))) == {int}:
+            fast = np.all([(a >= 1) & (a <= 10) for a in scores], axis=0)
+        else:
+            fast = np.array([_on_scale(*values) for values in zip(*columns)], dtype=bool)
+        keys = (cells * 2 + np.fromiter(map(bool, feelings), dtype=bool, count=len(profiles))) \
+            * len(self.motivations) + picks
+        keys[~fast] = -1
+
+        templates = {}
+        for key in np.unique(keys[fast]).tolist():
+            cell, has_feelings = divmod(key // len(self.motivations), 2)
+            templates[key] = self._render(cell, *self._cell_scores(cell), has_feelings,
+                                          self.motivations[key % len(self.motivations)])
+        out = [templates[key].copy() if key >= 0 else None for key in keys.tolist()]
+        for n in np.flatnonzero(~fast).tolist():
+            cell = int(cells[n])
+            out[n] = self._render(None if cell < 0 else cell, columns[0][n], columns[1][n],
+                                  columns[2][n], feelings[n], self.motivations[picks[n]])
+        return out
+
+    @staticmethod
+    def _cell_scores(cell):
+        """(mood, stress, energy) of a table position"""
+        return cell // 100 + 1, cell // 10 % 10 + 1, cell % 10 + 1
@@ -0,0 +1,188 @@
+"""
+jobs.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Background job queue for slow AI work.
+
+• Request threads enqueue a job and return its id immediately
+• A fixed pool of worker threads runs the handler in an app context
+• Job rows live in the PlanJob table, so status / results survive a
+  restart; idle workers claim queued rows no live queue is running
+  (left by a restart or another process), one at a time
+• Every claim is an atomic UPDATE, so a job runs once however many
+  processes see it
+• A periodic sweep deletes expired finished jobs and re-queues jobs
+  stuck "running" past `stale_after`
+• Bounded depth – submit() raises QueueFull so callers can answer 429
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from models import db, PlanJob
+
+
+class QueueFull(Exception):
+    """Raised when the in-process queue is at max depth"""
+
+
+class JobQueue:
+    def __init__(self, app, handler, workers=4, max_depth=64,
+                 stale_after=120, retention=86400, poll_interval=2, sweep_interval=60):
+        self.app            = app
+        self.handler        = handler          # handler(user_id, payload) -> dict
+        self.workers        = workers
+        self.stale_after    = stale_after      # seconds before a "running" job is retried
+        self.retention      = retention        # seconds finished jobs are kept
+        self.poll_interval  = poll_interval    # idle seconds before a worker looks at the table
+        self.sweep_interval = sweep_interval   # seconds between retention / stale sweeps
+        self.counters       = dict.fromkeys(("claimed_from_table", "requeued_stale", "expired"), 0)
+        self._queue         = queue.Queue(maxsize=max_depth)
+        self._threads       = []
+        self._start_lock    = threading.Lock()
+        self._sweep_lock    = threading.Lock()
+        self._count_lock    = threading.Lock()
+        self._swept_at      = 0.0              # monotonic; 0 sweeps on the first idle tick
+
+    # ── lifecycle ────────────────────────────────────────────────
+    def start(self):
+        """Start the workers once; later calls return immediately"""
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            self._start()
+
+    def _start(self):
+        for n in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"plan-job-{n}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def sweep(self):
+        """Delete expired finished jobs, re-queue stale running ones; returns (expired, requeued)"""
+        now = datetime.utcnow()
+        expired = PlanJob.query.filter(
+            PlanJob.status.in_(("done", "failed")),
+            PlanJob.updated_date < now - timedelta(seconds=self.retention)
+        ).delete(synchronize_session=False)
+        requeued = PlanJob.query.filter(
+            PlanJob.status == "running",
+            PlanJob.updated_date < now - timedelta(seconds=self.stale_after)
+        ).update({"status": "queued", "updated_date": now}, synchronize_session=False)
+        db.session.commit()
+        return expired, requeued
+
+    def _maybe_sweep(self):
+        # one worker per process sweeps; the others carry on
+        if time.monotonic() - self._swept_at < self.sweep_interval:
+            return
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._swept_at = time.monotonic()
+            expired, requeued = self.sweep()
+            self._count("expired", expired)
+            self._count("requeued_stale", requeued)
+        finally:
+            self._sweep_lock.release()
+
+    # ── producer side ────────────────────────────────────────────
+    def submit(self, user_id, payload):
+        if self._queue.full():
+            raise QueueFull()
+
+        job = PlanJob(id=uuid.uuid4().hex, user_id=user_id, payload=json.dumps(payload))
+        db.session.add(job)
+        db.session.commit()
+
+        try:
+            self._queue.put_nowait(job.id)
+        except queue.Full:
+            db.session.delete(job)
+            db.session.commit()
+            raise QueueFull()
+        return job.id
+
+    def get(self, job_id, user_id):
+        return PlanJob.query.filter_by(id=job_id, user_id=user_id).first()
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _count(self, name, n=1):
+        with self._count_lock:
+            self.counters[name] += n
+
+    def stats(self):
+        return dict(self.counters, queue_depth=self.depth())
+
+    # ── consumer side ────────────────────────────────────────────
+    def _work(self):
+        busy = False                        # just ran a job from the table – look again at once
+        while True:
+            try:
+                job_id = self._queue.get(block=not busy, timeout=self.poll_interval)
+            except queue.Empty:
+                busy = self._idle()
+                continue
+            try:
+                with self.app.app_context():
+                    self._run(job_id)
+            except Exception as e:
+                print(f"Plan job {job_id} crashed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _idle(self):
+        """Nothing queued here: sweep if due, then run one queued row from the table"""
+        with self.app.app_context():
+            try:
+                self._maybe_sweep()
+                job_id = db.session.execute(
+                    select(PlanJob.id).filter_by(status="queued")
+                    .order_by(PlanJob.created_date).limit(1)
+                ).scalar()
+                if job_id is None or not self._claim(job_id):
+                    return False
+                self._count("claimed_from_table")
+                self._execute(job_id)
+                return True
+            except Exception as e:
+                print(f"Plan job worker idle pass failed: {e}")
+                return False
+            finally:
+                db.session.remove()
+
+    def _claim(self, job_id):
+        # atomic, so a row several workers / processes see runs once
+        claimed = PlanJob.query.filter_by(id=job_id, status="queued").update(
+            {"status": "running", "updated_date": datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.session.commit()
+        return bool(claimed)
+
+    def _run(self, job_id):
+        if self._claim(job_id):
+            self._execute(job_id)
+        db.session.remove()
+
+    def _execute(self, job_id):
+        job = db.session.get(PlanJob, job_id)
+        try:
+            result     = self.handler(job.user_id, json.loads(job.payload))
+            job.result = json.dumps(result)
+            job.status = "done"
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(PlanJob, job_id)
+            job.error  = str(e)
+            job.status = "failed"
+        db.session.commit()
@@ -0,0 +1,215 @@
+"""
+json_extract.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Single-pass JSON object extraction for model output.
+
+JSONObjectScanner is fed text (all at once or chunk by chunk), finds
+the first balanced top-level `{...}` while respecting strings and
+escapes, and reports:
+
+• ("item",  key, index, value) – each string closed inside a top-level list
+• ("field", key, value)        – each top-level string value
+• ("done",  obj)               – the whole object once its brace closes
+
+extract_json() decodes the first object from a complete response (or
+drives the scanner over a chunk iterator) and checks the result against
+a per-call schema.
+"""
+
+import json
+import re
+
+# structural characters outside strings / string terminators inside them
+_STRUCTURAL = re.compile(r'["{}\[\],:]')
+_STRING_END = re.compile(r'["\\]')
+_DECODER    = json.JSONDecoder()
+
+PLAN_SCHEMA = {
+    "mental_health"        : list,
+    "fitness"              : list,
+    "nutrition"            : list,
+    "personalized_insights": str,
+    "motivation_message"   : str,
+}
+
+FEELINGS_SCHEMA = {
+    "emotional_state"        : str,
+    "stress_indicators"      : list,
+    "recommended_focus_areas": list,
+    "empathy_message"        : str,
+}
+
+
+class ExtractionError(ValueError):
+    """No usable JSON object in a model response"""
+
+
+class JSONObjectScanner:
+    def __init__(self):
+        self.done     = False
+        self.result   = None
+        self._tail    = ""         # text later chunks still need
+        self._pos     = 0          # next char of the tail to scan
+        self._reset()
+
+    def _reset(self):
+        self._start    = -1        # opening brace in the working buffer
+        self._parts    = []        # object text already scanned
+        self._stack    = []        # open containers, "{" or "["
+        self._in_str   = False
+        self._str_at   = 0         # opening quote in the working buffer
+        self._key      = None      # current top-level key
+        self._want_key = False     # next depth-1 string is a key
+        self._index    = 0         # position inside a top-level list
+
+    def feed(self, chunk):
+        """Consume a chunk and return the events it completed"""
+        if self.done:
+            return []
+        buf    = self._tail + chunk
+        end    = len(buf)
+        events = []
+        i      = self._pos
+
+        while i < end:
+            if self._in_str:
+                m = _STRING_END.search(buf, i)
+                if m is None:
+                    i = end
+                    break
+                j = m.start()
+                if buf[j] == "\\":
+                    if j + 1 == end:        # escape split across chunks
+                        i = j
+                        break
+                    i = j + 2
+                    continue
+                self._in_str = False
+                self._close_string(buf, j, events)
+                i = j + 1
+                continue
+
+            if self._start < 0:
+                j = buf.find("{", i)
+                if j < 0:
+                    i = end
+                    break
+                self._start    = j
+                self._stack    = ["{"]
+                self._want_key = True
+                i = j + 1
+                continue
+
+            m = _STRUCTURAL.search(buf, i)
+            if m is None:
+                i = end
+                break
+            j  = m.start()
+            ch = buf[j]
+            i  = j + 1
+
+            if ch == '"':
+                self._in_str = True
+                self._str_at = j
+            elif ch == "{" or ch == "[":
+                if ch == "[" and len(self._stack) == 1:
+                    self._index = 0
+                self._stack.append(ch)
+            elif ch == "}" or ch == "]":
+                self._stack.pop()
+                if self._stack:
+                    continue
+                self._parts.append(buf[self._start:i])
+                text = "".join(self._parts)
+                try:
+                    self.result = json.loads(text)
+                except ValueError:
+                    # not JSON after all (e.g. "{name}" in prose) – rescan after it
+                    buf, end, i = text[1:] + buf[i:], len(text) - 1 + end - i, 0
+                    self._reset()
+                    continue
+                self.done = True
+                self._tail, self._parts = "", []
+                events.append(("done", self.result))
+                return events
+            elif len(self._stack) == 1:
+                self._want_key = ch == ","
+
+        # move scanned object text into _parts so buffers never grow quadratically
+        keep = end
+        if self._start >= 0:
+            keep = self._str_at if self._in_str else i
+            self._parts.append(buf[self._start:keep])
+            self._start = 0
+        if self._in_str:
+            self._str_at -= keep
+        self._tail = buf[keep:]
+        self._pos  = i - keep
+        return events
+
+    def _close_string(self, buf, end, events):
+        depth = len(self._stack)
+        if depth == 1:
+            value = _decode_string(buf[self._str_at:end + 1])
+            if self._want_key:
+                self._key = value
+            else:
+                events.append(("field", self._key, value))
+        elif depth == 2 and self._stack[1] == "[":
+            events.append(("item", self._key, self._index,
+                           _decode_string(buf[self._str_at:end + 1])))
+            self._index += 1
+
+
+def _decode_string(literal):
+    try:
+        return json.loads(literal)
+    except ValueError:
+        return literal[1:-1]
+
+
+def validate(obj, schema):
+    """Raise ExtractionError unless obj has every schema key with the right type"""
+    if not isinstance(obj, dict):
+        raise ExtractionError("response JSON is not an object")
+    for key, kind in schema.items():
+        value = obj.get(key)
+        if not isinstance(value, kind):
+            raise ExtractionError(f"'{key}' missing or not a {kind.__name__}")
+        if kind is list and not all(isinstance(item, str) for item in value):
+            raise ExtractionError(f"'{key}' must be a list of strings")
+    return obj
+
+
+def _decode_first_object(text, max_attempts=16):
+    # raw_decode parses in C and stops at the object's closing brace, so
+    # nested braces inside strings and trailing prose are both harmless
+    start = text.find("{")
+    while start != -1 and max_attempts:
+        try:
+            return _DECODER.raw_decode(text, start)[0]
+        except ValueError as e:
+            if e.pos >= len(text):          # truncated – nothing later can close
+                break
+        start = text.find("{", start + 1)
+        max_attempts -= 1
+    raise ExtractionError("no complete JSON object in response")
+
+
+def extract_json(source, schema=None):
+    """First complete JSON object in a string or an iterable of text chunks"""
+    if isinstance(source, str):
+        result = _decode_first_object(source)
+    else:
+        scanner = JSONObjectScanner()
+        for chunk in source:
+            scanner.feed(chunk)
+            if scanner.done:
+                break
+        if not scanner.done:
+            raise ExtractionError("no complete JSON object in response")
+        result = scanner.result
+
+    if schema is not None:
+        validate(result, schema)
+    return result
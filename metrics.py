@@ -0,0 +1,201 @@
+"""
+metrics.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+In-process counters / histograms, rendered in the Prometheus text
+format by the /metrics endpoint.
+
+• Recording is a dict lookup, a bisect and two additions under one
+  lock – cheap enough for every query and every model call
+• instrument_engine() times every SQL statement (by verb) via the
+  SQLAlchemy cursor events; instrument_app() times every Flask route
+  and can add a Server-Timing header (app total + DB time)
+• Components that already keep their own stats() (caches, guard,
+  single-flight, job queue) are exported through collectors at scrape
+  time – nothing extra on their hot paths
+
+Each worker process has its own registry; scrape every worker.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import request
+from sqlalchemy import event
+
+# seconds – covers a 1 ms query up to a model call near AI_CALL_TIMEOUT
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}                   # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *labels):
+        slot = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 3)
+            series[slot] += 1               # slot len(buckets) = above the last bound
+            series[-2] += seconds
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self):
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = _labels(self.labelnames, labels, 'le="%s"' % bound)
+                yield f"{self.name}_bucket{le} {cumulative}"
+            le = _labels(self.labelnames, labels, 'le="+Inf"')
+            yield f"{self.name}_bucket{le} {values[-1]}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {values[-2]:.6f}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {values[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics    = {}
+        self.collectors = {}                # prefix -> (stats fn, label)
+
+    def counter(self, name, help, labels=()):
+        return self.metrics.setdefault(name, Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.metrics.setdefault(name, Histogram(name, help, labels, buckets))
+
+    def add_collector(self, prefix, stats, label="name"):
+        """Export a component's stats() dict as gauges named <prefix>_<key>.
+
+        Numbers become plain gauges, nested dicts one gauge per entry
+        (labelled `label`), strings a 1-valued gauge labelled with the value.
+        """
+        self.collectors[prefix] = (stats, label)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.kind}"]
+            lines += metric.samples()
+        for prefix, (stats, label) in self.collectors.items():
+            try:
+                values = stats()
+            except Exception as e:          # a broken collector must not break the scrape
+                lines.append(f"# collector {prefix} failed: {e}")
+                continue
+            for key, value in values.items():
+                name = f"{prefix}_{key}"
+                lines.append(f"# TYPE {name} gauge")
+                if isinstance(value, dict):
+                    lines += [f"{name}{_labels((label,), (k,))} {v}" for k, v in sorted(value.items())]
+                elif isinstance(value, str):
+                    lines.append(f"{name}{_labels(('state',), (value,))} 1")
+                else:
+                    lines.append(f"{name} {float(value):g}")
+        return "\n".join(lines) + "\n"
+
+
+# ── process-wide metrics ─────────────────────────────────────────
+registry = Registry()
+
+HTTP_SECONDS  = registry.histogram("http_request_duration_seconds", "Flask request latency",
+                                   ("endpoint", "method", "status"))
+DB_SECONDS    = registry.histogram("db_query_duration_seconds", "SQL statement latency", ("verb",))
+AI_SECONDS    = registry.histogram("ai_model_call_duration_seconds",
+                                   "Model backend latency (incl. guard retries)", ("kind",))
+AI_EXTRACT    = registry.histogram("ai_json_extract_duration_seconds",
+                                   "Time to extract + validate JSON from a model answer", ("kind",),
+                                   buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05))
+AI_SERVED     = registry.counter("ai_answers_total", "AI answers by kind and source (model/fallback)",
+                                 ("kind", "source"))
+
+_request = threading.local()                # per-thread DB time for the current request
+
+
+# ── SQLAlchemy ───────────────────────────────────────────────────
+def instrument_engine(engine):
+    """Time every statement executed through `engine`"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()      # one cursor at a time per connection
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"]
+        DB_SECONDS.observe(elapsed, statement.split(None, 1)[0].upper())
+        _request.db = getattr(_request, "db", 0.0) + elapsed
+
+
+# ── Flask ────────────────────────────────────────────────────────
+def instrument_app(app, timing_header=False):
+    """Per-route latency histogram; optional Server-Timing response header.
+
+    Streamed responses (SSE) are timed up to their headers.
+    """
+
+    @app.before_request
+    def _start_timer():
+        _request.start = time.perf_counter()
+        _request.db = 0.0
+
+    @app.after_request
+    def _record(response):
+        start = getattr(_request, "start", None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        HTTP_SECONDS.observe(elapsed, request.endpoint or "unmatched", request.method,
+                             response.status_code)
+        if timing_header:
+            response.headers["Server-Timing"] = (f"app;dur={elapsed * 1000:.1f}, "
+                                                 f"db;dur={_request.db * 1000:.1f}")
+        _request.start = None
+        return response
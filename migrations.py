@@ -0,0 +1,160 @@
+"""
+migrations.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Lightweight, idempotent schema upgrades for existing databases.
+
+db.create_all() only creates missing *tables*; columns and indexes
+declared later on an existing table (e.g. an old wellness_2070.db) are
+added here, legacy JSON-in-Text rows are converted to the normalised
+plan / feelings tables, and empty rollup tables are built from the raw
+logs. Safe to run on every start-up.
+"""
+
+import json
+
+from sqlalchemy import func, inspect, insert, select
+
+from models import (
+    db, WellnessPlan, WellnessPlanItem, FeelingsLog, FeelingsInsight, MoodRollup, FeelingsRollup
+)
+from plan_store import plan_item_rows, insight_rows
+from rollups import compact
+
+
+def ensure_columns(engine=None):
+    """ALTER TABLE ADD COLUMN for nullable model columns an old table lacks"""
+    engine    = engine or db.engine
+    inspector = inspect(engine)
+    tables    = set(inspector.get_table_names())
+
+    added = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        present = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present or not column.nullable:
+                continue
+            ddl = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {ddl}'
+                )
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def ensure_indexes(engine=None):
+    """Create every model index missing from the database (or rebuild one whose
+    uniqueness changed); returns their names"""
+    engine   = engine or db.engine
+    existing = {}
+    inspector = inspect(engine)
+    for table in inspector.get_table_names():
+        existing.update((ix["name"], bool(ix["unique"])) for ix in inspector.get_indexes(table))
+
+    created = []
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if existing.get(index.name) == bool(index.unique):
+                continue
+            with engine.begin() as conn:
+                if index.name in existing:
+                    index.drop(bind=conn)
+                index.create(bind=conn)
+            created.append(index.name)
+
+    if created and engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")     # refresh planner statistics
+    return created
+
+
+def deactivate_duplicate_plans():
+    """Keep only each user's newest active plan (before the unique index is built)"""
+    newest = select(func.max(WellnessPlan.id)).where(WellnessPlan.is_active == True)\
+               .group_by(WellnessPlan.user_id)
+    count = WellnessPlan.query.filter(
+        WellnessPlan.is_active == True, WellnessPlan.id.not_in(newest)
+    ).update({"is_active": False}, synchronize_session=False)
+    db.session.commit()
+    return count
+
+
+def _loads(value):
+    try:
+        return json.loads(value) if value else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _str_list(value):
+    return [str(item) for item in value] if isinstance(value, list) else []
+
+
+def backfill_normalized(batch_size=1000):
+    """Move legacy JSON plan lists / feelings analyses into the normalised tables.
+
+    Converted rows get their JSON columns set to NULL, so re-running only
+    touches what is left. Returns (plans, feelings) converted.
+    """
+    plans = feelings = 0
+
+    while True:
+        rows = WellnessPlan.query.filter(
+            (WellnessPlan.mental_health_plan.isnot(None)) |
+            (WellnessPlan.fitness_plan.isnot(None)) |
+            (WellnessPlan.nutrition_plan.isnot(None))
+        ).order_by(WellnessPlan.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        items = []
+        for plan in rows:
+            items += plan_item_rows(plan.id, {
+                "mental_health": _str_list(_loads(plan.mental_health_plan)),
+                "fitness"      : _str_list(_loads(plan.fitness_plan)),
+                "nutrition"    : _str_list(_loads(plan.nutrition_plan)),
+            })
+            plan.mental_health_plan = plan.fitness_plan = plan.nutrition_plan = None
+        if items:
+            db.session.execute(insert(WellnessPlanItem), items)
+        db.session.commit()
+        plans += len(rows)
+
+    while True:
+        rows = FeelingsLog.query.filter(FeelingsLog.ai_analysis.isnot(None))\
+                 .order_by(FeelingsLog.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        insights = []
+        for log in rows:
+            analysis = _loads(log.ai_analysis)
+            if not isinstance(analysis, dict):
+                analysis = {}
+            log.emotional_state = analysis.get("emotional_state")
+            log.empathy_message = analysis.get("empathy_message")
+            insights += insight_rows(log.id, {
+                "stress_indicators"      : _str_list(analysis.get("stress_indicators")),
+                "recommended_focus_areas": _str_list(analysis.get("recommended_focus_areas")),
+            })
+            log.ai_analysis = None
+        if insights:
+            db.session.execute(insert(FeelingsInsight), insights)
+        db.session.commit()
+        feelings += len(rows)
+
+    return plans, feelings
+
+
+def upgrade_schema(engine=None):
+    """Bring an existing database up to the current models"""
+    db.create_all()
+    ensure_columns(engine)
+    deactivate_duplicate_plans()
+    created = ensure_indexes(engine)
+    backfill_normalized()
+    if MoodRollup.query.first() is None and FeelingsRollup.query.first() is None:
+        compact()             # first run with rollup tables: build them from history
+    return created
@@ -1,9 +1,22 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import event
 from datetime import datetime
 
 db = SQLAlchemy()
 
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run `PRAGMA name = value` on every new connection of a SQLite engine"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(20), unique=True, nullable=False)
@@ -22,6 +35,7 @@ class User(db.Model, UserMixin):
 class WellnessPlan(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # legacy JSON lists – no longer written, moved to WellnessPlanItem by migrations.backfill_normalized
     mental_health_plan = db.Column(db.Text)
     fitness_plan = db.Column(db.Text)
     nutrition_plan = db.Column(db.Text)
@@ -30,6 +44,26 @@ class WellnessPlan(db.Model):
     created_date = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
 
+    __table_args__ = (
+        # at most one active plan per user – enforced here; partial index keeps it tiny
+        db.Index('ix_wellness_plan_user_active', user_id, unique=True,
+                 sqlite_where=db.text('is_active = 1'), postgresql_where=db.text('is_active')),
+    )
+
+    items = db.relationship('WellnessPlanItem', backref='plan', lazy=True,
+                            order_by='(WellnessPlanItem.category, WellnessPlanItem.ordinal)')
+
+class WellnessPlanItem(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    plan_id = db.Column(db.Integer, db.ForeignKey('wellness_plan.id'), nullable=False)
+    category = db.Column(db.String(20), nullable=False)  # mental_health, fitness, nutrition
+    ordinal = db.Column(db.Integer, nullable=False)  # position within the category
+    text = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_wellness_plan_item_plan', plan_id, category, ordinal),
+    )
+
 class MoodLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -39,13 +73,39 @@ class MoodLog(db.Model):
     notes = db.Column(db.Text)
     log_date = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # covers the dashboard's "latest moods" read without touching the table
+        db.Index('ix_mood_log_user_date', user_id, log_date.desc(),
+                 mood_score, stress_level, energy_level),
+    )
+
 class FeelingsLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     feelings_text = db.Column(db.Text, nullable=False)
-    ai_analysis = db.Column(db.Text)  # Store AI analysis as JSON
+    ai_analysis = db.Column(db.Text)  # legacy JSON – moved to the fields below by migrations.backfill_normalized
+    emotional_state = db.Column(db.String(100))
+    empathy_message = db.Column(db.Text)
     created_date = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_feelings_log_user_created', user_id, created_date.desc()),
+    )
+
+    insights = db.relationship('FeelingsInsight', backref='feelings_log', lazy=True,
+                               order_by='(FeelingsInsight.kind, FeelingsInsight.ordinal)')
+
+class FeelingsInsight(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    feelings_log_id = db.Column(db.Integer, db.ForeignKey('feelings_log.id'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # stress_indicator, focus_area
+    ordinal = db.Column(db.Integer, nullable=False)
+    text = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_feelings_insight_log', feelings_log_id, kind, ordinal),
+    )
+
 class VRContent(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -54,3 +114,63 @@ class VRContent(db.Model):
     duration = db.Column(db.Integer)  # in minutes
     difficulty_level = db.Column(db.String(20))
     file_path = db.Column(db.String(200))
+
+class PlanJob(db.Model):
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    status = db.Column(db.String(10), default='queued', index=True)  # queued, running, done, failed
+    payload = db.Column(db.Text, nullable=False)  # user_data + feelings as JSON
+    result = db.Column(db.Text)  # generated plan as JSON
+    error = db.Column(db.Text)
+    created_date = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_date = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class BatchRun(db.Model):
+    """Checkpoint of a cohort plan-generation run (batch_plans.py)"""
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    cohort = db.Column(db.String(30), nullable=False)
+    threshold = db.Column(db.Integer)
+    status = db.Column(db.String(10), default='running')  # running, done
+    last_user_id = db.Column(db.Integer, nullable=False, default=0)  # users are processed in id order
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    skipped = db.Column(db.Integer, default=0)  # users left on their old plan (fallback answer)
+    total = db.Column(db.Integer)  # cohort size when the run started
+    created_date = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_date = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class MoodRollup(db.Model):
+    """Per-user daily / weekly aggregates of MoodLog – maintained by rollups.py"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    period = db.Column(db.String(4), nullable=False)  # day, week (weeks start on Monday)
+    period_start = db.Column(db.Date, nullable=False)
+    logs = db.Column(db.Integer, nullable=False, default=0)
+    mood_n = db.Column(db.Integer, nullable=False, default=0)  # non-null scores in the period
+    mood_sum = db.Column(db.Integer, nullable=False, default=0)
+    mood_min = db.Column(db.Integer)
+    mood_max = db.Column(db.Integer)
+    stress_n = db.Column(db.Integer, nullable=False, default=0)
+    stress_sum = db.Column(db.Integer, nullable=False, default=0)
+    stress_min = db.Column(db.Integer)
+    stress_max = db.Column(db.Integer)
+    energy_n = db.Column(db.Integer, nullable=False, default=0)
+    energy_sum = db.Column(db.Integer, nullable=False, default=0)
+    energy_min = db.Column(db.Integer)
+    energy_max = db.Column(db.Integer)
+
+    __table_args__ = (
+        db.UniqueConstraint(user_id, period, period_start, name='uq_mood_rollup_key'),
+    )
+
+class FeelingsRollup(db.Model):
+    """Per-user daily / weekly emotional_state counts – maintained by rollups.py"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    period = db.Column(db.String(4), nullable=False)
+    period_start = db.Column(db.Date, nullable=False)
+    emotional_state = db.Column(db.String(100), nullable=False)  # 'unknown' when not analysed
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint(user_id, period, period_start, emotional_state, name='uq_feelings_rollup_key'),
+    )
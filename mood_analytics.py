@@ -0,0 +1,269 @@
+"""
+mood_analytics.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Vectorised mood / stress / energy trends over MoodLog history.
+
+• load_frame() pulls one or all users' logs in a single query straight
+  into NumPy column arrays, sorted by (user, time)
+• Every statistic works on the whole frame at once – users are segments
+  of the same arrays, so 1 user and 1 million logs go through the same
+  code with no per-row Python loop:
+    – rolling means        cumulative sums with per-user window starts
+    – EWMA trend           blockwise closed form (one step per block)
+    – per-user aggregates  np.bincount over the segment index
+    – day-of-week profile, stress ↔ energy correlation, mood slope,
+      z-score anomalies against the trailing window
+"""
+
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import select, extract
+
+from models import db, MoodLog
+
+METRICS  = ("mood", "stress", "energy")
+NEUTRAL  = 5.5                      # mid-point of the 1-10 scales, fills leading gaps
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DAY      = 86400
+
+
+# ── loading ──────────────────────────────────────────────────────
+class MoodFrame:
+    """MoodLog rows as column arrays, sorted by (user_id, ts)"""
+
+    def __init__(self, user_id, ts, mood, stress, energy):
+        self.user_id = user_id              # int64
+        self.ts      = ts                   # int64 epoch seconds (UTC)
+        self.values  = {"mood": mood, "stress": stress, "energy": energy}   # float64, NaN = missing
+
+        first = np.ones(len(user_id), dtype=bool)
+        first[1:] = user_id[1:] != user_id[:-1]
+        self.starts    = np.flatnonzero(first)          # first row of each user
+        self.seg       = np.cumsum(first) - 1           # row -> user index
+        self.seg_start = self.starts[self.seg]          # row -> first row of its user
+        self.users     = user_id[self.starts]
+
+    def __len__(self):
+        return len(self.ts)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """rows: float array of (user_id, ts, mood, stress, energy)"""
+        rows = rows[~np.isnan(rows[:, 1])]
+        uid, ts = rows[:, 0], rows[:, 1]
+        if not np.all((uid[1:] > uid[:-1]) | ((uid[1:] == uid[:-1]) & (ts[1:] >= ts[:-1]))):
+            rows = rows[np.lexsort((ts, uid))]
+        return cls(rows[:, 0].astype(np.int64), rows[:, 1].astype(np.int64),
+                   rows[:, 2], rows[:, 3], rows[:, 4])
+
+
+def load_frame(user_ids=None, since=None, chunk_size=100_000):
+    """One query for the selected users (default: everyone) since `since`"""
+    stmt = select(
+        MoodLog.user_id, extract("epoch", MoodLog.log_date),
+        MoodLog.mood_score, MoodLog.stress_level, MoodLog.energy_level
+    ).order_by(MoodLog.user_id, MoodLog.log_date)
+    if user_ids is not None:
+        stmt = stmt.where(MoodLog.user_id.in_(list(user_ids)))
+    if since is not None:
+        stmt = stmt.where(MoodLog.log_date >= since)
+
+    # Core result (no ORM row processing); plain tuples so NumPy copies in C
+    result = db.session.connection().execute(stmt.execution_options(yield_per=chunk_size))
+    parts  = [np.array(list(map(tuple, part)), dtype=np.float64)
+              for part in result.partitions()]
+    rows   = np.concatenate(parts) if parts else np.empty((0, 5))
+    return MoodFrame.from_rows(rows)
+
+
+# ── series kernels ───────────────────────────────────────────────
+def fill_missing(values, seg_start):
+    """Forward-fill NaNs inside each user; leading gaps get NEUTRAL"""
+    idx = np.where(np.isnan(values), -1, np.arange(len(values)))
+    np.maximum.accumulate(idx, out=idx)
+    ok = idx >= seg_start
+    return np.where(ok, values[np.maximum(idx, 0)], NEUTRAL)
+
+
+def _window_sums(values, lo, hi):
+    """Per-row (count, sum, sum of squares) of values[lo:hi], NaNs skipped"""
+    valid = ~np.isnan(values)
+    clean = np.where(valid, values, 0.0)
+    n  = np.concatenate(([0], np.cumsum(valid)))
+    s  = np.concatenate(([0.0], np.cumsum(clean)))
+    s2 = np.concatenate(([0.0], np.cumsum(clean * clean)))
+    return n[hi] - n[lo], s[hi] - s[lo], s2[hi] - s2[lo]
+
+
+def rolling_mean(values, seg_start, window):
+    """Mean of the last `window` logs of the same user (NaN-aware)"""
+    i = np.arange(len(values))
+    count, total, _ = _window_sums(values, np.maximum(i - window + 1, seg_start), i + 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+
+def ewma(values, seg_start, alpha):
+    """y[i] = α·x[i] + (1-α)·y[i-1], restarted at every user's first log.
+
+    Inside a block of B rows the recursion is a scaled cumulative sum:
+        y[i] = α·w^p·Σ w^-q·x[q] + w^(i-r+1)·carry      (w = 1-α)
+    with B small enough that w^-B cannot overflow, so only the carry
+    between blocks is sequential (len/B scalar steps).
+    """
+    x = fill_missing(values, seg_start)
+    n = len(x)
+    w = 1.0 - alpha
+    if n == 0 or w <= 0:
+        return x
+    if w >= 1:
+        return x[seg_start]
+
+    B   = max(1, min(n, int(230 / -math.log(w))))       # w^-B ≤ e^230
+    i   = np.arange(n)
+    pos = i % B
+    block_start = i - pos
+    reset = np.maximum(seg_start, block_start)          # where this row's partial sum starts
+
+    z = x * w ** -pos.astype(np.float64)
+    C = np.cumsum(np.pad(z, (0, (-n) % B)).reshape(-1, B), axis=1).ravel()[:n]
+    before  = np.where(reset > block_start, C[np.maximum(reset - 1, 0)], 0.0)
+    partial = alpha * w ** pos * (C - before)
+    decay   = w ** (i - reset + 1).astype(np.float64)
+    fresh   = reset == seg_start                        # user started inside this block
+
+    # carry = value of the previous block's last row
+    ends   = np.minimum(np.arange(B - 1, n + B - 1, B), n - 1)
+    carry  = np.empty(len(ends))
+    prev   = 0.0
+    for k, (p, d, f, x0) in enumerate(zip(partial[ends].tolist(), decay[ends].tolist(),
+                                          fresh[ends].tolist(), x[seg_start[ends]].tolist())):
+        carry[k] = prev
+        prev = p + d * (x0 if f else prev)
+
+    return partial + decay * np.where(fresh, x[seg_start], carry[i // B])
+
+
+def anomalies(values, seg_start, window, threshold=2.5, min_history=5):
+    """z-score of each log against the user's previous `window` logs"""
+    i = np.arange(len(values))
+    count, total, sq = _window_sums(values, np.maximum(i - window, seg_start), i)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        std  = np.sqrt(np.maximum(sq / count - mean * mean, 0.0))
+        z    = (values - mean) / np.maximum(std, 1.0)   # integer scales: ≥1 point of spread
+    flagged = (count >= min_history) & (np.abs(z) >= threshold)
+    return flagged, z
+
+
+# ── per-user aggregates ──────────────────────────────────────────
+def _per_user(frame, weights, valid=None):
+    if valid is not None:
+        weights = np.where(valid, weights, 0.0)
+    return np.bincount(frame.seg, weights=weights, minlength=len(frame.users))
+
+
+def user_stats(frame):
+    """Counts, means, mood slope, stress/energy correlation – one row per user"""
+    out = {"user_id": frame.users, "logs": np.bincount(frame.seg, minlength=len(frame.users))}
+    for name in METRICS:
+        v = frame.values[name]
+        valid = ~np.isnan(v)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[f"{name}_mean"] = _per_user(frame, v, valid) / _per_user(frame, valid.astype(float))
+
+    # least-squares mood slope, in points per week
+    mood  = frame.values["mood"]
+    valid = ~np.isnan(mood)
+    t     = (frame.ts - frame.ts[frame.seg_start]) / (7 * DAY)
+    n, St, Sx = (_per_user(frame, a, valid) for a in (np.ones(len(frame)), t, mood))
+    Stt, Stx  = _per_user(frame, t * t, valid), _per_user(frame, t * mood, valid)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["mood_slope_per_week"] = (n * Stx - St * Sx) / (n * Stt - St * St)
+
+    # Pearson correlation of stress vs. energy
+    s, e  = frame.values["stress"], frame.values["energy"]
+    valid = ~(np.isnan(s) | np.isnan(e))
+    n, Ss, Se = (_per_user(frame, a, valid) for a in (np.ones(len(frame)), s, e))
+    Sss, See, Sse = (_per_user(frame, a, valid) for a in (s * s, e * e, s * e))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["stress_energy_corr"] = (n * Sse - Ss * Se) / np.sqrt((n * Sss - Ss * Ss) * (n * See - Se * Se))
+
+    out["first_log"] = frame.ts[frame.starts]
+    out["last_log"]  = frame.ts[np.r_[frame.starts[1:], len(frame)] - 1]
+    return out
+
+
+def weekday_profile(frame, metric="mood"):
+    """(users × 7) mean per weekday minus the user's overall mean"""
+    v     = frame.values[metric]
+    valid = ~np.isnan(v)
+    dow   = (frame.ts // DAY + 3) % 7                   # 1970-01-01 was a Thursday
+    key   = frame.seg * 7 + dow
+    size  = len(frame.users) * 7
+    total = np.bincount(key, weights=np.where(valid, v, 0.0), minlength=size).reshape(-1, 7)
+    count = np.bincount(key, weights=valid.astype(float), minlength=size).reshape(-1, 7)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        overall = total.sum(axis=1) / count.sum(axis=1)
+        return total / count - overall[:, None]
+
+
+# ── API / batch views ────────────────────────────────────────────
+def _clean(values, digits=2):
+    """NumPy → JSON-safe list (NaN → None)"""
+    values = np.round(np.asarray(values, dtype=np.float64), digits)
+    return [None if math.isnan(v) else v for v in values.tolist()]
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(int(ts), tz=timezone.utc).isoformat()
+
+
+def user_trends(frame, window=7, alpha=0.3, threshold=2.5):
+    """Everything /api/mood-trends shows for a single-user frame"""
+    if not len(frame):
+        return {"points": 0}
+
+    out = {"points": len(frame), "dates": [_iso(t) for t in frame.ts.tolist()]}
+    flags = []
+    for name in METRICS:
+        v = frame.values[name]
+        flagged, z = anomalies(v, frame.seg_start, window, threshold)
+        out[name] = {
+            "values" : _clean(v),
+            "rolling": _clean(rolling_mean(v, frame.seg_start, window)),
+            "ewma"   : _clean(ewma(v, frame.seg_start, alpha))
+        }
+        flags += [{"date": _iso(frame.ts[k]), "metric": name,
+                   "value": float(v[k]), "z": round(float(z[k]), 2)}
+                  for k in np.flatnonzero(flagged).tolist()]
+
+    stats = user_stats(frame)
+    out["summary"] = {key: _clean(stats[key])[0] for key in
+                      ("mood_mean", "stress_mean", "energy_mean",
+                       "mood_slope_per_week", "stress_energy_corr")}
+    out["weekday_mood"] = dict(zip(WEEKDAYS, _clean(weekday_profile(frame)[0])))
+    out["anomalies"]    = sorted(flags, key=lambda f: f["date"])
+    return out
+
+
+def summarize_all(frame, window=7, threshold=2.5):
+    """Per-user summary rows for every user in the frame (batch job)"""
+    stats  = user_stats(frame)
+    season = weekday_profile(frame)
+    flags  = np.zeros(len(frame), dtype=np.int64)
+    for name in METRICS:
+        flags += anomalies(frame.values[name], frame.seg_start, window, threshold)[0]
+    anomaly_counts = np.bincount(frame.seg, weights=flags, minlength=len(frame.users))
+
+    columns = {key: _clean(value) for key, value in stats.items()
+               if key not in ("user_id", "logs", "first_log", "last_log")}
+    for n, user_id in enumerate(stats["user_id"].tolist()):
+        row = {"user_id": user_id, "logs": int(stats["logs"][n]),
+               "first_log": _iso(stats["first_log"][n]), "last_log": _iso(stats["last_log"][n]),
+               "anomalies": int(anomaly_counts[n])}
+        row.update((key, values[n]) for key, values in columns.items())
+        row["weekday_mood"] = dict(zip(WEEKDAYS, _clean(season[n])))
+        yield row
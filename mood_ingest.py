@@ -0,0 +1,198 @@
+"""
+mood_ingest.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Mood-log writes: the single-entry slider form and bulk sync from
+wearables / offline devices.
+
+• Bulk bodies are NDJSON (validated line by line as the request body
+  streams in) or JSON – a list of entry objects, a list of rows in
+  COLUMNS order, or {"columns": [...], "rows": [[...], ...]}
+• Entries are deduplicated by (user, log_date): inside the batch and
+  against the rows already stored for that time span (one indexed read
+  on ix_mood_log_user_date); entries older than the archive horizon
+  (archive.py) are rejected
+• Accepted rows go in with executemany (chunked), are folded into the
+  rollups and committed in one transaction; bad entries are skipped and
+  reported, they never fail the whole batch
+
+Targets (SQLite, one core): ≥ 50k entries/s parse + validate, a 10k
+entry sync committed in well under a second – see
+benchmarks/bench_mood_ingest.py.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+
+from models import db, MoodLog
+from rollups import record_moods
+
+COLUMNS    = ("log_date", "mood_score", "stress_level", "energy_level", "notes")
+SCORES     = ("mood_score", "stress_level", "energy_level")
+MAX_NOTES  = 1000
+MAX_ERRORS = 50                         # errors echoed back per request
+CLOCK_SKEW = timedelta(minutes=5)       # how far in the future a device clock may be
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl",
+                "application/x-jsonlines")
+
+
+class EntryError(ValueError):
+    """An entry that can't be stored – reported back, the rest of the batch goes on"""
+
+
+class TooManyEntries(ValueError):
+    """The body holds more entries than one request may write"""
+
+
+# ── parsing ──────────────────────────────────────────────────────
+def parse_timestamp(value):
+    """ISO-8601 string or epoch seconds → naive UTC datetime (like log_date)"""
+    if isinstance(value, bool):
+        raise EntryError("log_date must be an ISO-8601 string or epoch seconds")
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+        except (OverflowError, OSError, ValueError):
+            raise EntryError(f"log_date {value!r} is out of range")
+    if isinstance(value, str):
+        try:
+            ts = datetime.fromisoformat(value)
+        except ValueError:
+            raise EntryError(f"log_date {value[:40]!r} is not ISO-8601")
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+        return ts
+    raise EntryError("log_date must be an ISO-8601 string or epoch seconds")
+
+
+def validate_entry(raw, now, require_date=True):
+    """One raw entry (dict or COLUMNS-ordered list) → a MoodLog row dict without user_id"""
+    if isinstance(raw, list):
+        if len(raw) > len(COLUMNS):
+            raise EntryError(f"row has {len(raw)} values, expected at most {len(COLUMNS)}")
+        raw = dict(zip(COLUMNS, raw))
+    elif not isinstance(raw, dict):
+        raise EntryError("entry must be an object or a row array")
+
+    row = {}
+    for name in SCORES:
+        value = raw.get(name)
+        if value is not None:
+            if type(value) is not int:
+                if not (isinstance(value, float) and value.is_integer()):
+                    raise EntryError(f"{name} must be an integer 1-10")
+                value = int(value)
+            if not 1 <= value <= 10:
+                raise EntryError(f"{name} must be an integer 1-10")
+        row[name] = value
+    if row["mood_score"] is None and row["stress_level"] is None and row["energy_level"] is None:
+        raise EntryError("entry has no scores")
+
+    notes = raw.get("notes")
+    if notes is not None and (not isinstance(notes, str) or len(notes) > MAX_NOTES):
+        raise EntryError(f"notes must be a string of at most {MAX_NOTES} characters")
+    row["notes"] = notes
+
+    if raw.get("log_date") is None:
+        if require_date:
+            raise EntryError("log_date is required")
+        row["log_date"] = now
+    else:
+        row["log_date"] = parse_timestamp(raw["log_date"])
+        if row["log_date"] > now + CLOCK_SKEW:
+            raise EntryError("log_date is in the future")
+    return row
+
+
+def iter_ndjson(lines):
+    """(line number, entry or EntryError) for each non-blank line of an NDJSON body"""
+    for n, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield n, json.loads(line)
+        except ValueError as e:
+            yield n, EntryError(f"invalid JSON: {e}")
+
+
+def iter_json(payload):
+    """(position, entry) for a JSON list body or a {"columns", "rows"} body"""
+    if isinstance(payload, dict) and "rows" in payload:
+        columns = payload.get("columns") or COLUMNS
+        if not isinstance(columns, (list, tuple)) or not all(isinstance(c, str) for c in columns):
+            raise EntryError('"columns" must be a list of column names')
+        if not isinstance(payload["rows"], list):
+            raise EntryError('"rows" must be a list of rows')
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise EntryError(f"unknown columns: {', '.join(sorted(unknown))}")
+        for n, values in enumerate(payload["rows"], 1):
+            yield n, dict(zip(columns, values)) if isinstance(values, list) else values
+    elif isinstance(payload, list):
+        yield from enumerate(payload, 1)
+    else:
+        raise EntryError('body must be a JSON array or {"columns": [...], "rows": [...]}')
+
+
+# ── writing ──────────────────────────────────────────────────────
+def ingest(user_id, entries, max_entries=10000, chunk_size=1000, require_date=True,
+           not_before=None):
+    """Validate, dedupe and store (position, raw entry) pairs for one user; commits.
+
+    Returns {"accepted", "duplicates", "rejected", "errors", "rows"} –
+    `rows` are the stored rows, `errors` the first MAX_ERRORS problems.
+    Raises TooManyEntries (nothing is written) past `max_entries`.
+    Entries dated before `not_before` (the archive horizon) are rejected:
+    their originals may already be archived, so dedup can't see them.
+    """
+    now = datetime.utcnow()
+    rows, seen, errors = [], set(), []
+    duplicates = rejected = 0
+
+    for count, (position, raw) in enumerate(entries, 1):
+        if count > max_entries:
+            raise TooManyEntries(f"at most {max_entries} entries per request")
+        try:
+            if isinstance(raw, EntryError):
+                raise raw
+            row = validate_entry(raw, now, require_date)
+            if not_before is not None and row["log_date"] < not_before:
+                raise EntryError(f"log_date is before {not_before:%Y-%m-%d}; that history is archived")
+        except EntryError as e:
+            rejected += 1
+            if len(errors) < MAX_ERRORS:
+                errors.append({"entry": position, "error": str(e)})
+            continue
+        if row["log_date"] in seen:
+            duplicates += 1
+            continue
+        seen.add(row["log_date"])
+        row["user_id"] = user_id
+        rows.append(row)
+
+    if rows:
+        # one range read over (user_id, log_date) for everything already synced
+        stored = set(db.session.execute(
+            select(MoodLog.log_date).where(
+                MoodLog.user_id == user_id,
+                MoodLog.log_date.between(min(seen), max(seen))
+            )
+        ).scalars())
+        if stored:
+            fresh = [row for row in rows if row["log_date"] not in stored]
+            duplicates += len(rows) - len(fresh)
+            rows = fresh
+
+    if rows:
+        try:
+            for start in range(0, len(rows), chunk_size):
+                db.session.execute(insert(MoodLog), rows[start:start + chunk_size])
+            record_moods(rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    return {"accepted": len(rows), "duplicates": duplicates, "rejected": rejected,
+            "errors": errors, "rows": rows}
@@ -0,0 +1,28 @@
+"""
+password_worker.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+What the PasswordHasher processes run (auth.py). Kept to bcrypt only:
+the pool's fork server preloads this module, and every worker is
+started from that single-threaded server instead of forking the app
+process (which has request, job and executor threads by then).
+"""
+
+import bcrypt
+
+BCRYPT_MAX_BYTES = 72                   # bcrypt ignores the rest; bcrypt ≥ 5 refuses it
+
+
+def secret(password):
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES] if isinstance(password, str) \
+        else password[:BCRYPT_MAX_BYTES]
+
+
+def hash_password(password, rounds):
+    return bcrypt.hashpw(secret(password), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def check_password(password, pw_hash):
+    try:
+        return bcrypt.checkpw(secret(password), pw_hash.encode("utf-8"))
+    except ValueError:                  # malformed / non-bcrypt hash in the row
+        return False
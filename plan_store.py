@@ -0,0 +1,130 @@
+"""
+plan_store.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Reads / writes for the normalised plan and feelings tables.
+
+• Plans, plan items and feelings insights go in with one executemany each
+• load_active_plan() builds the dashboard dict from one joined query –
+  no JSON columns are read or parsed
+• replace_active_plan() swaps a user's active plan inside the caller's
+  transaction; the unique partial index allows one active plan per user
+"""
+
+from sqlalchemy import insert, select
+
+from models import db, WellnessPlan, WellnessPlanItem, FeelingsLog, FeelingsInsight
+from rollups import record_feelings
+
+PLAN_CATEGORIES = ("mental_health", "fitness", "nutrition")
+INSIGHT_KINDS   = {"stress_indicators": "stress_indicator",
+                   "recommended_focus_areas": "focus_area"}
+
+
+def plan_item_rows(plan_id, ai_out):
+    return [
+        {"plan_id": plan_id, "category": category, "ordinal": n, "text": text}
+        for category in PLAN_CATEGORIES
+        for n, text in enumerate(ai_out.get(category) or [])
+    ]
+
+
+def insight_rows(feelings_log_id, analysis):
+    return [
+        {"feelings_log_id": feelings_log_id, "kind": kind, "ordinal": n, "text": text}
+        for key, kind in INSIGHT_KINDS.items()
+        for n, text in enumerate(analysis.get(key) or [])
+    ]
+
+
+def add_plans(entries):
+    """Stage many (user_id, ai_out) plans with two executemany calls (caller commits).
+
+    Returns the new plan ids in entry order.
+    """
+    rows = [{"user_id"              : user_id,
+             "personalized_insights": ai_out.get("personalized_insights", ""),
+             "motivation_message"   : ai_out.get("motivation_message", ""),
+             "is_active"            : True} for user_id, ai_out in entries]
+    if not rows:
+        return []
+    ids = db.session.scalars(
+        insert(WellnessPlan).returning(WellnessPlan.id, sort_by_parameter_order=True), rows
+    ).all()
+
+    items = [row for plan_id, (_, ai_out) in zip(ids, entries)
+             for row in plan_item_rows(plan_id, ai_out)]
+    if items:
+        db.session.execute(insert(WellnessPlanItem), items)
+    return ids
+
+
+def add_plan(user_id, ai_out):
+    """Stage a plan row + its items (caller commits); returns the plan id"""
+    return add_plans([(user_id, ai_out)])[0]
+
+
+def deactivate_plans(user_ids):
+    """Stage `is_active = 0` for the users' active plans (caller commits)"""
+    return WellnessPlan.query.filter(
+        WellnessPlan.user_id.in_(user_ids), WellnessPlan.is_active == True
+    ).update({"is_active": False}, synchronize_session=False)
+
+
+def replace_active_plan(user_id, ai_out):
+    """Deactivate the user's plan and stage the new one, in the caller's transaction.
+
+    If a concurrent save activated a plan first, the insert fails with an
+    IntegrityError (unique partial index) instead of leaving two active plans.
+    """
+    deactivate_plans([user_id])
+    return add_plan(user_id, ai_out)
+
+
+def add_feelings(user_id, feelings_text, analysis):
+    """Stage a feelings log with its structured analysis (caller commits)"""
+    analysis = analysis or {}
+    log = FeelingsLog(
+        user_id         = user_id,
+        feelings_text   = feelings_text,
+        emotional_state = analysis.get("emotional_state"),
+        empathy_message = analysis.get("empathy_message")
+    )
+    db.session.add(log)
+    db.session.flush()
+
+    rows = insight_rows(log.id, analysis)
+    if rows:
+        db.session.execute(insert(FeelingsInsight), rows)
+    record_feelings([(user_id, log.created_date, log.emotional_state)])
+    return log
+
+
+def load_active_plan(user_id):
+    """Active plan as the dashboard dict, or None"""
+    # `is_active == True` renders "= 1", which matches the partial index; only
+    # the newest active plan's items are read, never a mix of two plans
+    newest = select(WellnessPlan.id)\
+        .where(WellnessPlan.user_id == user_id, WellnessPlan.is_active == True)\
+        .order_by(WellnessPlan.id.desc()).limit(1).scalar_subquery()
+    rows = db.session.query(
+        WellnessPlan.personalized_insights, WellnessPlan.motivation_message,
+        WellnessPlanItem.category, WellnessPlanItem.text
+    ).outerjoin(WellnessPlanItem, WellnessPlanItem.plan_id == WellnessPlan.id)\
+     .filter(WellnessPlan.id == newest)\
+     .order_by(WellnessPlanItem.category, WellnessPlanItem.ordinal).all()
+
+    if not rows:
+        return None
+
+    lists = {category: [] for category in PLAN_CATEGORIES}
+    for _, _, category, text in rows:
+        if category in lists:
+            lists[category].append(text)
+
+    return {
+        "mental_health_plan"    : lists["mental_health"],
+        "fitness_plan"          : lists["fitness"],
+        "nutrition_plan"        : lists["nutrition"],
+        "personalized_insights" : rows[0][0] or "",
+        "motivation_message"    : rows[0][1] or ""
+    }
@@ -0,0 +1,263 @@
+"""
+rollups.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Daily / weekly per-user aggregates of MoodLog and FeelingsLog.
+
+• record_moods() / record_feelings() fold new logs into their rollup
+  rows with one upsert, inside the writer's transaction
+• compact() rebuilds rollups from the raw logs (vectorised, see
+  mood_analytics) – backfill for old data and periodic repair
+• history() answers a months- or years-long chart from at most one row
+  per period instead of scanning the raw logs
+
+Weeks start on Monday; dates are UTC like log_date / created_date.
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import case, insert, select, extract
+
+from models import db, MoodRollup, FeelingsRollup, FeelingsLog
+from mood_analytics import METRICS, DAY, load_frame
+
+PERIODS = ("day", "week")
+COLUMNS = {"mood": "mood_score", "stress": "stress_level", "energy": "energy_level"}
+UNKNOWN = "unknown"
+UPSERT_CHUNK = 500                  # rows per INSERT … ON CONFLICT statement
+
+
+def period_start(day, period):
+    return day - timedelta(days=day.weekday()) if period == "week" else day
+
+
+# ── incremental upserts ──────────────────────────────────────────
+def _least(a, b):
+    return case((a.is_(None), b), (b.is_(None), a), (a <= b, a), else_=b)
+
+
+def _greatest(a, b):
+    return case((a.is_(None), b), (b.is_(None), a), (a >= b, a), else_=b)
+
+
+def _upsert(model, rows, key, merge):
+    """INSERT rows; on a `key` conflict set column = merge[column](current, incoming)"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return _merge_rows(model, rows, key, merge)
+
+    table = model.__table__
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        stmt = dialect_insert(model).values(rows[start:start + UPSERT_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key,
+            set_={name: fn(table.c[name], stmt.excluded[name]) for name, fn in merge.items()}
+        )
+        db.session.execute(stmt)
+
+
+def _merge_rows(model, rows, key, merge):
+    """Portable fallback for dialects without INSERT … ON CONFLICT"""
+    for row in rows:
+        current = model.query.filter_by(**{k: row[k] for k in key}).with_for_update().first()
+        if current is None:
+            db.session.add(model(**row))
+            continue
+        for name, fn in merge.items():
+            old, new = getattr(current, name), row[name]
+            if fn in (_least, _greatest):
+                pick = min if fn is _least else max
+                setattr(current, name, new if old is None else old if new is None else pick(old, new))
+            else:
+                setattr(current, name, old + new)
+    db.session.flush()
+
+
+def _add(a, b):
+    return a + b
+
+
+MOOD_MERGE = {"logs": _add, **{
+    f"{m}_{part}": fn for m in METRICS
+    for part, fn in (("n", _add), ("sum", _add), ("min", _least), ("max", _greatest))
+}}
+
+
+def _empty_mood_row(user_id, period, start):
+    row = {"user_id": user_id, "period": period, "period_start": start, "logs": 0}
+    for m in METRICS:
+        row.update({f"{m}_n": 0, f"{m}_sum": 0, f"{m}_min": None, f"{m}_max": None})
+    return row
+
+
+def record_moods(logs):
+    """Fold new mood logs into their rollups (caller commits).
+
+    logs: dicts with user_id, log_date, mood_score, stress_level, energy_level
+    """
+    groups = {}
+    for log in logs:
+        day = (log.get("log_date") or datetime.utcnow()).date()
+        for period in PERIODS:
+            key = (log["user_id"], period, period_start(day, period))
+            row = groups.get(key) or groups.setdefault(key, _empty_mood_row(*key))
+            row["logs"] += 1
+            for m, column in COLUMNS.items():
+                value = log.get(column)
+                if value is None:
+                    continue
+                row[f"{m}_n"]   += 1
+                row[f"{m}_sum"] += value
+                row[f"{m}_min"]  = value if row[f"{m}_min"] is None else min(row[f"{m}_min"], value)
+                row[f"{m}_max"]  = value if row[f"{m}_max"] is None else max(row[f"{m}_max"], value)
+    if groups:
+        _upsert(MoodRollup, list(groups.values()), ["user_id", "period", "period_start"], MOOD_MERGE)
+
+
+def record_feelings(entries):
+    """Count new feelings logs, given as (user_id, created_date, emotional_state) (caller commits)"""
+    counts = {}
+    for user_id, created, state in entries:
+        day = (created or datetime.utcnow()).date()
+        for period in PERIODS:
+            key = (user_id, period, period_start(day, period), (state or UNKNOWN)[:100])
+            counts[key] = counts.get(key, 0) + 1
+    if counts:
+        rows = [{"user_id": u, "period": p, "period_start": s, "emotional_state": e, "count": n}
+                for (u, p, s, e), n in counts.items()]
+        _upsert(FeelingsRollup, rows, ["user_id", "period", "period_start", "emotional_state"],
+                {"count": _add})
+
+
+# ── compaction (rebuild from raw logs) ───────────────────────────
+def _buckets(days, period):
+    """Epoch day numbers → first day of their period (epoch day 0 was a Thursday)"""
+    return days - (days + 3) % 7 if period == "week" else days
+
+
+def _epoch_date(day):
+    return date(1970, 1, 1) + timedelta(days=int(day))
+
+
+def _mood_rows(frame, period):
+    if not len(frame):
+        return []
+    bucket = _buckets(frame.ts // DAY, period)
+    edge = np.ones(len(frame), dtype=bool)
+    edge[1:] = (frame.user_id[1:] != frame.user_id[:-1]) | (bucket[1:] != bucket[:-1])
+    idx = np.flatnonzero(edge)
+
+    columns = {"user_id": frame.user_id[idx].tolist(),
+               "period_start": [_epoch_date(b) for b in bucket[idx].tolist()],
+               "logs": np.diff(np.r_[idx, len(frame)]).tolist()}
+    for m in METRICS:
+        v = frame.values[m]
+        valid = ~np.isnan(v)
+        columns[f"{m}_n"]   = np.add.reduceat(valid.astype(np.int64), idx).tolist()
+        columns[f"{m}_sum"] = np.add.reduceat(np.where(valid, v, 0), idx).astype(np.int64).tolist()
+        with np.errstate(invalid="ignore"):
+            low, high = np.fmin.reduceat(v, idx), np.fmax.reduceat(v, idx)
+        columns[f"{m}_min"] = [None if x != x else int(x) for x in low.tolist()]
+        columns[f"{m}_max"] = [None if x != x else int(x) for x in high.tolist()]
+
+    names = list(columns)
+    return [dict(zip(names, values), period=period) for values in zip(*columns.values())]
+
+
+def _load_feelings(since):
+    """(user_id, epoch day, state code) columns + the state names"""
+    stmt = select(FeelingsLog.user_id, extract("epoch", FeelingsLog.created_date),
+                  FeelingsLog.emotional_state)
+    if since is not None:
+        stmt = stmt.where(FeelingsLog.created_date >= since)
+    raw = db.session.connection().execute(stmt).all()
+    if not raw:
+        return None, []
+
+    user_id, ts, state = zip(*raw)
+    names, codes = np.unique(np.array([s or UNKNOWN for s in state], dtype=str), return_inverse=True)
+    return (np.array(user_id, dtype=np.int64), np.array(ts, dtype=np.int64) // DAY,
+            codes.ravel()), names.tolist()
+
+
+def _feelings_rows(columns, names, period):
+    if columns is None:
+        return []
+    user_id, days, codes = columns
+    keys, counts = np.unique(np.column_stack([user_id, _buckets(days, period), codes]),
+                             axis=0, return_counts=True)
+    return [{"user_id": u, "period": period, "period_start": _epoch_date(b),
+             "emotional_state": names[c], "count": n}
+            for (u, b, c), n in zip(keys.tolist(), counts.tolist())]
+
+
+def compact(since=None):
+    """Rebuild every rollup from `since` (a date; None = all history).
+
+    Runs in one transaction; `since` is moved back to a Monday so weekly
+    rows are rebuilt whole. Returns (mood rows, feelings rows) written.
+    """
+    since_dt = None
+    if since is not None:
+        since    = period_start(since, "week")
+        since_dt = datetime.combine(since, datetime.min.time())
+
+    frame = load_frame(since=since_dt)
+    moods    = [row for period in PERIODS for row in _mood_rows(frame, period)]
+    columns, names = _load_feelings(since_dt)
+    feelings = [row for period in PERIODS for row in _feelings_rows(columns, names, period)]
+
+    for model in (MoodRollup, FeelingsRollup):
+        query = model.query
+        if since is not None:
+            query = query.filter(model.period_start >= since)
+        query.delete(synchronize_session=False)
+    for model, rows in ((MoodRollup, moods), (FeelingsRollup, feelings)):
+        for start in range(0, len(rows), 5000):
+            db.session.execute(insert(model), rows[start:start + 5000])
+    db.session.commit()
+    return len(moods), len(feelings)
+
+
+# ── reads ────────────────────────────────────────────────────────
+def history(user_id, period="day", since=None, until=None):
+    """One dict per period with means / min / max and the dominant emotional state"""
+    moods    = MoodRollup.query.filter_by(user_id=user_id, period=period)
+    feelings = db.session.query(FeelingsRollup.period_start, FeelingsRollup.emotional_state,
+                                FeelingsRollup.count)\
+                 .filter_by(user_id=user_id, period=period)
+    if since is not None:
+        moods    = moods.filter(MoodRollup.period_start >= period_start(since, period))
+        feelings = feelings.filter(FeelingsRollup.period_start >= period_start(since, period))
+    if until is not None:
+        moods    = moods.filter(MoodRollup.period_start <= until)
+        feelings = feelings.filter(FeelingsRollup.period_start <= until)
+
+    dominant = {}
+    for start, state, _ in feelings.order_by(FeelingsRollup.count.desc(),
+                                                 FeelingsRollup.emotional_state):
+        dominant.setdefault(start, state)
+
+    def blank(start):
+        return {"period_start": start.isoformat(), "logs": 0,
+                **{m: {"mean": None, "min": None, "max": None} for m in METRICS},
+                "dominant_emotional_state": None}
+
+    out = {}
+    for row in moods.order_by(MoodRollup.period_start):
+        entry = out[row.period_start] = blank(row.period_start)
+        entry["logs"] = row.logs
+        for m in METRICS:
+            n = getattr(row, f"{m}_n")
+            entry[m] = {"mean": round(getattr(row, f"{m}_sum") / n, 2) if n else None,
+                        "min" : getattr(row, f"{m}_min"),
+                        "max" : getattr(row, f"{m}_max")}
+
+    for start, state in dominant.items():
+        out.setdefault(start, blank(start))["dominant_emotional_state"] = state
+
+    return [out[start] for start in sorted(out)]
@@ -0,0 +1,259 @@
+"""
+similarity_index.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Near-duplicate lookup for feelings analysis: "stressed about work
+deadlines" and "really stressed about my work deadline" get the same
+stored analysis instead of a second model call.
+
+• Texts become hashed feature vectors (words, word pairs and character
+  trigrams after expanding contractions; signed hashing, L2-normalised)
+  – no vocabulary, no model
+• Random-hyperplane LSH: `tables` signatures of `bits` bits each; a
+  lookup scores only the entries sharing a bucket, with the exact cosine
+• A hit needs cosine ≥ `threshold`; words after a negation are hashed
+  apart, so "not stressed" stays away from "stressed"
+• Entries belong to the user whose text was analysed: buckets are keyed
+  by (user, signature), so one user never gets an analysis written for
+  another user's words
+• Fixed-size ring of entries (oldest overwritten), one lock, per process;
+  warmed from recent FeelingsLog rows on the first request
+• A sampled fraction of lookups is also answered by brute force, so
+  stats() reports the LSH recall next to the hit ratio
+
+See benchmarks/bench_similarity.py for recall / latency / hit rates.
+"""
+
+import copy
+import random
+import re
+import threading
+import zlib
+
+import numpy as np
+from sqlalchemy import select
+
+from models import db, FeelingsLog, FeelingsInsight
+from plan_store import INSIGHT_KINDS
+
+_WORDS     = re.compile(r"[a-z0-9]+")
+NEGATIONS  = {"not", "no", "never", "nothing", "nobody", "without", "hardly"}
+NEGATION_SCOPE = 3                      # words after a negation that are marked negated
+NO_OWNER   = -1                         # owner of entries added without a user_id
+CONTRACTIONS = [(re.compile(pattern), repl) for pattern, repl in (
+    (r"\b(can)'?t\b|\bcannot\b", "can not"), (r"\bwon'?t\b", "will not"), (r"n't\b", " not"),
+    (r"'m\b", " am"), (r"'re\b", " are"), (r"'ve\b", " have"), (r"'ll\b", " will"), (r"'d\b", " would"),
+)]
+
+
+def features(text):
+    """Words, adjacent word pairs and character trigrams; negated words are marked"""
+    text = text.lower().replace("\u2019", "'")
+    for pattern, repl in CONTRACTIONS:
+        text = pattern.sub(repl, text)
+    words = _WORDS.findall(text)
+    grams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+    negated = 0
+    for word in words:
+        mark = "!" if negated else ""
+        padded = f" {word} "
+        grams.append(mark + word)
+        grams += [mark + padded[n:n + 3] for n in range(len(padded) - 2)]
+        negated = NEGATION_SCOPE if word in NEGATIONS else max(negated - 1, 0)
+    return grams
+
+
+def _owner(user_id):
+    return NO_OWNER if user_id is None else int(user_id)
+
+
+def vectorize(text, dim=512):
+    """Unit-length float32 vector of hashed features (zeros for empty text)"""
+    hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in features(text)), dtype=np.uint32)
+    vector = np.bincount(hashes % dim, weights=np.where(hashes >> 31, -1.0, 1.0), minlength=dim)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).astype(np.float32)
+
+
+class FeelingsIndex:
+    def __init__(self, threshold=0.9, dim=512, tables=20, bits=12, max_entries=10000,
+                 recall_sample=0.05, seed=2070):
+        self.threshold     = threshold          # cosine for a hit; 0 disables lookups
+        self.dim           = dim
+        self.tables        = tables
+        self.bits          = bits
+        self.max_entries   = max_entries
+        self.recall_sample = recall_sample      # fraction of lookups re-checked by brute force
+        self.lookups       = 0
+        self.hits          = 0
+        self.scanned       = 0                  # candidates scored over all lookups
+        self.recall_exact  = 0                  # sampled lookups brute force answers
+        self.recall_found  = 0                  # … of which LSH answered too
+        self._planes  = np.random.default_rng(seed).standard_normal(
+            (tables * bits, dim)).astype(np.float32)
+        self._weights = 1 << np.arange(bits, dtype=np.int64)
+        self._buckets = [{} for _ in range(tables)]     # per table: (owner, signature) -> set of slots
+        self._vectors = None                            # (max_entries, dim), allocated on first add
+        self._keys    = None                            # (max_entries, tables) signatures per slot
+        self._owners  = np.full(max_entries, NO_OWNER, dtype=np.int64)
+        self._values  = [None] * max_entries
+        self._size    = 0
+        self._next    = 0
+        self._warmed  = False
+        self._sampler = random.Random(seed)
+        self._lock    = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            threshold     = config.get("AI_SIMILARITY_THRESHOLD", 0.9),
+            dim           = config.get("AI_SIMILARITY_DIM", 512),
+            tables        = config.get("AI_SIMILARITY_TABLES", 20),
+            bits          = config.get("AI_SIMILARITY_BITS", 12),
+            max_entries   = config.get("AI_SIMILARITY_MAX_ENTRIES", 10000),
+            recall_sample = config.get("AI_SIMILARITY_RECALL_SAMPLE", 0.05)
+        )
+
+    def _signatures(self, vector):
+        bits = (self._planes @ vector > 0).reshape(self.tables, self.bits)
+        return bits @ self._weights
+
+    # ── reads ────────────────────────────────────────────────────
+    def lookup(self, text, user_id=None):
+        """Stored analysis of `user_id`'s most similar text, or None below the threshold"""
+        if self.threshold <= 0:
+            return None
+        vector = vectorize(text, self.dim)
+        keys = self._signatures(vector)
+        owner = _owner(user_id)
+        with self._lock:
+            self.lookups += 1
+            if not self._size:
+                return None
+            slots = set()
+            for table, key in zip(self._buckets, keys.tolist()):
+                slots.update(table.get((owner, key), ()))
+            best, score = self._best(list(slots), vector)
+            self.scanned += len(slots)
+
+            if self.recall_sample and self._sampler.random() < self.recall_sample:
+                own = np.flatnonzero(self._owners[:self._size] == owner)
+                exact = float((self._vectors[own] @ vector).max()) if len(own) else -1.0
+                if exact >= self.threshold:
+                    self.recall_exact += 1
+                    self.recall_found += score >= self.threshold
+
+            if score < self.threshold:
+                return None
+            self.hits += 1
+            value = self._values[best]
+        return copy.deepcopy(value)
+
+    def _best(self, slots, vector):
+        if not slots:
+            return None, -1.0
+        slots = np.fromiter(slots, dtype=np.int64)
+        scores = self._vectors[slots] @ vector
+        n = int(scores.argmax())
+        return int(slots[n]), float(scores[n])
+
+    # ── writes ───────────────────────────────────────────────────
+    def add(self, text, analysis, user_id=None):
+        """Remember a model analysis of `user_id`'s `text`; the oldest entry makes room"""
+        if self.threshold <= 0 or not text:
+            return
+        vector = vectorize(text, self.dim)
+        keys = self._signatures(vector)
+        owner = _owner(user_id)
+        analysis = copy.deepcopy(analysis)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, self.dim), dtype=np.float32)
+                self._keys = np.zeros((self.max_entries, self.tables), dtype=np.int64)
+            slot = self._next
+            if self._values[slot] is not None:          # ring is full: evict the oldest
+                evicted = int(self._owners[slot])
+                for table, key in zip(self._buckets, self._keys[slot].tolist()):
+                    members = table[(evicted, key)]
+                    members.discard(slot)
+                    if not members:
+                        del table[(evicted, key)]
+            self._vectors[slot] = vector
+            self._keys[slot] = keys
+            self._owners[slot] = owner
+            self._values[slot] = analysis
+            for table, key in zip(self._buckets, keys.tolist()):
+                table.setdefault((owner, key), set()).add(slot)
+            self._next = (slot + 1) % self.max_entries
+            self._size = max(self._size, slot + 1)
+
+    def warm(self, loader):
+        """Fill the index once from loader() -> [(user_id, text, analysis)] on a background thread"""
+        if self._warmed or self.threshold <= 0:
+            return
+        with self._lock:
+            if self._warmed:
+                return
+            self._warmed = True
+
+        def fill():
+            try:
+                for user_id, text, analysis in loader():
+                    self.add(text, analysis, user_id)
+            except Exception as e:
+                print(f"Feelings index warm-up failed: {e}")
+
+        threading.Thread(target=fill, name="feelings-index-warm", daemon=True).start()
+
+    def clear(self):
+        with self._lock:
+            self._buckets = [{} for _ in range(self.tables)]
+            self._values = [None] * self.max_entries
+            self._owners[:] = NO_OWNER
+            self._size = self._next = 0
+
+    def stats(self):
+        return {
+            "entries"        : self._size,
+            "lookups"        : self.lookups,
+            "hits"           : self.hits,
+            "hit_ratio"      : (self.hits / self.lookups) if self.lookups else 0.0,
+            "candidates_mean": (self.scanned / self.lookups) if self.lookups else 0.0,
+            "recall"         : (self.recall_found / self.recall_exact) if self.recall_exact else 1.0,
+            "recall_samples" : self.recall_exact,
+        }
+
+
+# ── warm-up source ───────────────────────────────────────────────
+def recent_feelings(limit, skip_states=(), chunk=500):
+    """[(user_id, feelings_text, analysis)] for the newest analysed logs, oldest first.
+
+    Needs an app context. Logs whose emotional_state is in `skip_states`
+    (the canned fallback answer) are not worth reusing and are left out.
+    """
+    if limit <= 0:
+        return []
+    logs = db.session.execute(
+        select(FeelingsLog.id, FeelingsLog.user_id, FeelingsLog.feelings_text,
+               FeelingsLog.emotional_state, FeelingsLog.empathy_message)
+        .where(FeelingsLog.emotional_state.is_not(None),
+               FeelingsLog.emotional_state.not_in(skip_states))
+        .order_by(FeelingsLog.id.desc()).limit(limit)
+    ).all()
+
+    analyses = {log_id: {"emotional_state"        : state,
+                         "stress_indicators"      : [],
+                         "recommended_focus_areas": [],
+                         "empathy_message"        : empathy or ""}
+                for log_id, _, _, state, empathy in logs}
+    fields = {kind: key for key, kind in INSIGHT_KINDS.items()}
+    ids = list(analyses)
+    for start in range(0, len(ids), chunk):
+        rows = db.session.execute(
+            select(FeelingsInsight.feelings_log_id, FeelingsInsight.kind, FeelingsInsight.text)
+            .where(FeelingsInsight.feelings_log_id.in_(ids[start:start + chunk]))
+            .order_by(FeelingsInsight.feelings_log_id, FeelingsInsight.kind, FeelingsInsight.ordinal)
+        )
+        for log_id, kind, text in rows:
+            if kind in fields:
+                analyses[log_id][fields[kind]].append(text)
+    return [(user_id, text, analyses[log_id]) for log_id, user_id, text, _, _ in reversed(logs)]
@@ -0,0 +1,159 @@
+"""
+singleflight.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Request coalescing for identical in-flight AI calls.
+
+• Threads asking for the same key while a call is running wait for it
+  and share its result instead of calling the model again
+• Optional SQLite lock table extends this across worker processes:
+  the process holding the lock calls the model, the others poll the
+  shared response cache (ai_cache.SQLiteTier) for its answer
+"""
+
+import copy
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event  = threading.Event()
+        self.result = None
+        self.error  = None
+
+
+class SQLiteFlightLock:
+    """Cross-process "someone is already calling the model for this key" lock"""
+
+    def __init__(self, path, ttl=60):
+        self.path   = path
+        self.ttl    = ttl              # a crashed owner's lock expires after this
+        self.owner  = uuid.uuid4().hex
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS ai_inflight ("
+            " key     TEXT PRIMARY KEY,"
+            " owner   TEXT NOT NULL,"
+            " expires REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def acquire(self, key):
+        conn = self._conn()
+        now  = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM ai_inflight WHERE key = ? AND expires <= ?", (key, now))
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO ai_inflight (key, owner, expires) VALUES (?, ?, ?)",
+                (key, self.owner, now + self.ttl)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cur.rowcount == 1
+
+    def release(self, key):
+        self._conn().execute(
+            "DELETE FROM ai_inflight WHERE key = ? AND owner = ?", (key, self.owner)
+        )
+
+
+class SingleFlight:
+    def __init__(self, wait_timeout=30, process_lock=None, poll_interval=0.1):
+        self.wait_timeout  = wait_timeout
+        self.process_lock  = process_lock
+        self.poll_interval = poll_interval
+        self.executions    = 0        # calls that actually ran
+        self.collapsed     = 0        # callers that shared another thread's call
+        self.remote_hits   = 0        # answers taken from another process
+        self._calls        = {}
+        self._lock         = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        lock = None
+        if config.get("AI_INFLIGHT_DB_PATH"):
+            lock = SQLiteFlightLock(config["AI_INFLIGHT_DB_PATH"],
+                                    config.get("AI_CALL_TIMEOUT", 25) * 2)
+        return cls(wait_timeout=config.get("AI_CALL_TIMEOUT", 25), process_lock=lock)
+
+    def do(self, key, fn, lookup=None):
+        """Run fn() once per key at a time; concurrent callers get its result.
+
+        `lookup` returns the shared cached answer (or None) and is only used
+        when a process lock is configured.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            if not call.event.wait(self.wait_timeout):
+                raise TimeoutError("timed out waiting for identical in-flight call")
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = self._execute(key, fn, lookup)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def _execute(self, key, fn, lookup):
+        if self.process_lock is None or lookup is None:
+            return self._run(fn)
+
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            if self.process_lock.acquire(key):
+                try:
+                    return self._run(fn)
+                finally:
+                    self.process_lock.release(key)
+
+            # another process is calling the model – its answer lands in the shared cache
+            time.sleep(self.poll_interval)
+            value = lookup()
+            if value is not None:
+                with self._lock:
+                    self.remote_hits += 1
+                return value
+            if time.monotonic() >= deadline:
+                return self._run(fn)
+
+    def _run(self, fn):
+        with self._lock:
+            self.executions += 1
+        return fn()
+
+    def stats(self):
+        return {
+            "executions" : self.executions,
+            "collapsed"  : self.collapsed,
+            "remote_hits": self.remote_hits,
+            "in_flight"  : len(self._calls),
+        }
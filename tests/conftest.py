@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+# the app is a flat set of modules next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db, User  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Bare Flask app on a throw-away SQLite file, with an app context pushed"""
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'test.db'}",
+                      SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username="ada", email="ada@example.test", password="x")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def plan():
+    """plan(tag) -> a complete model plan whose every item names `tag`"""
+    def make(tag):
+        return {"mental_health": [f"{tag} mind 1", f"{tag} mind 2"], "fitness": [f"{tag} move"],
+                "nutrition": [f"{tag} eat"], "personalized_insights": f"{tag} insight",
+                "motivation_message": f"{tag} go"}
+    return make
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Full create_app() on a throw-away database, logged in as "ada" – (app, test client, user id)"""
+    import app as wellness
+    from config import Config
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'app.db'}"
+        ARCHIVE_DIR = str(tmp_path / "archive")
+        AI_BACKEND = "local"
+        METRICS_ENABLED = False
+
+    app = wellness.create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(username="ada", email="ada@example.test", password="x")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+    yield app, client, user_id
+    with app.app_context():
+        db.session.remove()
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import ai_cache
+from ai_cache import ResponseCache, MemoryTier, prompt_key
+
+PLAN = {"mental_health": ["walk"], "motivation_message": "go"}
+
+
+def configured(app, tmp_path, **config):
+    app.config.update(AI_CACHE_DB_PATH=str(tmp_path / "ai_cache.db"), **config)
+    return ResponseCache.from_config(app.config)
+
+
+def test_entries_expire_after_their_ttl(app, tmp_path, monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(ai_cache, "time", SimpleNamespace(time=lambda: clock.now))
+    cache = configured(app, tmp_path, AI_CACHE_TTL=60)
+    cache.set("k", PLAN)
+
+    clock.now += 59
+    assert cache.get("k") == PLAN
+    clock.now += 1
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == {"memory": 0, "sqlite": 0}
+
+
+def test_sqlite_tier_outlives_the_process_cache(app, tmp_path):
+    configured(app, tmp_path).set("k", PLAN)
+
+    restarted = configured(app, tmp_path)          # a new worker: empty memory tier
+    assert restarted.get("k") == PLAN
+    assert restarted.get("k") == PLAN
+    assert restarted.tier_hits == {"memory": 1, "sqlite": 1}
+
+
+def test_values_are_copied_in_and_out(app, tmp_path):
+    cache = configured(app, tmp_path)
+    plan = {"mental_health": ["walk"]}
+    cache.set("k", plan)
+    plan["mental_health"].append("changed")
+    cache.get("k")["mental_health"].append("changed")
+
+    assert cache.get("k") == {"mental_health": ["walk"]}
+
+
+def test_keys_separate_kinds_and_prompts_but_not_whitespace():
+    prompt = "Mood: 4/10\nStress: 8/10"
+
+    assert prompt_key("plan", prompt) == prompt_key("plan", "  Mood: 4/10   Stress: 8/10\n")
+    assert prompt_key("plan", prompt) != prompt_key("feelings", prompt)
+    assert prompt_key("plan", prompt) != prompt_key("plan", prompt.replace("8", "9"))
+    assert prompt_key("plan", "a b") != prompt_key("plan a", "b")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryTier(max_entries=2)
+    cache = ResponseCache(tiers=[tier])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert tier.evictions == 1
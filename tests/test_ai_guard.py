@@ -0,0 +1,81 @@
+import pytest
+
+from ai_guard import AdaptiveLimit, BackendUnavailable, CircuitBreaker, ModelGuard, TokenBucket
+from ai_wellness import GeminiWellnessAI, LocalBackend
+
+
+def make_guard(threshold=2, reset_after=0):
+    return ModelGuard(TokenBucket(rate=1000, burst=1000), AdaptiveLimit(initial=4, maximum=4),
+                      CircuitBreaker(threshold, reset_after), max_retries=0)
+
+
+def trip(guard):
+    for _ in range(guard.breaker.threshold):
+        with pytest.raises(RuntimeError):
+            with guard.slot(deadline=float("inf")):
+                raise RuntimeError("boom")
+
+
+def test_breaker_opens_after_threshold_and_short_circuits():
+    guard = make_guard(reset_after=60)
+    trip(guard)
+    assert guard.breaker.state == "open"
+    with pytest.raises(BackendUnavailable):
+        with guard.slot(deadline=float("inf")):
+            pass
+    assert guard.counters["short_circuited"] == 1
+
+
+def test_half_open_admits_one_probe_and_closes_on_success():
+    guard = make_guard()
+    trip(guard)
+    assert guard.breaker.state == "half_open"
+    with guard.slot(deadline=float("inf")):
+        assert not guard.breaker.allow()            # the probe is in flight
+    assert guard.breaker.state == "closed"
+
+
+def test_failed_probe_reopens():
+    guard = make_guard(reset_after=60)
+    trip(guard)
+    guard.breaker.opened_at -= 60                   # cool-down over
+    with pytest.raises(RuntimeError):
+        with guard.slot(deadline=float("inf")):
+            raise RuntimeError("still down")
+    assert guard.breaker.state == "open"
+
+
+def test_abandoned_probe_is_handed_back():
+    guard = make_guard()
+    trip(guard)
+
+    def stream():
+        with guard.slot(deadline=float("inf")):
+            yield 1
+            yield 2
+
+    events = stream()
+    next(events)                                    # probe admitted, mid-response
+    events.close()                                  # consumer went away (GeneratorExit)
+
+    assert not guard.breaker._probing
+    assert guard.limit.in_flight == 0
+    assert guard.breaker.allow()                    # the next call may probe
+
+
+def test_closed_plan_stream_does_not_wedge_breaker():
+    guard = make_guard()
+    trip(guard)
+    ai = GeminiWellnessAI(backend=LocalBackend(latency_ms=0, distribution="fixed", chunk_chars=8),
+                          guard=guard)
+
+    events = ai.stream_wellness_plan({"mood_score": 4})
+    assert next(events)[0] in ("item", "field")
+    events.close()                                  # SSE client disconnected during the probe
+
+    assert guard.breaker.state == "half_open"
+    assert guard.limit.in_flight == 0
+    plan = ai.generate_wellness_plan({"mood_score": 5})
+    assert guard.counters["short_circuited"] == 0
+    assert guard.breaker.state == "closed"
+    assert set(plan) >= {"mental_health", "fitness", "nutrition"}
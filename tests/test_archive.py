@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+
+from archive import Archive, Archiver
+from models import db, MoodLog
+
+
+def log(user, day):
+    entry = MoodLog(user_id=user.id, mood_score=5, stress_level=5, energy_level=5, log_date=day)
+    db.session.add(entry)
+    db.session.commit()
+    return entry.id
+
+
+def live_ids():
+    return sorted(entry.id for entry in MoodLog.query.all())
+
+
+def test_run_moves_rows_and_clears_pending(app, user, tmp_path):
+    old, new = log(user, datetime(2024, 1, 3)), log(user, datetime(2026, 1, 7))
+    archiver = Archiver(str(tmp_path / "archive"))
+
+    counts = archiver.run(datetime(2025, 1, 6))
+
+    assert counts["mood_log"] == 1
+    assert live_ids() == [new]
+    assert [part.array("id").tolist() for part in Archive(archiver.path).parts("mood_log")] == [[old]]
+    assert archiver.archive.pending() == {}
+
+
+def test_reconcile_finishes_the_recorded_part_not_the_newest_name(app, user, tmp_path, monkeypatch):
+    archiver = Archiver(str(tmp_path / "archive"))
+    log(user, datetime(2024, 6, 3))
+    archiver.run(datetime(2025, 1, 6))                  # part-20250106-…
+
+    # rows that arrived later but are older than an earlier cutoff
+    late = [log(user, datetime(2023, 2, 6)), log(user, datetime(2023, 3, 6))]
+    keep = log(user, datetime(2024, 2, 5))
+
+    def crash(table, ids):
+        raise RuntimeError("killed between publish and DELETE")
+
+    monkeypatch.setattr(archiver, "_delete", crash)
+    with pytest.raises(RuntimeError):
+        archiver.run(datetime(2024, 1, 1))              # part-20240101-… sorts first
+    monkeypatch.undo()
+
+    assert archiver.archive.pending() == {"mood_log": f"part-20240101-{late[0]:012d}-{late[1]:012d}"}
+    assert Archiver(archiver.path).reconcile() == 2
+    assert live_ids() == [keep]
+    assert archiver.archive.pending() == {}
+
+
+def test_set_horizon_keeps_pending(tmp_path):
+    archive = Archive(str(tmp_path / "archive"))
+    archive.set_pending("mood_log", "part-x")
+    archive.set_horizon(datetime(2025, 1, 6))
+
+    assert archive.pending() == {"mood_log": "part-x"}
+    assert archive.horizon() == datetime(2025, 1, 6)
@@ -0,0 +1,60 @@
+import gc
+
+from sqlalchemy import event
+
+from auth import SessionUser, UserCache
+from models import db, User
+
+
+def listeners(cache, model=User):
+    return cache._watched[model].peek()[2][0]
+
+
+def registered(entries):
+    return [event.contains(target, name, fn) for target, name, fn in entries]
+
+
+def test_update_commit_invalidates(user):
+    cache = UserCache(ttl=60)
+    cache.watch(User)
+    load = lambda user_id: db.session.get(User, user_id)
+
+    assert cache.get(user.id, load).age is None
+    user.age = 36
+    db.session.commit()
+    assert cache.get(user.id, load).age == 36
+    assert (cache.hits, cache.misses) == (0, 2)
+    cache.unwatch()
+
+
+def test_watch_registers_once_and_unwatch_removes(app):
+    cache = UserCache()
+    cache.watch(User)
+    entries = listeners(cache)
+    cache.watch(User)
+
+    assert listeners(cache) is entries
+    assert all(registered(entries))
+    cache.unwatch()
+    assert not any(registered(entries))
+
+
+def test_listeners_go_away_with_the_cache(app):
+    cache = UserCache()
+    cache.watch(User)
+    entries = listeners(cache)
+    assert all(registered(entries))
+
+    del cache
+    gc.collect()
+    assert not any(registered(entries))
+
+
+def test_importing_app_builds_no_app():
+    import app as wellness
+    assert not hasattr(wellness, "app")
+    assert callable(wellness.create_app)
+
+
+def test_session_user_has_no_password(user):
+    assert not hasattr(SessionUser(user), "password")
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from batch_plans import BatchPlanRunner, DEFAULT_SCORE
+from models import db, User, MoodLog, WellnessPlan
+from plan_store import add_plan, load_active_plan
+
+
+class ScriptedAI:
+    """generate_wellness_plans_batch() stand-in: the model answers unless the age is in `fail`"""
+    def __init__(self, plan, fail=()):
+        self.plan = plan
+        self.fail = set(fail)
+        self.profiles = []
+
+    def generate_wellness_plans_batch(self, profiles):
+        self.profiles += profiles
+        return [(self.plan("fallback"), False) if p["age"] in self.fail
+                else (self.plan(f"model {p['age']}"), True)
+                for p in profiles]
+
+
+def users(*ages):
+    rows = [User(username=f"u{age}", email=f"u{age}@example.test", password="x", age=age) for age in ages]
+    db.session.add_all(rows)
+    db.session.commit()
+    return rows
+
+
+def test_all_cohort_includes_users_without_mood_logs(app, plan):
+    logged, silent = users(30, 40)
+    db.session.add(MoodLog(user_id=logged.id, mood_score=2, stress_level=9, energy_level=3,
+                           log_date=datetime(2026, 5, 1)))
+    db.session.commit()
+    ai = ScriptedAI(plan)
+    runner = BatchPlanRunner(ai, workers=1)
+
+    run = runner.run(runner.start("all"))
+
+    assert (run.total, run.processed, run.skipped) == (2, 2, 0)
+    by_age = {p["age"]: p for p in ai.profiles}
+    assert (by_age[30]["mood_score"], by_age[30]["stress_level"]) == (2, 9)
+    assert by_age[40]["mood_score"] == by_age[40]["stress_level"] == DEFAULT_SCORE
+    assert load_active_plan(silent.id)["personalized_insights"] == "model 40 insight"
+
+
+def test_filtered_cohorts_still_need_a_log(app, plan):
+    users(30)
+    runner = BatchPlanRunner(ScriptedAI(plan), workers=1)
+    assert runner.start("high-stress").total == 0
+
+
+def test_fallback_answers_keep_the_current_plan(app, plan):
+    kept, updated = users(30, 40)
+    for user in (kept, updated):
+        add_plan(user.id, plan("old"))
+    db.session.commit()
+    saved = []
+    runner = BatchPlanRunner(ScriptedAI(plan, fail={30}), workers=1, on_saved=saved.extend)
+
+    run = runner.run(runner.start("all"))
+
+    assert (run.processed, run.skipped, run.last_user_id) == (2, 1, updated.id)
+    assert load_active_plan(kept.id)["personalized_insights"] == "old insight"
+    assert load_active_plan(updated.id)["personalized_insights"] == "model 40 insight"
+    assert WellnessPlan.query.filter_by(user_id=kept.id).count() == 1
+    assert saved == [updated.id]
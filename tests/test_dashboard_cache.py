@@ -0,0 +1,51 @@
+import pytest
+
+from dashboard_cache import DashboardCache
+
+
+def loader_that(during=None):
+    """loader(user_id) returning a fresh dict; runs during() mid-load"""
+    calls = []
+
+    def load(user_id):
+        calls.append(user_id)
+        if during is not None:
+            during()
+        return {"user": user_id, "load": len(calls)}
+    load.calls = calls
+    return load
+
+
+def test_hit_after_miss():
+    cache = DashboardCache(ttl=60)
+    load = loader_that()
+    assert cache.snapshot(1, load) is cache.snapshot(1, load)
+    assert (cache.hits, cache.misses, load.calls) == (1, 1, [1])
+
+
+def test_other_users_write_does_not_stop_caching():
+    cache = DashboardCache(ttl=60)
+    load = loader_that(during=lambda: cache.invalidate(2))
+    cache.snapshot(1, load)
+    cache.snapshot(1, load)
+    assert load.calls == [1]
+
+
+def test_same_users_write_during_load_is_not_cached():
+    cache = DashboardCache(ttl=60)
+    load = loader_that(during=lambda: cache.invalidate(1))
+    first = cache.snapshot(1, load)
+    assert cache.stats()["users"] == 0
+    assert cache.snapshot(1, load) is not first
+    assert cache._loading == {}
+
+
+def test_failed_load_leaves_no_state():
+    cache = DashboardCache(ttl=60)
+
+    def broken(user_id):
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        cache.snapshot(1, broken)
+    assert cache._loading == {} and cache.stats()["users"] == 0
@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_fallback_rules import legacy_fallback_plan
+from fallback_rules import FallbackPlanner
+
+ON_GRID  = range(1, 11)
+OFF_GRID = [0, 11, 0.5, 3.5, 4.5, 5.5, 6.5, 7.5, 8.5, 10.5, 4.0, 7.25]
+
+
+def without_motivation(plan):
+    return {key: value for key, value in plan.items() if key != "motivation_message"}
+
+
+@pytest.fixture(scope="module")
+def planner():
+    return FallbackPlanner()
+
+
+@pytest.mark.parametrize("feelings", ["", "tired and stressed"])
+def test_matches_legacy_cascade_on_grid(planner, feelings):
+    for mood, stress, energy in itertools.product(ON_GRID, repeat=3):
+        user = {"mood_score": mood, "stress_level": stress, "energy_level": energy}
+        assert without_motivation(planner.plan(user, feelings)) == \
+               without_motivation(legacy_fallback_plan(user, feelings)), user
+
+
+@pytest.mark.parametrize("feelings", ["", "tired and stressed"])
+def test_matches_legacy_cascade_off_grid(planner, feelings):
+    for mood, stress, energy in itertools.product(OFF_GRID, repeat=3):
+        user = {"mood_score": mood, "stress_level": stress, "energy_level": energy}
+        assert without_motivation(planner.plan(user, feelings)) == \
+               without_motivation(legacy_fallback_plan(user, feelings)), user
+
+
+def test_fractional_scores_are_not_truncated(planner):
+    # 4.5 is not "mood <= 4", 3.5 is not "energy <= 3"
+    plan = planner.plan({"mood_score": 4.5, "stress_level": 5, "energy_level": 3.5})
+    assert plan["mental_health"][0].startswith("Daily mindfulness practice")
+    assert plan["fitness"][0].startswith("Personalized workout routines")
+
+
+def test_batch_matches_single(planner):
+    users = [{"mood_score": m, "stress_level": s, "energy_level": e}
+             for m, s, e in itertools.product([1, 4, 4.5, 7, "8", None, float("nan")], repeat=3)]
+    feelings = ["tired" if n % 2 else "" for n in range(len(users))]
+    for single, batch in zip((planner.plan(u, f) for u, f in zip(users, feelings)),
+                             planner.plans(users, feelings)):
+        assert without_motivation(single) == without_motivation(batch)
+
+
+def test_rule_arrays_match_rule_indexes(planner):
+    scores = np.array(list(itertools.product([1, 3, 3.5, 4, 4.5, 6, 7.5, 9], repeat=3))).T
+    arrays = planner.rule_index_arrays(*scores)
+    for n, (mood, stress, energy) in enumerate(scores.T.tolist()):
+        single = planner.rule_indexes(mood, stress, energy)
+        assert {section: int(array[n]) for section, array in arrays.items()} == single
+
+
+def test_unreadable_scores_count_as_neutral(planner):
+    neutral = planner.plan({"mood_score": 5, "stress_level": 5, "energy_level": 5})
+    odd = planner.plan({"mood_score": "n/a", "stress_level": None, "energy_level": float("nan")})
+    assert odd["mental_health"] == neutral["mental_health"]
+    assert odd["fitness"] == neutral["fitness"]
+    assert odd["nutrition"] == neutral["nutrition"]
+
+
+def test_int_batch_matches_single(planner):
+    users = [{"mood_score": m, "stress_level": s, "energy_level": e}
+             for m, s, e in itertools.product([0, 1, 4, 5, 7, 8, 10, 11], repeat=3)]
+    feelings = ["tired" if n % 3 else "" for n in range(len(users))]
+    batch = planner.plans(users, feelings, seed=1)
+    for user, f, plan in zip(users, feelings, batch):
+        assert without_motivation(planner.plan(user, f)) == without_motivation(plan), user
+    assert {plan["motivation_message"] for plan in batch} <= set(planner.motivations)
@@ -0,0 +1,106 @@
+import json
+import threading
+from datetime import datetime, timedelta
+
+from jobs import JobQueue
+from models import db, PlanJob
+
+
+def failing(user_id, payload):
+    raise RuntimeError("model unavailable")
+
+
+def job(user, status="queued", age=0):
+    row = PlanJob(id=f"{status}-{age}", user_id=user.id, payload="{}", status=status,
+                  updated_date=datetime.utcnow() - timedelta(seconds=age))
+    db.session.add(row)
+    db.session.commit()
+    return row.id
+
+
+def status(job_id):
+    db.session.expire_all()
+    row = db.session.get(PlanJob, job_id)
+    return row and row.status
+
+
+def test_two_sessions_claiming_one_job_only_one_wins(app, user):
+    jobs = JobQueue(app, handler=None)
+    job_id = job(user)
+    seen = threading.Barrier(2)
+    wins = []
+
+    def claim():
+        with app.app_context():                     # its own scoped session
+            assert db.session.get(PlanJob, job_id).status == "queued"
+            seen.wait(5)
+            wins.append(jobs._claim(job_id))
+            db.session.remove()
+
+    threads = [threading.Thread(target=claim) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(wins) == [False, True]
+    assert status(job_id) == "running"
+
+
+def test_run_executes_a_job_once(app, user):
+    calls = []
+    jobs = JobQueue(app, handler=lambda user_id, payload: calls.append(payload) or {"plan": "ok"})
+    user_id = user.id
+    job_id = jobs.submit(user_id, {"mood": 4})
+
+    jobs._run(job_id)
+    jobs._run(job_id)
+
+    assert calls == [{"mood": 4}]
+    row = jobs.get(job_id, user_id)
+    assert (row.status, json.loads(row.result)) == ("done", {"plan": "ok"})
+
+
+def test_failed_handler_marks_the_job_failed(app, user):
+    jobs = JobQueue(app, handler=failing)
+    user_id = user.id
+    job_id = jobs.submit(user_id, {})
+
+    jobs._run(job_id)
+
+    row = jobs.get(job_id, user_id)
+    assert (row.status, row.error, row.result) == ("failed", "model unavailable", None)
+
+
+def test_sweep_expires_finished_and_requeues_stale(app, user):
+    jobs = JobQueue(app, handler=None, stale_after=120, retention=3600)
+    old_done, old_failed, recent_done = job(user, "done", 7200), job(user, "failed", 7200), job(user, "done", 60)
+    stale, running = job(user, "running", 300), job(user, "running", 60)
+
+    assert jobs.sweep() == (2, 1)
+    assert [status(j) for j in (old_done, old_failed, recent_done, stale, running)] == \
+        [None, None, "done", "queued", "running"]
+
+
+def test_sweep_runs_once_per_interval(app, user):
+    jobs = JobQueue(app, handler=None, stale_after=120, sweep_interval=60)
+    jobs._maybe_sweep()                             # first idle tick sweeps
+    stale = job(user, "running", 300)
+
+    jobs._maybe_sweep()
+    assert status(stale) == "running"
+
+    jobs._swept_at -= 60
+    jobs._maybe_sweep()
+    assert status(stale) == "queued"
+    assert jobs.stats()["requeued_stale"] == 1
+
+
+def test_idle_worker_claims_a_row_left_in_the_table(app, user):
+    jobs = JobQueue(app, handler=failing)
+    job_id = job(user)
+
+    assert jobs._idle() is True
+    assert jobs._idle() is False
+    assert status(job_id) == "failed"
+    assert jobs.stats()["claimed_from_table"] == 1
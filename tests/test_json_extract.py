@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from json_extract import (JSONObjectScanner, ExtractionError, extract_json, validate,
+                          PLAN_SCHEMA)
+
+PLAN = {"mental_health": ["breathe {slowly}", "say \"no\" once"], "fitness": ["walk"],
+        "nutrition": ["water"], "personalized_insights": "stress } peaks {at} night",
+        "motivation_message": "go \\ on"}
+RESPONSE = f"Sure! Here is {{your}} plan:\n```json\n{json.dumps(PLAN)}\n```\nStay {{well}}."
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def scan(pieces):
+    scanner = JSONObjectScanner()
+    return [event for piece in pieces for event in scanner.feed(piece)]
+
+
+def test_whole_response_with_prose_around_the_object():
+    assert extract_json(RESPONSE, PLAN_SCHEMA) == PLAN
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_chunked_input_gives_the_same_events(size):
+    events = scan(chunks(RESPONSE, size))
+
+    assert events == scan([RESPONSE])
+    assert events[-1] == ("done", PLAN)
+    assert extract_json(iter(chunks(RESPONSE, size)), PLAN_SCHEMA) == PLAN
+
+
+def test_events_decode_items_and_fields():
+    events = scan([RESPONSE])
+
+    assert events[:2] == [("item", "mental_health", 0, "breathe {slowly}"),
+                          ("item", "mental_health", 1, 'say "no" once')]
+    assert ("field", "personalized_insights", "stress } peaks {at} night") in events
+    assert ("field", "motivation_message", "go \\ on") in events
+
+
+def test_scanner_ignores_everything_after_the_object():
+    scanner = JSONObjectScanner()
+    scanner.feed('{"a": "b"} and {"c": 1}')
+
+    assert scanner.done and scanner.result == {"a": "b"}
+    assert scanner.feed('{"d": 2}') == []
+
+
+def test_stray_braces_are_skipped_up_to_max_attempts():
+    assert extract_json("{x} " * 15 + '{"a": 1}') == {"a": 1}
+    with pytest.raises(ExtractionError):
+        extract_json("{x} " * 16 + '{"a": 1}')
+
+
+def test_truncated_object_fails_without_rescanning():
+    with pytest.raises(ExtractionError):
+        extract_json('prose {"a": {"b": "never closed')
+    with pytest.raises(ExtractionError):
+        extract_json(iter(['prose {"a": ', '"never closed']))
+
+
+def test_schema_mismatch_is_an_extraction_error():
+    with pytest.raises(ExtractionError, match="list of strings"):
+        validate(dict(PLAN, fitness=["walk", 3]), PLAN_SCHEMA)
+    with pytest.raises(ExtractionError, match="motivation_message"):
+        extract_json('{"mental_health": [], "fitness": [], "nutrition": [],'
+                     ' "personalized_insights": ""}', PLAN_SCHEMA)
@@ -0,0 +1,87 @@
+import math
+
+import numpy as np
+import pytest
+
+from mood_analytics import MoodFrame, NEUTRAL, anomalies, ewma, rolling_mean
+
+
+def frame(seed=3, sizes=(1, 250, 7, 900)):
+    """Users of very different lengths, ~15% missing scores, rows shuffled"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for user_id, n in enumerate(sizes, 1):
+        values = rng.integers(1, 11, size=(n, 3)).astype(float)
+        values[rng.random((n, 3)) < 0.15] = np.nan
+        ts = 1_700_000_000 + np.arange(n) * 3600
+        rows.append(np.column_stack([np.full(n, user_id), ts, values]))
+    rows = np.concatenate(rows)
+    return MoodFrame.from_rows(rows[rng.permutation(len(rows))])
+
+
+def segments(f):
+    return np.split(np.arange(len(f)), f.starts[1:])
+
+
+def naive_rolling(values, window):
+    out = []
+    for i in range(len(values)):
+        valid = [v for v in values[max(0, i - window + 1):i + 1] if not math.isnan(v)]
+        out.append(sum(valid) / len(valid) if valid else np.nan)
+    return out
+
+
+def naive_ewma(values, alpha):
+    out, last, prev = [], NEUTRAL, None
+    for v in values:
+        last = last if math.isnan(v) else v
+        prev = last if prev is None else alpha * last + (1 - alpha) * prev
+        out.append(prev)
+    return out
+
+
+@pytest.mark.parametrize("window", [1, 7, 30])
+def test_rolling_mean_matches_a_naive_loop(window):
+    f = frame()
+    for metric, v in f.values.items():
+        expected = np.concatenate([naive_rolling(v[rows].tolist(), window) for rows in segments(f)])
+        np.testing.assert_allclose(rolling_mean(v, f.seg_start, window), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("alpha", [0.05, 0.3, 0.9, 0.999])
+def test_blockwise_ewma_matches_a_naive_loop(alpha):
+    f = frame()                                     # 900 rows span several blocks for α ≥ 0.9
+    for metric, v in f.values.items():
+        expected = np.concatenate([naive_ewma(v[rows].tolist(), alpha) for rows in segments(f)])
+        np.testing.assert_allclose(ewma(v, f.seg_start, alpha), expected, rtol=1e-9)
+
+
+def test_anomalies_use_only_the_users_previous_logs():
+    f = frame()
+    v = f.values["mood"]
+    flagged, z = anomalies(v, f.seg_start, window=7, threshold=2.0)
+    for rows in segments(f):
+        for k, i in enumerate(rows):
+            past = [x for x in v[rows[max(0, k - 7):k]] if not math.isnan(x)]
+            if len(past) < 5 or math.isnan(v[i]):
+                assert not flagged[i]
+                continue
+            expected = (v[i] - np.mean(past)) / max(np.std(past), 1.0)
+            assert z[i] == pytest.approx(expected)
+            assert flagged[i] == (abs(expected) >= 2.0)
+
+
+def test_mood_trends_rejects_huge_windows(client):
+    app, client, _ = client
+    resp = client.get("/api/mood-trends?days=10000000")
+    assert resp.status_code == 400
+    assert "days" in resp.get_json()["error"]
+    assert client.get("/api/mood-trends?days=36500").status_code == 200
+    assert client.get("/api/mood-trends?days=0").status_code == 200
+
+
+def test_mood_trends_cli_rejects_huge_windows(client):
+    app, _, _ = client
+    result = app.test_cli_runner().invoke(args=["mood-trends", "--days", "10000000"])
+    assert result.exit_code == 2
+    assert "10000000" in result.output
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from archive import Archive
+from models import MoodLog
+from mood_ingest import ingest
+
+
+def entry(log_date, mood=5):
+    return {"log_date": log_date.isoformat(), "mood_score": mood, "stress_level": 4, "energy_level": 6}
+
+
+def test_duplicates_are_dropped_in_batch_and_against_stored(user):
+    day = datetime(2026, 3, 1, 8, 0)
+    first = ingest(user.id, enumerate([entry(day), entry(day, mood=9)], 1))
+    assert (first["accepted"], first["duplicates"]) == (1, 1)
+
+    again = ingest(user.id, enumerate([entry(day), entry(day + timedelta(hours=1))], 1))
+    assert (again["accepted"], again["duplicates"]) == (1, 1)
+    assert MoodLog.query.filter_by(user_id=user.id).count() == 2
+    assert MoodLog.query.filter_by(user_id=user.id, log_date=day).one().mood_score == 5
+
+
+def test_entries_behind_the_horizon_are_rejected(user):
+    horizon = datetime(2026, 1, 1)
+    result = ingest(user.id, enumerate([entry(horizon - timedelta(days=1)), entry(horizon)], 1),
+                    not_before=horizon)
+
+    assert (result["accepted"], result["rejected"]) == (1, 1)
+    assert result["errors"][0]["entry"] == 1
+    assert "archived" in result["errors"][0]["error"]
+    assert MoodLog.query.filter_by(user_id=user.id).one().log_date == horizon
+
+
+# ── the slider endpoint ──────────────────────────────────────────
+def test_log_mood_rejects_dates_behind_the_horizon(client):
+    app, client, user_id = client
+    horizon = datetime.utcnow() - timedelta(days=30)
+    Archive(app.config["ARCHIVE_DIR"]).set_horizon(horizon)
+
+    old = client.post("/api/log-mood", json=entry(horizon - timedelta(days=1)))
+    assert old.status_code == 400
+    assert "archived" in old.get_json()["error"]
+
+    recent = client.post("/api/log-mood", json=entry(horizon + timedelta(days=1)))
+    assert recent.status_code == 200
+    with app.app_context():
+        assert MoodLog.query.filter_by(user_id=user_id).count() == 1
+
+
+@pytest.mark.parametrize("body", [
+    {"columns": ["log_date", "mood_score"], "rows": 5},
+    {"columns": [["log_date"]], "rows": [["2026-03-01T08:00:00"]]},
+    {"columns": "log_date", "rows": []},
+])
+def test_bulk_rejects_malformed_column_bodies(client, body):
+    _, client, _ = client
+    resp = client.post("/api/log-mood/bulk", json=body)
+    assert resp.status_code == 400
+    assert not resp.get_json()["success"]
+
+
+def test_bulk_column_body(client):
+    app, client, user_id = client
+    resp = client.post("/api/log-mood/bulk", json={"columns": ["log_date", "mood_score"],
+                                                   "rows": [["2026-03-01T08:00:00", 6], "junk"]})
+    assert resp.get_json()["accepted"] == 1 and resp.get_json()["rejected"] == 1
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+
+from migrations import upgrade_schema
+from models import db, WellnessPlan
+from plan_store import add_plan, load_active_plan, replace_active_plan
+
+
+def test_replace_keeps_one_active_plan(user, plan):
+    replace_active_plan(user.id, plan("old"))
+    db.session.commit()
+    replace_active_plan(user.id, plan("new"))
+    db.session.commit()
+
+    assert WellnessPlan.query.filter_by(user_id=user.id, is_active=True).count() == 1
+    loaded = load_active_plan(user.id)
+    assert loaded["mental_health_plan"] == ["new mind 1", "new mind 2"]
+    assert loaded["fitness_plan"] == ["new move"]
+    assert loaded["personalized_insights"] == "new insight"
+
+
+def test_second_active_plan_is_rejected(user, plan):
+    add_plan(user.id, plan("first"))
+    db.session.commit()
+    with pytest.raises(IntegrityError):
+        add_plan(user.id, plan("racing"))       # a save that skipped the deactivation
+    db.session.rollback()
+    assert load_active_plan(user.id)["personalized_insights"] == "first insight"
+
+
+def test_no_active_plan(user):
+    assert load_active_plan(user.id) is None
+
+
+def test_upgrade_dedupes_legacy_active_plans(app, user, plan):
+    # an old database: non-unique index, two active plans for the same user
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_wellness_plan_user_active")
+        conn.exec_driver_sql("CREATE INDEX ix_wellness_plan_user_active "
+                             "ON wellness_plan (user_id) WHERE is_active = 1")
+    add_plan(user.id, plan("older"))
+    add_plan(user.id, plan("newer"))
+    db.session.commit()
+    # the loader never mixes two plans' items, even before the upgrade
+    assert load_active_plan(user.id)["nutrition_plan"] == ["newer eat"]
+
+    created = upgrade_schema()
+
+    assert "ix_wellness_plan_user_active" in created
+    index = next(ix for ix in inspect(db.engine).get_indexes("wellness_plan")
+                 if ix["name"] == "ix_wellness_plan_user_active")
+    assert index["unique"]
+    active = WellnessPlan.query.filter_by(user_id=user.id, is_active=True).all()
+    assert [p.personalized_insights for p in active] == ["newer insight"]
@@ -0,0 +1,87 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import rollups
+from models import db, User, MoodRollup, FeelingsRollup, FeelingsLog
+from mood_ingest import ingest
+from rollups import compact, history, record_feelings
+
+STATES = ["calm", "anxious", "tired", None]
+
+
+def snapshot():
+    """Every rollup row, without ids, in key order"""
+    db.session.expire_all()
+    rows = []
+    for model in (MoodRollup, FeelingsRollup):
+        columns = [c.name for c in model.__table__.columns if c.name != "id"]
+        rows.append(sorted(tuple(getattr(row, c) for c in columns) for row in model.query.all()))
+    return rows
+
+
+def score(rng):
+    return rng.choice([None, *range(1, 11)])
+
+
+def log_history(user_ids, seed=7):
+    """Six weeks of moods and feelings, ingested in batches that overlap days and weeks"""
+    rng = random.Random(seed)
+    start = datetime(2025, 3, 5, 6, 0)
+    for user_id in user_ids:
+        entries = [{"log_date": (start + timedelta(hours=7 * k)).isoformat(), "mood_score": rng.randint(1, 10),
+                    "stress_level": score(rng), "energy_level": score(rng)} for k in range(150)]
+        for batch in range(0, len(entries), 17):
+            assert ingest(user_id, enumerate(entries[batch:batch + 17], 1))["rejected"] == 0
+
+        feelings = [FeelingsLog(user_id=user_id, feelings_text="x", emotional_state=rng.choice(STATES),
+                                created_date=start + timedelta(hours=13 * k)) for k in range(60)]
+        db.session.add_all(feelings)
+        for batch in range(0, len(feelings), 9):
+            record_feelings([(f.user_id, f.created_date, f.emotional_state) for f in feelings[batch:batch + 9]])
+        db.session.commit()
+
+
+@pytest.mark.parametrize("portable", [False, True], ids=["on-conflict", "portable-merge"])
+def test_incremental_rollups_match_compact(user, monkeypatch, portable):
+    if portable:
+        monkeypatch.setattr(rollups, "_upsert", rollups._merge_rows)
+    other = User(username="bob", email="bob@example.test", password="x")
+    db.session.add(other)
+    db.session.commit()
+    log_history([user.id, other.id])
+
+    incremental = snapshot()
+    assert len(incremental[0]) > 40 and len(incremental[1]) > 40
+    compact(since=date(2025, 3, 26))                # rebuilds from that week's Monday on
+    assert snapshot() == incremental
+    compact()
+    assert snapshot() == incremental
+
+
+def test_upsert_merges_into_the_existing_row(user):
+    day = datetime(2025, 3, 5, 8, 0)
+    ingest(user.id, enumerate([{"log_date": day.isoformat(), "mood_score": 4, "stress_level": None}], 1))
+    ingest(user.id, enumerate([{"log_date": (day + timedelta(hours=2)).isoformat(), "mood_score": 9,
+                                "stress_level": 3}], 1))
+
+    row = MoodRollup.query.filter_by(user_id=user.id, period="day").one()
+    assert (row.logs, row.mood_n, row.mood_sum, row.mood_min, row.mood_max) == (2, 2, 13, 4, 9)
+    assert (row.stress_n, row.stress_sum, row.stress_min, row.stress_max) == (1, 3, 3, 3)
+    assert (row.energy_n, row.energy_min) == (0, None)
+    assert history(user.id, "week")[0]["mood"] == {"mean": 6.5, "min": 4, "max": 9}
+
+
+def test_mood_history_rejects_huge_windows(client):
+    app, client, _ = client
+    resp = client.get("/api/mood-history?period=week&days=10000000")
+    assert resp.status_code == 400
+    assert "days" in resp.get_json()["error"]
+    assert client.get("/api/mood-history?period=day&days=36500").status_code == 200
+
+
+def test_compact_rollups_cli_rejects_huge_windows(client):
+    app, _, _ = client
+    result = app.test_cli_runner().invoke(args=["compact-rollups", "--days", "10000000"])
+    assert result.exit_code == 2
@@ -0,0 +1,103 @@
+import threading
+import time
+
+from ai_wellness import GeminiWellnessAI, LocalBackend
+from models import db, User, FeelingsLog
+from similarity_index import FeelingsIndex, recent_feelings
+from singleflight import SingleFlight
+
+ANALYSIS = {"emotional_state": "stressed", "stress_indicators": ["deadlines"],
+            "recommended_focus_areas": ["rest"], "empathy_message": "one step at a time"}
+TEXT = "I'm so stressed about work deadlines and I can't sleep"
+
+
+def index(**kw):
+    return FeelingsIndex(recall_sample=0, **kw)
+
+
+def test_paraphrase_hits_and_negation_misses():
+    similar = index()
+    similar.add(TEXT, ANALYSIS, user_id=1)
+
+    assert similar.lookup("I am so stressed about work deadlines and I cannot sleep", 1) == ANALYSIS
+    assert similar.lookup("I'm not stressed about work deadlines and I can sleep", 1) is None
+
+
+def test_entries_are_scoped_to_their_user():
+    similar = index()
+    similar.add(TEXT, ANALYSIS, user_id=1)
+
+    assert similar.lookup(TEXT, 2) is None
+    assert similar.lookup(TEXT) is None
+    assert similar.lookup(TEXT, 1) == ANALYSIS
+
+
+def test_eviction_drops_the_owners_bucket_entries():
+    similar = index(max_entries=1)
+    similar.add(TEXT, ANALYSIS, user_id=1)
+    similar.add("feeling lonely since moving to a new city", ANALYSIS, user_id=2)
+
+    assert similar.lookup(TEXT, 1) is None
+    assert all(owner == 2 for table in similar._buckets for owner, _ in table)
+
+
+def test_analyze_feelings_does_not_reuse_another_users_analysis():
+    backend = LocalBackend(latency_ms=0, distribution="fixed")
+    ai = GeminiWellnessAI(backend=backend, similar=index())
+
+    ai.analyze_feelings(TEXT, user_id=1)
+    ai.analyze_feelings(TEXT + " today", user_id=1)
+    assert backend.calls == 1
+    ai.analyze_feelings(TEXT + " today", user_id=2)
+    assert backend.calls == 2
+
+
+class StalledBackend:
+    """Holds every call until released, then fails it"""
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def generate_content(self, prompt, stream=False):
+        self.started.set()
+        self.release.wait(5)
+        raise RuntimeError("model unavailable")
+
+
+def test_fallback_shared_by_single_flight_is_not_indexed():
+    backend = StalledBackend()
+    singleflight = SingleFlight(wait_timeout=5)
+    similar = index()
+    ai = GeminiWellnessAI(backend=backend, singleflight=singleflight, similar=similar)
+    fallback = ai._get_fallback_feelings_analysis()
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(ai.analyze_feelings(TEXT, 1)))
+    leader.start()
+    assert backend.started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(ai.analyze_feelings(TEXT, 1)))
+                 for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while singleflight.collapsed < len(followers):
+        time.sleep(0.01)
+    backend.release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert results == [fallback] * 4
+    assert similar.stats()["entries"] == 0
+    assert similar.lookup(TEXT, 1) is None
+
+
+def test_warm_up_rows_carry_their_owner(user):
+    other = User(username="bob", email="bob@example.test", password="x")
+    db.session.add(other)
+    db.session.flush()
+    db.session.add_all([FeelingsLog(user_id=user.id, feelings_text=TEXT, emotional_state="stressed"),
+                        FeelingsLog(user_id=other.id, feelings_text="calm", emotional_state="calm")])
+    db.session.commit()
+
+    rows = recent_feelings(10)
+    assert [(user_id, text) for user_id, text, _ in rows] == [(user.id, TEXT), (other.id, "calm")]
+    assert rows[0][2]["emotional_state"] == "stressed"
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight, SQLiteFlightLock
+
+
+def wait_for(predicate):
+    deadline = time.monotonic() + 5
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def run_together(flight, fn, followers=3):
+    """Leader call blocked in fn, `followers` identical calls waiting on it"""
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flight.do("k", fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(followers + 1)]
+    threads[0].start()
+    wait_for(lambda: flight.stats()["in_flight"] == 1)
+    for thread in threads[1:]:
+        thread.start()
+    wait_for(lambda: flight.collapsed == followers)
+    return threads, results, errors
+
+
+def test_identical_calls_collapse_into_one(app):
+    flight = SingleFlight.from_config(app.config)
+    release = threading.Event()
+
+    def fn():
+        release.wait(5)
+        return {"plan": ["walk"]}
+
+    threads, results, errors = run_together(flight, fn)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [{"plan": ["walk"]}] * 4 and not errors
+    assert len({id(result) for result in results}) == 4   # followers get copies
+    assert flight.stats() == {"executions": 1, "collapsed": 3, "remote_hits": 0, "in_flight": 0}
+
+
+def test_leader_error_reaches_every_waiter(app):
+    flight = SingleFlight.from_config(app.config)
+    release = threading.Event()
+
+    def fn():
+        release.wait(5)
+        raise RuntimeError("model unavailable")
+
+    threads, results, errors = run_together(flight, fn)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert not results and len(errors) == 4
+    assert all(str(e) == "model unavailable" for e in errors)
+    assert flight.do("k", lambda: "retried") == "retried"     # the failure is not remembered
+
+
+def test_waiter_times_out_on_a_stuck_leader():
+    flight = SingleFlight(wait_timeout=0.05)
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do("k", lambda: release.wait(5)))
+    leader.start()
+    wait_for(lambda: flight.stats()["in_flight"] == 1)
+
+    with pytest.raises(TimeoutError):
+        flight.do("k", lambda: "second call")
+    release.set()
+    leader.join(5)
+
+
+def test_other_process_answer_is_taken_from_the_shared_cache(app, tmp_path):
+    app.config["AI_INFLIGHT_DB_PATH"] = str(tmp_path / "inflight.db")
+    owner = SQLiteFlightLock(app.config["AI_INFLIGHT_DB_PATH"])
+    assert owner.acquire("k")                     # another worker is calling the model
+    flight = SingleFlight.from_config(app.config)
+    flight.poll_interval = 0.01
+    shared = iter([None, {"plan": ["walk"]}])
+
+    result = flight.do("k", lambda: pytest.fail("called the model twice"), lookup=lambda: next(shared))
+
+    assert result == {"plan": ["walk"]}
+    assert (flight.remote_hits, flight.executions) == (1, 0)
+    owner.release("k")
+    assert flight.process_lock.acquire("k")
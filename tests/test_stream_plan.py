@@ -0,0 +1,34 @@
+import threading
+import time
+
+from models import FeelingsLog
+
+
+def test_analysis_waits_only_for_what_the_stream_left(client, monkeypatch):
+    app, client, user_id = client
+    ai = app.extensions["ai_wellness"]
+    release = threading.Event()
+
+    def slow_stream(user_data, desc):
+        time.sleep(0.4)
+        yield ("done", ai._get_fallback_plan(user_data, desc))
+
+    def stalled_analysis(desc, user_id):
+        release.wait(5)
+        return {"emotional_state": "too late"}
+
+    monkeypatch.setattr(ai, "call_timeout", 0.5)
+    monkeypatch.setattr(ai, "stream_wellness_plan", slow_stream)
+    monkeypatch.setattr(ai, "analyze_feelings", stalled_analysis)
+
+    started = time.monotonic()
+    body = client.post("/api/generate-ai-wellness-plan/stream",
+                       json={"feelings_description": "tired of everything"}).get_data(as_text=True)
+    elapsed = time.monotonic() - started
+    release.set()
+
+    assert "event: done" in body
+    assert elapsed < 0.8
+    with app.app_context():
+        state = FeelingsLog.query.filter_by(user_id=user_id).one().emotional_state
+    assert state == ai.fallback_feelings_analysis()["emotional_state"]
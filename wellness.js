@@ -25,31 +25,132 @@ document.addEventListener('DOMContentLoaded', function() {
 
 // Generate AI wellness plan with feelings
 function generateAIWellnessPlan() {
-    const mood = document.getElementById('moodScore').value;
-    const stress = document.getElementById('stressLevel').value;
-    const energy = document.getElementById('energyLevel').value;
-    const feelings = document.getElementById('feelingsText').value;
+    const payload = {
+        mood_score: parseInt(document.getElementById('moodScore').value),
+        stress_level: parseInt(document.getElementById('stressLevel').value),
+        energy_level: parseInt(document.getElementById('energyLevel').value),
+        feelings_description: document.getElementById('feelingsText').value
+    };
     
     displayResponse('🤖 AI Processing...', {message: 'Advanced neural networks analyzing your personal data and feelings...'});
     
+    // stream items as they are generated; fall back to the job queue only if
+    // nothing arrived (a stream cut off midway may already be saving its plan)
+    if (window.ReadableStream && window.TextDecoder) {
+        streamAIWellnessPlan(payload).catch(error => {
+            console.error('Stream error:', error);
+            if (error.receivedData) {
+                displayResponse('❌ Connection Lost', {message: 'Your plan may still have been saved – reload the page before trying again.'});
+            } else {
+                queueAIWellnessPlan(payload);
+            }
+        });
+    } else {
+        queueAIWellnessPlan(payload);
+    }
+}
+
+// Read the SSE plan stream and render each item as soon as it arrives
+async function streamAIWellnessPlan(payload) {
+    const response = await fetch('/api/generate-ai-wellness-plan/stream', {
+        method: 'POST',
+        headers: { 
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream'
+        },
+        body: JSON.stringify(payload)
+    });
+    if (!response.ok || !response.body) {
+        // includes 429 when too many plans are streaming
+        throw new Error(`Stream unavailable (${response.status})`);
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    const partial = {mental_health: [], fitness: [], nutrition: []};
+    let buffer = '';
+    let received = false;
+    
+    try {
+        while (true) {
+            const {value, done} = await reader.read();
+            if (done) break;
+            received = true;
+            buffer += decoder.decode(value, {stream: true});
+        
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+            
+                const event = (frame.match(/^event: (.*)$/m) || [])[1];
+                const data = JSON.parse((frame.match(/^data: (.*)$/m) || [])[1] || '{}');
+            
+                if (event === 'item' && partial[data.section]) {
+                    partial[data.section][data.index] = data.text;
+                    displayAIPlan('🤖 AI Writing Your Plan...', partial, false);
+                } else if (event === 'field') {
+                    partial[data.name] = data.value;
+                    displayAIPlan('🤖 AI Writing Your Plan...', partial, false);
+                } else if (event === 'done') {
+                    displayAIPlan('🤖 AI Wellness Plan Generated!', data.plan);
+                    setTimeout(() => location.reload(), 5000);
+                    return;
+                } else if (event === 'error') {
+                    displayResponse('❌ AI Generation Failed', {message: data.error || 'Please try again'});
+                    return;
+                }
+            }
+        }
+    } catch (error) {
+        error.receivedData = received;
+        throw error;
+    }
+    const error = new Error('Stream ended before the plan was complete');
+    error.receivedData = received;
+    throw error;
+}
+
+// Queue plan generation as a background job and poll for the result
+function queueAIWellnessPlan(payload) {
     fetch('/api/generate-ai-wellness-plan', {
         method: 'POST',
         headers: { 
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         },
-        body: JSON.stringify({
-            mood_score: parseInt(mood),
-            stress_level: parseInt(stress),
-            energy_level: parseInt(energy),
-            feelings_description: feelings
-        })
+        body: JSON.stringify(payload)
     })
     .then(response => response.json())
     .then(data => {
         if (data.success) {
+            // plan is generated by a background job – poll until it is ready
+            pollPlanJob(data.poll_url);
+        } else {
+            displayResponse('❌ AI Generation Failed', {message: data.error || 'Please try again'});
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        displayResponse('❌ Error', {message: 'Failed to generate AI plan. Please try again.'});
+    });
+}
+
+// Poll a queued plan job until it finishes
+function pollPlanJob(pollUrl, attempt = 0) {
+    if (attempt >= 90) {
+        displayResponse('❌ AI Generation Timed Out', {message: 'Your plan is taking too long. Please try again.'});
+        return;
+    }
+
+    fetch(pollUrl, { headers: { 'Accept': 'application/json' } })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'done') {
             displayAIPlan('🤖 AI Wellness Plan Generated!', data.plan);
             setTimeout(() => location.reload(), 5000);
+        } else if (data.status === 'queued' || data.status === 'running') {
+            setTimeout(() => pollPlanJob(pollUrl, attempt + 1), 1000);
         } else {
             displayResponse('❌ AI Generation Failed', {message: data.error || 'Please try again'});
         }
@@ -292,8 +393,9 @@ function startVRSession(contentId) {
     }, 1000);
 }
 
-// Display AI-generated plan
-function displayAIPlan(title, plan) {
+// Display AI-generated plan (also called with partial plans while streaming)
+function displayAIPlan(title, plan, scroll = true) {
+    const items = list => (list || []).filter(Boolean).map(item => `<li>${item}</li>`).join('');
     const responseArea = document.getElementById('responseArea');
     responseArea.innerHTML = `
         <div class="alert alert-success alert-dismissible fade show">
@@ -309,15 +411,15 @@ function displayAIPlan(title, plan) {
             <div class="row">
                 <div class="col-md-4">
                     <h6>🧘 Mental Health:</h6>
-                    <ul class="small">${plan.mental_health.map(item => `<li>${item}</li>`).join('')}</ul>
+                    <ul class="small">${items(plan.mental_health)}</ul>
                 </div>
                 <div class="col-md-4">
                     <h6>💪 Fitness:</h6>
-                    <ul class="small">${plan.fitness.map(item => `<li>${item}</li>`).join('')}</ul>
+                    <ul class="small">${items(plan.fitness)}</ul>
                 </div>
                 <div class="col-md-4">
                     <h6>🥗 Nutrition:</h6>
-                    <ul class="small">${plan.nutrition.map(item => `<li>${item}</li>`).join('')}</ul>
+                    <ul class="small">${items(plan.nutrition)}</ul>
                 </div>
             </div>
             
@@ -332,7 +434,9 @@ function displayAIPlan(title, plan) {
         </div>
     `;
     
-    responseArea.scrollIntoView({ behavior: 'smooth' });
+    if (scroll) {
+        responseArea.scrollIntoView({ behavior: 'smooth' });
+    }
 }
 
 // Display feelings analysis
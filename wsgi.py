@@ -0,0 +1,16 @@
+"""
+wsgi.py  –  Neural-Wellness 2070
+────────────────────────────────────────────────────────────────────
+Server entry point: the one module that builds the app at import.
+
+    gunicorn wsgi:app
+    flask --app wsgi run
+
+app.py itself only defines create_app(), so re-importing it (the bcrypt
+workers do that with the launching script) never builds engines, pools
+or services.
+"""
+
+from app import create_app
+
+app = create_app()